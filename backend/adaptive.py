@@ -0,0 +1,249 @@
+import math
+import time
+import statistics
+
+from backend.cancel import CancelToken
+from backend.kernels import KERNELS, run_kernel
+from backend.memory import measure_bandwidth, measure_latency
+
+
+# Two-sided 95% Student-t critical values by degrees of freedom; 1.96 beyond the table
+_T95 = {1: 12.71, 2: 4.30, 3: 3.18, 4: 2.78, 5: 2.57, 6: 2.45, 7: 2.36, 8: 2.31, 9: 2.26, 10: 2.23,
+        12: 2.18, 15: 2.13, 20: 2.09, 25: 2.06, 30: 2.04}
+
+# Per-test repetition settings. Each test repeats until the 95% confidence interval of the
+# mean is within target_ci (relative) or its time budget is spent, after discarding `warmup`
+# runs. "sizes" shrinks the work per run where the result does not depend on the size.
+# total_budget_s covers the whole run; when workload replay stages are requested, the replay's
+# budget_s is set aside from it, so the other tests get that much less time.
+PRESETS = {
+    "quick": {
+        "total_budget_s": 4.5,
+        "target_ci": 0.05,
+        "kernels": {"budget_s": 0.4, "warmup": 1, "min_runs": 1, "sizes": {"float_fft": 2 ** 18, "branchy_compile": 250_000}},
+        "multicore": {"budget_s": 0.5, "warmup": 0, "min_runs": 1, "size": 100_000},
+        "memory": {"budget_s": 0.6, "warmup": 1, "min_runs": 2, "buffer_mb": 32, "sweep_kb": (16, 1024, 32 * 1024), "steps": 50_000},
+        "storage": {"budget_s": 0.8, "warmup": 0, "min_runs": 1, "file_size_mb": 32, "random_ops": 500},
+        "thermal": None,
+        "gpu": None,
+        "network": False,
+        "replay": {"budget_s": 1.2, "durations": {"small_files": 0.2, "compile": 0.3, "blas": 0.2, "render": 0.5}},
+    },
+    "thorough": {
+        "total_budget_s": 240,
+        "target_ci": 0.01,
+        "kernels": {"budget_s": 5, "warmup": 1, "min_runs": 5, "sizes": {}},
+        "multicore": {"budget_s": 15, "warmup": 1, "min_runs": 3, "size": None},
+        "memory": {"budget_s": 10, "warmup": 1, "min_runs": 5, "buffer_mb": 256, "sweep_kb": None, "steps": 400_000},
+        "storage": {"budget_s": 30, "warmup": 0, "min_runs": 2, "file_size_mb": 512, "random_ops": 4000},
+        "thermal": {"duration": 60},
+        "gpu": {"duration": 20},
+        "network": True,
+        "replay": {"budget_s": 45, "durations": {"render": 30}},
+    },
+}
+
+
+def _t95(df):
+    for known in sorted(_T95):
+        if df <= known:
+            return _T95[known]
+    return 1.96
+
+
+def summarize(samples):
+    """
+    median/mean/p95/stddev of the samples plus ci_rel: the half-width of the 95% confidence
+    interval of the mean, relative to the mean (0.05 = +-5%). ci_rel is None for one sample.
+    """
+    ordered = sorted(samples)
+    n = len(ordered)
+    mean = statistics.fmean(ordered)
+    stddev = statistics.stdev(ordered) if n > 1 else 0.0
+    ci_rel = None
+    if n > 1:
+        ci_rel = _t95(n - 1) * stddev / math.sqrt(n) / abs(mean) if mean else 0.0
+    return {
+        "n": n,
+        "median": statistics.median(ordered),
+        "mean": mean,
+        "p95": ordered[min(n - 1, math.ceil(0.95 * n) - 1)],
+        "stddev": stddev,
+        "ci_rel": round(ci_rel, 4) if ci_rel is not None else None,
+    }
+
+
+def measure(fn, budget_s, target_ci=0.05, warmup=1, min_runs=3, max_runs=50, cancel=None, limit_s=None):
+    """
+    Calls fn() repeatedly. fn returns one number or a {name: number} dict per run.
+    Stops once every value's ci_rel <= target_ci (after min_runs), when budget_s of wall
+    time (timed with perf_counter_ns, warm-up included) is spent, or at max_runs.
+    limit_s is a hard limit: past it, warm-up runs are skipped and measuring stops even
+    before min_runs (one run is always made).
+    Returns {name: summarize(...)}; a plain number is reported under the name "value".
+    """
+    cancel = cancel or CancelToken()
+    start = time.perf_counter_ns()
+    deadline = start + int(budget_s * 1e9)
+    limit = start + int(limit_s * 1e9) if limit_s is not None else None
+    for _ in range(warmup):
+        cancel.check()
+        if limit is not None and time.perf_counter_ns() >= limit:
+            break
+        fn()
+
+    samples = {}
+    while True:
+        cancel.check()
+        result = fn()
+        for name, value in (result if isinstance(result, dict) else {"value": result}).items():
+            samples.setdefault(name, []).append(value)
+
+        runs = len(next(iter(samples.values())))
+        now = time.perf_counter_ns()
+        if runs >= max_runs or (runs >= min_runs and now >= deadline) or (limit is not None and now >= limit):
+            break
+        if runs >= max(min_runs, 2):
+            stats = [summarize(v)["ci_rel"] for v in samples.values()]
+            if all(ci is not None and ci <= target_ci for ci in stats):
+                break
+    return {name: summarize(values) for name, values in samples.items()}
+
+
+def _numeric(result):
+    return {k: v for k, v in result.items() if isinstance(v, (int, float)) and not isinstance(v, bool)}
+
+
+class AdaptiveRunner:
+    """
+    Repeats BenchmarkEngine's tests until their results are statistically stable, within a
+    preset's time budget. run() returns the same dictionary as run_all_benchmarks()
+    (medians), plus "stats" (median/p95/stddev/ci_rel per metric) and "uncertainty"
+    ({metric: ci_rel}) for DecisionEngine.score_range().
+    """
+    def __init__(self, engine, preset="quick"):
+        if preset not in PRESETS:
+            raise ValueError(f"Unknown preset '{preset}'. Use one of: {', '.join(PRESETS)}")
+        self.engine = engine
+        self.preset_name = preset
+        self.preset = PRESETS[preset]
+
+    def _remaining(self):
+        return max(self.deadline - time.perf_counter(), 0)
+
+    def _budget(self, share):
+        """A test's budget, cut short if the preset's total budget is nearly used up."""
+        return min(share, self._remaining())
+
+    def _measure(self, fn, settings):
+        # The preset's deadline is a hard limit: warm-up and min_runs give way to it
+        return measure(fn, self._budget(settings["budget_s"]), target_ci=self.preset["target_ci"],
+                       warmup=settings["warmup"], min_runs=settings["min_runs"], cancel=self.engine.cancel,
+                       limit_s=self._remaining())
+
+    def run(self, target_mountpoint=None, on_progress=None, cancel=None, replay_stages=None):
+        engine = self.engine
+        engine.cancel = cancel or CancelToken()
+        replay_settings = self.preset["replay"]
+        replay_reserve = replay_settings["budget_s"] if replay_stages else 0
+        self.deadline = time.perf_counter() + self.preset["total_budget_s"] - replay_reserve
+        stats = {}
+        phases = ["cpu_kernels", "multicore", "memory", "storage", "thermal", "gpu", "workload_replay", "network", "battery"]
+
+        def done(name):
+            if on_progress:
+                on_progress(name, phases.index(name) + 1, len(phases), {})
+
+        # CPU kernels: each kernel's normalized score, repeated
+        kernels = self.preset["kernels"]
+        for name in KERNELS:
+            size = kernels["sizes"].get(name)
+            stats[f"cpu_kernels.{name}"] = self._measure(lambda: run_kernel(name, size)["normalized"], kernels)["value"]
+        done("cpu_kernels")
+
+        multicore = self.preset["multicore"]
+        result = self._measure(lambda: _numeric(engine.run_multicore_cpu_test(size=multicore["size"])), multicore)
+        for key, metric in (("multi_core_index", "cpu_multi_core_index"), ("scaling_efficiency", "cpu_scaling_efficiency"),
+                            ("single_core_time", "cpu_single_core_time"), ("all_core_time", "cpu_multi_core_time")):
+            stats[metric] = result[key]
+        cpu_core_count = int(result["workers"]["median"])
+        done("multicore")
+
+        memory = self.preset["memory"]
+        bandwidth = self._measure(lambda: measure_bandwidth(size_mb=memory["buffer_mb"], repeats=1,
+                                                            cancel=engine.cancel), memory)
+        for key in ("read_gbps", "write_gbps", "copy_gbps"):
+            stats[f"ram_{key}"] = bandwidth[key]
+        sweep_kb = memory["sweep_kb"]
+        latency = self._measure(lambda: measure_latency(steps=memory["steps"], cancel=engine.cancel,
+                                                        **({"sweep_kb": sweep_kb} if sweep_kb else {})), memory)
+        stats["ram_latency_ns"] = latency[max(latency)]
+        done("memory")
+
+        storage = self.preset["storage"]
+        mountpoint = target_mountpoint or engine._largest_free_mountpoint()
+        disk_info = {}
+
+        def storage_run():
+            result = engine.run_storage_test(mountpoint=mountpoint, file_size_mb=storage["file_size_mb"],
+                                             random_ops=storage["random_ops"])
+            disk_info.update(result)
+            return _numeric(result)
+
+        disk = self._measure(storage_run, storage)
+        for key in ("seq_write_mbps", "seq_read_mbps", "rand_read_iops", "rand_write_iops"):
+            stats[f"disk_{key}"] = disk[key]
+        done("storage")
+
+        # Thermal throttling needs a long sustained load; it is one long run, not repeated,
+        # shortened to what is left of the total budget and skipped if nothing is
+        thermal = None
+        if self.preset["thermal"] and self._remaining() > 0:
+            settings = dict(self.preset["thermal"])
+            settings["duration"] = self._budget(settings["duration"])
+            thermal = engine.run_thermal_stability_test(**settings)
+        done("thermal")
+        # The GPU test already measures over a sustained window; one run per preset, within the budget
+        gpu = None
+        if self.preset["gpu"] and self._remaining() > 0:
+            settings = dict(self.preset["gpu"])
+            settings["duration"] = self._budget(settings["duration"])
+            gpu = engine.run_gpu_test(**settings)
+        done("gpu")
+        # Replay stages measure over a time window each; one run at the preset's durations,
+        # within the time set aside for them (plus anything the other tests left over)
+        self.deadline += replay_reserve
+        replay = None
+        if replay_stages and self._remaining() > 0:
+            replay = engine.run_workload_replay(replay_stages, durations=replay_settings["durations"],
+                                                target_mountpoint=mountpoint, budget_s=self._remaining())
+        done("workload_replay")
+        network = engine.run_network_test() if self.preset["network"] else {"available": False}
+        done("network")
+        battery = engine.get_battery_health()
+        done("battery")
+
+        medians = {metric: s["median"] for metric, s in stats.items()}
+        benchmark_data = {
+            "cpu_kernels": {name: round(medians[f"cpu_kernels.{name}"], 3) for name in KERNELS},
+            "cpu_core_count": cpu_core_count,
+            "ram_latency_sweep": {size: round(s["median"], 2) for size, s in latency.items()},
+            "disk_block_sweep_mbps": disk_info.get("block_sweep_mbps", {}),
+            "disk_direct_io": disk_info.get("direct_io", False),
+            "disk_target": disk_info.get("target"),
+        }
+        benchmark_data.update({m: round(v, 3) for m, v in medians.items() if not m.startswith("cpu_kernels.")})
+        # Skipped phases are left out entirely; the scoring treats missing data as not measured
+        if thermal is not None:
+            benchmark_data.update(engine._pack_phase("thermal", thermal))
+        if gpu is not None:
+            benchmark_data.update(engine._pack_phase("gpu", gpu))
+        if replay:
+            benchmark_data.update(engine._pack_phase("workload_replay", replay))
+        benchmark_data.update(engine._pack_phase("network", network))
+        benchmark_data.update(engine._pack_phase("battery", battery))
+
+        benchmark_data["preset"] = self.preset_name
+        benchmark_data["stats"] = stats
+        benchmark_data["uncertainty"] = {m: s["ci_rel"] for m, s in stats.items() if s["ci_rel"] is not None}
+        return benchmark_data
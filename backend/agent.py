@@ -0,0 +1,205 @@
+import time
+import asyncio
+import threading
+
+from backend.scraper import HardwareScraper
+from backend.benchmark import BenchmarkEngine
+from backend.store import ResultStore
+from backend.fingerprint import machine_id
+from backend.telemetry import TelemetrySampler, COLUMNS
+from backend.cancel import CancelToken, BenchmarkCancelled
+from backend.jsonapi import JsonApiServer, HTTPError, encode
+
+
+class Agent:
+    """
+    Headless Rig-Engineer: scans and benchmarks this machine on a schedule or on demand
+    and serves the results over a small JSON API.
+
+    GET  /health   liveness
+    GET  /latest   last finished scan + benchmark (encoded once per run, shared by all readers)
+    GET  /status   whether a run is in progress, which phase it is in, when the next scheduled
+                   run starts and the last run's error, if it failed
+    GET  /metrics  latest live telemetry sample (CPU/RAM/GPU/disk/network)
+    POST /run      start a run; ?wait=1 waits for its result. A request that arrives while a
+                   run is in progress joins that run instead of starting another one.
+    """
+    def __init__(self, interval_s=None, preset=None, network_endpoint=None, refresh_specs=False,
+                 store=True, telemetry_interval=1.0):
+        self.interval_s = interval_s
+        self.preset = preset
+        self.network_endpoint = network_endpoint
+        self.refresh_specs = refresh_specs
+        self.store = store
+        self.machine_id = machine_id()
+        self.telemetry = TelemetrySampler(interval=telemetry_interval, capacity=600)
+        self.cancel = CancelToken()
+
+        self._latest = None
+        self._latest_body = encode({"error": "No run has finished yet"})
+        self._metrics_body = None
+        self._current = None
+        self._progress = {}
+        self._runs = 0
+        self._last_run_end = None
+        self._last_error = None
+        self._triggered = set()
+
+    # --- Runs ----------------------------------------------------------------
+
+    def _collect(self):
+        """Blocking scan + benchmark; runs on an executor thread."""
+        start_time = time.time()
+        scraper_data = HardwareScraper().get_all_specs(refresh=self.refresh_specs)
+
+        def on_progress(phase, completed, total, _partial):
+            self._progress = {"phase": phase, "completed": completed, "total": total}
+
+        engine = BenchmarkEngine(network_endpoint=self.network_endpoint)
+        if self.preset:
+            benchmark_data = engine.run_adaptive(self.preset, on_progress=on_progress, cancel=self.cancel)
+        else:
+            benchmark_data = engine.run_all_benchmarks(on_progress=on_progress, cancel=self.cancel)
+
+        if self.store:
+            store = ResultStore()
+            store.save_run(self.machine_id, benchmark_data, scraper_data)
+            store.close()
+
+        return {
+            "machine_id": self.machine_id,
+            "started": start_time,
+            "finished": time.time(),
+            "specs": scraper_data,
+            "benchmark": benchmark_data,
+        }
+
+    async def run_once(self):
+        """Runs a scan + benchmark, or joins the one already in progress. Returns its result."""
+        if self._current is None:
+            self._current = asyncio.ensure_future(self._run())
+        # shield: a reader that disconnects must not cancel the run everyone else waits for
+        return await asyncio.shield(self._current)
+
+    async def _run(self):
+        self._progress = {"phase": "scan", "completed": 0, "total": None}
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(None, self._collect)
+            self._latest = result
+            self._latest_body = encode(result)
+            self._runs += 1
+            self._last_error = None
+            return result
+        except BenchmarkCancelled:
+            raise
+        except Exception as e:
+            # Recorded once here for every caller (scheduler, /run, /run?wait=1), shown in /status
+            print(f"[ERROR] Run failed: {e}")
+            self._last_error = {"error": str(e), "at": time.time()}
+            raise
+        finally:
+            self._current = None
+            self._progress = {}
+            self._last_run_end = time.time()
+
+    def _next_run_in(self):
+        """Seconds until the next scheduled run: interval_s after the last run (scheduled or not) ended."""
+        if not self.interval_s:
+            return None
+        if self._last_run_end is None:
+            return 0
+        return max(self._last_run_end + self.interval_s - time.time(), 0)
+
+    async def _schedule(self):
+        while True:
+            # Re-checked after sleeping: a run started through /run meanwhile moves the next one back
+            delay = self._next_run_in()
+            if delay:
+                await asyncio.sleep(delay)
+                continue
+            try:
+                await self.run_once()
+            except BenchmarkCancelled:
+                return
+            except Exception:
+                pass # Recorded by _run; try again after the interval
+
+    # --- API -----------------------------------------------------------------
+
+    async def _health(self, request):
+        return 200, {"ok": True, "machine_id": self.machine_id, "runs": self._runs}
+
+    async def _latest_handler(self, request):
+        return (200 if self._latest else 404), self._latest_body
+
+    async def _status(self, request):
+        running = self._current is not None
+        next_run = self._next_run_in()
+        return 200, {
+            "running": running,
+            "progress": self._progress,
+            "last_finished": self._latest["finished"] if self._latest else None,
+            "next_run_in_s": None if running or next_run is None else round(next_run, 1),
+            "last_error": self._last_error,
+        }
+
+    def _on_sample(self, batch):
+        """Telemetry thread: encodes the newest sample once, for every /metrics reader."""
+        sample = dict(zip(COLUMNS, batch[-1]))
+        # NaN (no GPU) is not valid JSON
+        self._metrics_body = encode({k: (round(v, 2) if v == v else None) for k, v in sample.items()})
+
+    async def _metrics(self, request):
+        if self._metrics_body is None:
+            return 404, {"error": "No telemetry sample yet"}
+        return 200, self._metrics_body
+
+    async def _trigger(self, request):
+        joined = self._current is not None
+        if request.query.get("wait") in ("1", "true"):
+            try:
+                await self.run_once()
+            except BenchmarkCancelled:
+                raise HTTPError(503, "Agent is shutting down")
+            return 200, self._latest_body
+        if not joined:
+            # Keep a reference until it finishes (the loop holds tasks only weakly); nobody
+            # awaits this run, so the callback collects its outcome
+            task = asyncio.ensure_future(self.run_once())
+            self._triggered.add(task)
+            task.add_done_callback(self._triggered_done)
+        return 202, {"started": not joined, "joined_running_run": joined}
+
+    def _triggered_done(self, task):
+        self._triggered.discard(task)
+        error = None if task.cancelled() else task.exception()
+        if error is not None and not isinstance(error, BenchmarkCancelled) and self._last_error is None:
+            # _run records its own failures; this catches anything that failed around it
+            self._last_error = {"error": str(error), "at": time.time()}
+
+    def routes(self):
+        return {
+            ("GET", "/health"): self._health,
+            ("GET", "/latest"): self._latest_handler,
+            ("GET", "/status"): self._status,
+            ("GET", "/metrics"): self._metrics,
+            ("POST", "/run"): self._trigger,
+        }
+
+    async def serve(self, host="127.0.0.1", port=8766):
+        server = JsonApiServer(self.routes(), host, port)
+        await server.start()
+        print(f"Rig-Engineer agent listening on http://{server.host}:{server.port}")
+
+        telemetry_thread = threading.Thread(target=self.telemetry.run, args=(self._on_sample, 1), daemon=True)
+        telemetry_thread.start()
+        scheduler = asyncio.ensure_future(self._schedule()) if self.interval_s else None
+        try:
+            await server.serve_forever()
+        finally:
+            # Stop a run in progress cleanly (temp files, worker processes) before exiting
+            self.cancel.cancel()
+            self.telemetry.stop()
+            if scheduler:
+                scheduler.cancel()
+            server.close()
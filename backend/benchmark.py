@@ -1,73 +1,151 @@
 import time
 import os
-import speedtest
+import contextlib
+import multiprocessing
+from functools import partial
 import psutil
+from backend.kernels import KERNELS, REFERENCE_OPS_PER_SEC, run_kernel
+from backend.memory import measure_bandwidth, measure_latency, DEFAULT_SWEEP_KB
+from backend.storage import run_storage_benchmark, pick_test_dir
+from backend.scheduler import PhaseScheduler, Task, IO
+from backend.netprobe import make_backend
+from backend.monitor import ThermalSampler, run_sustained_load, analyze_thermal_trace, downsample
+from backend.cancel import CancelToken, pool_map
+from backend.gpu import run_gpu_benchmark
+from backend.adaptive import AdaptiveRunner
+from backend.isolation import Isolation, spin
+from backend.replay import run_replay
+from backend.instrument import traced
+
 
 class BenchmarkEngine:
-    def __init__(self):
-        """Initializes the benchmarking engine for performance testing."""
-        pass
+    def __init__(self, network_endpoint=None, isolation=None):
+        """
+        Initializes the benchmarking engine for performance testing.
+        network_endpoint picks the network probe: "speedtest" (default), "tcp://host:port"
+        for a bundled probe server, or an "http://" URL. RIG_NETWORK_ENDPOINT also works.
+        isolation: an isolation.Isolation (True for the defaults) to pin workers to cores,
+        raise priority, wait for a quiet system and report the background load with the results.
+        """
+        self.network_endpoint = network_endpoint
+        self.isolation = Isolation() if isolation is True else isolation
+        # Replaced per run_all_benchmarks() call; the individual tests check it in their loops
+        self.cancel = CancelToken()
 
-    def run_cpu_stress_test(self, limit=1000000):
+    @traced("benchmark.cpu_kernels")
+    def run_cpu_kernel_suite(self, kernels=None):
         """
-        Calculates prime numbers up to a limit to stress the CPU.
-        Returns the time taken in seconds.
+        Runs the calibrated CPU kernel suite (integer sieve, dense matmul, FFT,
+        branchy compile-like work, memory-bound reduction). Every kernel does a fixed
+        amount of work and reports ops/sec normalized to the reference machine,
+        so 1.0 means "reference speed" regardless of Python version or machine.
         """
-        start_time = time.time() 
-        
-        # CPU Stress Logic: Finding prime numbers
-        primes = []
-        # This optimization significantly reduces CPU cycles during benchmarking.
-        for num in range(2, limit): 
-            for i in range(2, int(num**0.5) + 1): # A number is prime if it is not divisible by any integer up to its square root.
-                if (num % i) == 0:
-                    break
-            else:
-                primes.append(num)
-                
-        end_time = time.time()
-        duration = round(end_time - start_time, 4) # Rounding duration to 4 decimal places for clean data reporting and UI display.
-        return duration
-
-    def run_ram_latency_test(self, size=10**6):
-        """
-        Performs a synthetic memory stress test by allocating a large integer list and executing 
-        bulk operations. This measures RAM write/read speeds and memory bus latency.
-        """
-        start_time = time.time()
-        
-        # RAM Stress Logic: List manipulation
-        data = [i for i in range(size)]
-        data = [x * 2 for x in data]
-        
-        end_time = time.time()
-        return round(end_time - start_time, 4)
+        results = {}
+        for name in kernels or KERNELS:
+            self.cancel.check()
+            results[name] = run_kernel(name)
+        return results
 
-    def run_disk_test(self):
-        """Measures Disk Write Speed by creating a temporary 100MB file."""
+    @traced("benchmark.multicore")
+    def run_multicore_cpu_test(self, kernel="branchy_compile", workers=None, single_core_result=None, size=None):
+        """
+        Runs the same kernel on every logical CPU at once using a process pool
+        (one worker per logical CPU, each doing the full single-core amount of work).
+        Returns single-core time, all-core wall time, the scaling efficiency and a
+        multi-core index (total throughput in units of one reference-machine core).
+        An efficiency of 1.0 means all cores finished as fast as a single core did alone.
+        size overrides the kernel's default amount of work (for shorter runs).
+        """
+        if workers is None:
+            workers = (self.isolation and self.isolation.workers()) or psutil.cpu_count(logical=True) or os.cpu_count() or 1
 
-        start_time = time.time()
-        file_name = "test_speed.tmp"
-        data = os.urandom(1024 * 1024 * 100) # 100MB of random data
+        if single_core_result is None:
+            single_core_result = run_kernel(kernel, size)
 
-        with open(file_name, "wb") as f:
-            f.write(data)
-        
-        os.remove(file_name) # Cleanup
-        end_time = time.time()
-        return round(end_time - start_time, 4)
+        with multiprocessing.Pool(processes=workers, **self._pool_options()) as pool:
+            # Warm up the pool so process start-up cost is not part of the measurement
+            pool.map(abs, range(workers))
+            if self.isolation and self.isolation.warmup_s:
+                pool.map(spin, [self.isolation.warmup_s] * workers)
+
+            start_time = time.perf_counter()
+            per_worker = pool_map(pool, partial(run_kernel, size=size), [kernel] * workers, cancel=self.cancel)
+            all_core_time = time.perf_counter() - start_time
+
+        single_core_time = single_core_result["duration"]
+        efficiency = single_core_time / all_core_time if all_core_time > 0 else 0
+        # Each worker did the same fixed work, so total throughput scales with the worker count
+        ops_per_worker = per_worker[0]["ops_per_sec"] * per_worker[0]["duration"]
+        total_ops_per_sec = ops_per_worker * workers / all_core_time if all_core_time > 0 else 0
+        multi_core_index = total_ops_per_sec / REFERENCE_OPS_PER_SEC[(kernel, per_worker[0]["backend"])]
+
+        return {
+            "single_core_time": round(single_core_time, 4),
+            "all_core_time": round(all_core_time, 4),
+            "scaling_efficiency": round(efficiency, 3),
+            "multi_core_index": round(multi_core_index, 3),
+            "workers": workers
+        }
+
+    @traced("benchmark.memory")
+    def run_memory_subsystem_test(self, buffer_mb=128, sweep_kb=DEFAULT_SWEEP_KB):
+        """
+        Measures the memory subsystem on preallocated contiguous buffers:
+        sequential read/write/copy bandwidth (GB/s) and random-access latency (ns)
+        from pointer chasing over a sweep of working-set sizes. The largest working
+        set is bigger than L3, so its latency is the DRAM latency.
+        """
+        bandwidth = measure_bandwidth(size_mb=buffer_mb, cancel=self.cancel)
+        sweep = measure_latency(sweep_kb=sweep_kb, cancel=self.cancel)
+
+        return {
+            "read_gbps": bandwidth["read_gbps"],
+            "write_gbps": bandwidth["write_gbps"],
+            "copy_gbps": bandwidth["copy_gbps"],
+            "latency_ns": sweep[max(sweep)],
+            "latency_sweep": sweep
+        }
 
+    @traced("benchmark.storage")
+    def run_storage_test(self, mountpoint=None, file_size_mb=256, direct=True, random_ops=2000):
+        """
+        Storage benchmark on a specific drive (a mountpoint from HardwareScraper.get_disk_info).
+        Reports MB/s and IOPS for sequential write/read, 4K random read/write and a
+        block-size sweep, with fsync and O_DIRECT where the filesystem supports it.
+        """
+        target_dir = pick_test_dir(mountpoint)
+        try:
+            results = run_storage_benchmark(target_dir, file_size_mb=file_size_mb, direct=direct,
+                                            random_ops=random_ops, cancel=self.cancel)
+        except OSError as e:
+            if target_dir == pick_test_dir(None):
+                raise
+            # Mountpoint not writable (e.g. a drive root without admin rights): use the temp dir instead
+            print(f"[WARNING] Cannot write to {target_dir} ({e}). Testing the temp directory instead.")
+            results = run_storage_benchmark(pick_test_dir(None), file_size_mb=file_size_mb, direct=direct,
+                                            random_ops=random_ops, cancel=self.cancel)
+        results["mountpoint"] = mountpoint
+        return results
+
+    @traced("benchmark.network")
     def run_network_test(self):
+        """
+        Measures download/upload Mbps and latency percentiles with the configured probe backend.
+        When the probe fails, "available" is False and the values are None instead of 0,
+        so an unreachable network is never mistaken for a fast one.
+        """
         try:
-            st = speedtest.Speedtest()
-            st.get_best_server()
-            download_speed = st.download() / 1_000_000 # Mbps
-            ping = st.results.ping
-            return {"download_mbps": int(download_speed), "ping_ms": ping} 
-        except Exception as e:
+            backend = make_backend(self.network_endpoint)
+        except ValueError as e:
             print(f"[ERROR] Network test failed: {e}")
-            return {"download_mbps": 0, "ping_ms": 0}
+            return {"available": False, "download_mbps": None, "upload_mbps": None, "ping_ms": None}
+
+        result = backend.measure()
+        if not result["available"]:
+            print(f"[ERROR] Network test failed: {result['error']}")
+        return result
 
+    @traced("benchmark.battery")
     def get_battery_health(self):
         """Returns battery percentage and power plug status."""
         battery = psutil.sensors_battery()
@@ -80,47 +158,215 @@ class BenchmarkEngine:
         else:
             return None
         
-    def run_thermal_stability_test(self):
+    @traced("benchmark.thermal")
+    def run_thermal_stability_test(self, duration=10, interval=0.25, throttle_ratio=0.9):
         """
-        Evaluates CPU thermal stability by measuring frequency drop under load.
-        This detects if the system is 'throttling' due to heat.
+        Evaluates CPU thermal stability under a sustained all-core load.
+        A background sampler records per-core clocks, utilization and temperature the whole
+        time, so throttling that starts and recovers mid-run is not missed.
+        Returns time-to-throttle, the sustained-vs-peak clock ratio and a downsampled trace.
         """
-        # Capture the initial CPU clock speed (in MHz) before the stress
-        initial_speed = psutil.cpu_freq().current
-        
-        # Apply a short-term synthetic load to heat up the processor
-        # We use a lower limit for a quick 5-10 second diagnostic
-        self.run_cpu_stress_test(limit=500000)
-        
-        # Capture the final CPU clock speed after the stress period
-        final_speed = psutil.cpu_freq().current
-        
-        # Calculate the stability ratio. 
+        sampler = ThermalSampler(interval=interval)
+        sampler.start()
+        try:
+            run_sustained_load(duration, workers=self.isolation and self.isolation.workers(),
+                               cancel=self.cancel, pool_options=self._pool_options())
+        finally:
+            sampler.stop()
+
+        rows = sampler.buffer.rows()
+        result = analyze_thermal_trace(rows, throttle_ratio=throttle_ratio)
         # A result near 100% indicates excellent cooling/thermal management.
-        stability = (final_speed / initial_speed) * 100
-        
-        # Return the stability percentage rounded for clean reporting
-        return round(stability, 2)
-
-    def run_all_benchmarks(self):
-        # Step 1: Run all tests sequentially (this may take some time)
-        cpu_time = self.run_cpu_stress_test()
-        ram_time = self.run_ram_latency_test()
-        disk_time = self.run_disk_test()
-        stability = self.run_thermal_stability_test()
-        network = self.run_network_test()
-        battery = self.get_battery_health()
-
-        # Step 2: Pack the data into a standardized dictionary
-        benchmark_data = {
-            "cpu_stress_time": cpu_time,         
-            "ram_test_speed": ram_time,          
-            "disk_test_speed": disk_time,        
-            "thermal_deviation": round(100 - stability, 2), # Calculated by subtracting stability from 100
-            "network_test_speed": network["ping_ms"], 
-            "is_plugged": battery["power_plugged"] if battery else True,
-            "battery_percent": battery["percent"] if battery else 100,
-            "battery_secs_left": battery["seconds_left"] if battery else -1
-        }
-        
-        return benchmark_data
\ No newline at end of file
+        ratio = result["sustained_ratio"]
+        result["stability_pct"] = round(ratio * 100, 2) if ratio is not None else None
+        result["samples"] = len(rows)
+        result["trace"] = downsample(rows)
+        return result
+
+    @traced("benchmark.gpu")
+    def run_gpu_test(self, duration=8):
+        """
+        Sustained GPU compute throughput (GFLOPS), device copy bandwidth and throttling,
+        through CUDA (CuPy) or OpenCL (pyopencl). On machines without either, "available"
+        is False and "reason" says "no GPU acceleration" instead of failing the run.
+        """
+        result = run_gpu_benchmark(duration=duration, cancel=self.cancel)
+        if not result["available"]:
+            print(f"[INFO] GPU compute test skipped: {result['reason']}")
+        return result
+
+    def _largest_free_mountpoint(self):
+        """Falls back to the drive with the most free space when no install drive was given."""
+        from backend.scraper import HardwareScraper
+
+        disks = [d for d in HardwareScraper().get_disk_info() if isinstance(d["free_gb"], (int, float))]
+        if not disks:
+            return None
+        return max(disks, key=lambda d: d["free_gb"])["mountpoint"]
+
+    def _pack_phase(self, name, result):
+        """The slice of the run_all_benchmarks() dictionary that one phase produces."""
+        if name == "cpu_kernels":
+            return {"cpu_kernels": {kernel: r["normalized"] for kernel, r in (result or {}).items()}}
+        if name == "multicore":
+            multicore = result or {}
+            return {
+                "cpu_single_core_time": multicore.get("single_core_time"),
+                "cpu_multi_core_time": multicore.get("all_core_time"),
+                "cpu_multi_core_index": multicore.get("multi_core_index"),
+                "cpu_scaling_efficiency": multicore.get("scaling_efficiency", 0),
+                "cpu_core_count": multicore.get("workers", 1),
+            }
+        if name == "memory":
+            memory = result or {}
+            return {
+                "ram_read_gbps": memory.get("read_gbps", 0),
+                "ram_write_gbps": memory.get("write_gbps", 0),
+                "ram_copy_gbps": memory.get("copy_gbps", 0),
+                "ram_latency_ns": memory.get("latency_ns", 999),
+                "ram_latency_sweep": memory.get("latency_sweep", {}),
+            }
+        if name == "storage":
+            storage = result or {}
+            return {
+                "disk_seq_write_mbps": storage.get("seq_write_mbps", 0),
+                "disk_seq_read_mbps": storage.get("seq_read_mbps", 0),
+                "disk_rand_read_iops": storage.get("rand_read_iops", 0),
+                "disk_rand_write_iops": storage.get("rand_write_iops", 0),
+                "disk_block_sweep_mbps": storage.get("block_sweep_mbps", {}),
+                "disk_direct_io": storage.get("direct_io", False),
+                "disk_target": storage.get("target"),
+            }
+        if name == "thermal":
+            thermal = result or {}
+            return {
+                # Calculated by subtracting stability from 100; None when clocks can't be read on this platform
+                "thermal_deviation": round(100 - thermal["stability_pct"], 2) if thermal.get("stability_pct") is not None else None,
+                "thermal_time_to_throttle_s": thermal.get("time_to_throttle_s"),
+                "thermal_max_temp_c": thermal.get("max_temp_c", 0),
+                "thermal_trace": thermal.get("trace", []),
+            }
+        if name == "gpu":
+            gpu = result or {"available": False}
+            return {
+                "gpu_available": gpu["available"],
+                "gpu_backend": gpu.get("backend"),
+                "gpu_gflops": gpu.get("gflops"),
+                "gpu_bandwidth_gbps": gpu.get("bandwidth_gbps"),
+                "gpu_sustained_ratio": gpu.get("sustained_ratio"),
+                "gpu_max_temp_c": gpu.get("max_temp_c"),
+            }
+        if name == "workload_replay":
+            return {"workload_replay": result or {}}
+        if name == "network":
+            network = result or {"available": False}
+            return {
+                "network_available": network["available"],
+                "network_download_mbps": network.get("download_mbps"),
+                "network_upload_mbps": network.get("upload_mbps"),
+                "network_ping_ms": network.get("ping_ms"),
+                "network_latency_p90_ms": network.get("latency_p90_ms"),
+            }
+        if name == "battery":
+            return {
+                "is_plugged": result["power_plugged"] if result else True,
+                "battery_percent": result["percent"] if result else 100,
+                "battery_secs_left": result["seconds_left"] if result else -1,
+            }
+        return {} # Helper phases (disk_info) have nothing to report
+
+    @traced("benchmark.replay")
+    def run_workload_replay(self, stages, durations=None, target_mountpoint=None, budget_s=None):
+        """
+        Replays the kind of work an app does (its workload_profile in requirements.json):
+        parallel small-file reads, a compile-like build, BLAS matrix multiplies and/or an
+        all-core render loop. stages: names from replay.STAGES; durations overrides the
+        seconds per stage and budget_s caps them all together (see run_replay).
+        Returns {stage: result}, each with an "index" (1.0 = reference machine).
+        """
+        return run_replay(stages, durations=durations, workers=self.isolation and self.isolation.workers(),
+                          pool_options=self._pool_options(), directory=pick_test_dir(target_mountpoint),
+                          cancel=self.cancel, budget_s=budget_s)
+
+    @traced("benchmark")
+    def run_all_benchmarks(self, target_mountpoint=None, on_progress=None, cancel=None, replay_stages=None):
+        """
+        Runs every benchmark and packs the results into one dictionary.
+        target_mountpoint selects the drive for the storage test (usually the install drive).
+        on_progress(phase, completed, total, partial) is called as each phase finishes, with
+        that phase's part of the final dictionary, so a UI can fill in results incrementally.
+        cancel: CancelToken; once cancelled the running phase stops at its next check, its
+        temporary files and worker processes are cleaned up and BenchmarkCancelled is raised.
+        replay_stages: workload replay stages to add (see DecisionEngine.replay_stages()).
+        """
+        self.cancel = cancel or CancelToken()
+
+        # Step 1: Run the tests. Compute tests (CPU, RAM, storage, thermal) run one after
+        # another so they don't disturb each other; I/O-bound probes overlap with them.
+        tasks = [
+            Task("network", self.run_network_test, lane=IO),
+            Task("battery", self.get_battery_health, lane=IO),
+            Task("disk_info", lambda: target_mountpoint or self._largest_free_mountpoint(), lane=IO),
+            Task("cpu_kernels", self.run_cpu_kernel_suite),
+            Task("multicore", lambda kernels: self.run_multicore_cpu_test(single_core_result=kernels["branchy_compile"]),
+                 depends_on=["cpu_kernels"]),
+            Task("memory", self.run_memory_subsystem_test),
+            Task("thermal", self.run_thermal_stability_test),
+            Task("gpu", self.run_gpu_test),
+            Task("storage", lambda mountpoint: self.run_storage_test(mountpoint=mountpoint), depends_on=["disk_info"]),
+        ]
+        if replay_stages:
+            tasks.append(Task("workload_replay", lambda mountpoint: self.run_workload_replay(replay_stages, target_mountpoint=mountpoint),
+                              depends_on=["disk_info"]))
+
+        # Step 2: Pack each phase into the standardized dictionary as soon as it finishes
+        benchmark_data = {}
+        completed = []
+
+        def on_done(name, result):
+            packed = self._pack_phase(name, result)
+            benchmark_data.update(packed)
+            completed.append(name)
+            if on_progress:
+                on_progress(name, len(completed), len(tasks), packed)
+
+        with self._isolated():
+            results, schedule = PhaseScheduler().run(tasks, on_done=on_done, cancel=self.cancel)
+        for name, error in schedule["errors"].items():
+            print(f"[ERROR] Benchmark phase '{name}' failed: {error}")
+
+        benchmark_data["schedule"] = schedule
+        return self._annotate_isolation(benchmark_data)
+
+    @traced("benchmark.adaptive")
+    def run_adaptive(self, preset="quick", target_mountpoint=None, on_progress=None, cancel=None, replay_stages=None):
+        """
+        Runs the benchmarks repeatedly until each result is statistically stable or the
+        preset's time budget ("quick": under 5s, "thorough": a few minutes) runs out.
+        Returns the run_all_benchmarks() dictionary (medians) plus "stats" and "uncertainty".
+        """
+        self.cancel = cancel or CancelToken()
+        with self._isolated():
+            benchmark_data = AdaptiveRunner(self, preset).run(target_mountpoint=target_mountpoint, on_progress=on_progress,
+                                                              cancel=self.cancel, replay_stages=replay_stages)
+        return self._annotate_isolation(benchmark_data)
+
+    def _pool_options(self):
+        return self.isolation.pool_options() if self.isolation else {}
+
+    @contextlib.contextmanager
+    def _isolated(self):
+        """Applies the isolation settings (if any) for the duration of a run."""
+        if self.isolation is None:
+            yield
+            return
+        self.isolation.apply(cancel=self.cancel)
+        try:
+            yield
+        finally:
+            self.isolation.restore()
+
+    def _annotate_isolation(self, benchmark_data):
+        if self.isolation is not None:
+            benchmark_data["isolation"] = self.isolation.report()
+        return benchmark_data
@@ -0,0 +1,53 @@
+import os
+import json
+import time
+import tempfile
+
+from backend.fingerprint import app_data_dir
+
+
+class SpecCache:
+    """
+    On-disk JSON cache for static hardware facts (CPU model, total RAM, GPU name/VRAM).
+    An entry is only valid for the machine fingerprint it was stored under and for `ttl`
+    seconds; invalidate() drops it explicitly.
+    """
+    def __init__(self, path=None, ttl=7 * 24 * 3600):
+        self.path = path or os.path.join(app_data_dir(), "spec_cache.json")
+        self.ttl = ttl
+
+    def get(self, fingerprint):
+        """Returns the cached specs for this fingerprint, or None if missing/stale."""
+        try:
+            with open(self.path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if entry.get("fingerprint") != fingerprint:
+            return None
+        if time.time() - entry.get("created", 0) > self.ttl:
+            return None
+        return entry.get("specs")
+
+    def put(self, fingerprint, specs):
+        entry = {"fingerprint": fingerprint, "created": time.time(), "specs": specs}
+        # Write to a temp file and rename, so a crash never leaves a half-written cache
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[WARNING] Could not write spec cache: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def invalidate(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,42 @@
+import threading
+import multiprocessing
+
+
+class BenchmarkCancelled(Exception):
+    """Raised inside a benchmark when its CancelToken was cancelled."""
+
+
+class CancelToken:
+    """
+    Cooperative cancellation flag shared between the caller (e.g. the GUI thread) and a
+    running benchmark. Hot loops call check(), which raises BenchmarkCancelled once
+    cancel() was called; cleanup then happens in the benchmarks' normal finally blocks.
+    """
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise BenchmarkCancelled()
+
+
+def pool_map(pool, func, iterable, cancel=None, chunksize=1, poll=0.1):
+    """
+    pool.map() that can be cancelled: waits in short slices and terminates the pool's
+    worker processes as soon as the token is cancelled (they can't check it themselves).
+    """
+    async_result = pool.map_async(func, iterable, chunksize=chunksize)
+    while True:
+        try:
+            return async_result.get(poll)
+        except multiprocessing.TimeoutError:
+            if cancel and cancel.cancelled:
+                pool.terminate()
+                raise BenchmarkCancelled()
@@ -0,0 +1,234 @@
+import os
+import re
+import json
+import sqlite3
+import difflib
+import hashlib
+import threading
+from collections.abc import Mapping
+
+from backend.fingerprint import app_data_dir
+
+
+# Numeric requirement columns; these are the only fields range queries may filter on
+NUMERIC_FIELDS = ("min_ram", "rec_ram", "min_vram", "rec_vram", "min_storage")
+_FORMAT_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE apps (
+    position INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    base_key TEXT NOT NULL,
+    version TEXT,
+    version_key TEXT,
+    edition TEXT,
+    min_ram REAL, rec_ram REAL, min_vram REAL, rec_vram REAL, min_storage REAL,
+    os_version TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX idx_apps_base_version ON apps(base_key, version_key);
+CREATE INDEX idx_apps_min_ram_vram ON apps(min_ram, min_vram);
+CREATE INDEX idx_apps_min_vram ON apps(min_vram);
+CREATE INDEX idx_apps_rec_ram_vram ON apps(rec_ram, rec_vram);
+CREATE INDEX idx_apps_min_storage ON apps(min_storage);
+"""
+
+# Trailing token that looks like a version: a year (2026) or a short/dotted number (5, 2.1).
+# Three-digit product numbers such as "Fusion 360" are part of the name.
+_VERSION_SUFFIX = re.compile(r"^(.*?)\s+v?((?:19|20)\d\d(?:\.\d+)*|\d{1,2}(?:\.\d+)*)$", re.IGNORECASE)
+_CONSTRAINT = re.compile(r"^\s*(>=|<=|==|>|<)?\s*v?([\d.]+)\s*$")
+
+
+def normalize_name(name):
+    """Lower-case alphanumerics only: "AutoCAD  2026" and "autocad-2026" compare equal."""
+    return re.sub(r"[^a-z0-9]+", "", name.lower())
+
+
+def version_key(version):
+    """Sortable string for a dotted version ("5.1" -> "000005.000001")."""
+    if not version:
+        return ""
+    parts = re.findall(r"\d+", str(version))
+    return ".".join(part.zfill(6) for part in parts)
+
+
+def split_name(display_name, entry):
+    """Returns (base name, version, edition); explicit JSON fields win over the display name."""
+    base, version = display_name, entry.get("version")
+    match = _VERSION_SUFFIX.match(display_name)
+    if match:
+        base = match.group(1)
+        version = version or match.group(2)
+    return entry.get("name", base), (str(version) if version is not None else None), entry.get("edition")
+
+
+class RequirementsCatalog(Mapping):
+    """
+    Requirements catalog compiled from requirements.json into an indexed SQLite file.
+    Behaves like the old {app name: requirements} dict, but loads lazily, recompiles
+    only when the JSON changes, and supports version-aware / fuzzy lookup and indexed
+    range queries over the numeric requirement fields.
+    """
+    def __init__(self, json_path="data/requirements.json", compiled_path=None):
+        # Fail early (as json.load used to) if the source catalog is missing
+        os.stat(json_path)
+        self.json_path = os.path.abspath(json_path)
+        if compiled_path is None:
+            digest = hashlib.sha1(self.json_path.encode()).hexdigest()[:12]
+            compiled_path = os.path.join(app_data_dir(), f"catalog-{digest}.sqlite")
+        self.compiled_path = compiled_path
+        self._conn = None
+        self._lock = threading.Lock()
+        # One connection shared by the GUI, worker and agent threads; queries take turns
+        self._query_lock = threading.Lock()
+        self._cache = {} # name -> JSON text; every lookup returns a fresh dict
+        self._base_names = None
+
+    # --- Compilation -------------------------------------------------------
+
+    def _source_stamp(self):
+        stat = os.stat(self.json_path)
+        return f"{_FORMAT_VERSION}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def _connect(self):
+        if self._conn is not None:
+            return self._conn
+        with self._lock:
+            if self._conn is None:
+                stamp = self._source_stamp()
+                conn = self._open_compiled(stamp)
+                if conn is None:
+                    conn = self._compile(stamp)
+                self._conn = conn
+        return self._conn
+
+    def _open_compiled(self, stamp):
+        if not os.path.exists(self.compiled_path):
+            return None
+        try:
+            conn = sqlite3.connect(self.compiled_path, check_same_thread=False)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+            if row and row[0] == stamp:
+                return conn
+            conn.close()
+        except sqlite3.DatabaseError:
+            pass
+        return None
+
+    def _compile(self, stamp):
+        with open(self.json_path, "r") as f:
+            software_info = json.load(f)
+
+        rows = []
+        for position, (display_name, entry) in enumerate(software_info.items()):
+            base, version, edition = split_name(display_name, entry)
+            # Missing minimums mean "no requirement"; a missing recommendation falls back to the minimum
+            numbers = {field: entry.get(field, 0) for field in ("min_ram", "min_vram", "min_storage")}
+            numbers["rec_ram"] = entry.get("rec_ram", numbers["min_ram"])
+            numbers["rec_vram"] = entry.get("rec_vram", numbers["min_vram"])
+            rows.append((
+                position, display_name, normalize_name(base), version, version_key(version), edition,
+                *(numbers[field] for field in NUMERIC_FIELDS),
+                entry.get("os_version", "Any"), json.dumps(entry)
+            ))
+
+        # Build next to the target and swap in, so readers never see a half-built catalog
+        tmp_path = f"{self.compiled_path}.{os.getpid()}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        conn = sqlite3.connect(tmp_path)
+        with conn:
+            conn.executescript(_SCHEMA)
+            conn.executemany(f"INSERT INTO apps VALUES ({', '.join('?' * 13)})", rows)
+            conn.execute("INSERT INTO meta VALUES ('source', ?)", (stamp,))
+        conn.close()
+        os.replace(tmp_path, self.compiled_path)
+        return sqlite3.connect(self.compiled_path, check_same_thread=False)
+
+    def _query(self, sql, params=()):
+        conn = self._connect()
+        with self._query_lock:
+            return conn.execute(sql, params).fetchall()
+
+    # --- Mapping interface (drop-in for the old dict) ------------------------
+
+    def __getitem__(self, name):
+        data = self._cache.get(name)
+        if data is None:
+            rows = self._query("SELECT data FROM apps WHERE name = ?", (name,))
+            if not rows:
+                raise KeyError(name)
+            data = self._cache[name] = rows[0][0]
+        # Parsed per call so a caller changing its copy can't alter the catalog
+        return json.loads(data)
+
+    def __iter__(self):
+        rows = self._query("SELECT name FROM apps ORDER BY position")
+        return iter([name for (name,) in rows])
+
+    def __len__(self):
+        return self._query("SELECT COUNT(*) FROM apps")[0][0]
+
+    def items(self):
+        """All (name, requirements) pairs in catalog order, in one query."""
+        rows = self._query("SELECT name, data FROM apps ORDER BY position")
+        return [(name, json.loads(data)) for name, data in rows]
+
+    # --- Queries -----------------------------------------------------------
+
+    def lookup(self, query, version=None, edition=None):
+        """
+        Finds an app by display name, base name + version, or a close spelling.
+        version may be exact ("2026") or a constraint (">=2025"); without one the newest
+        version wins. Returns (display_name, requirements) or None.
+        """
+        if query in self:
+            return query, self[query]
+
+        base, parsed_version, _ = split_name(query, {})
+        version = version or parsed_version
+        base_key = normalize_name(base)
+        candidates = self._query(
+            "SELECT name, version_key, edition FROM apps WHERE base_key = ? ORDER BY version_key DESC",
+            (base_key,))
+
+        if not candidates:
+            # Fuzzy match on base names only (thousands of strings, not every version)
+            if self._base_names is None:
+                self._base_names = [key for (key,) in self._query("SELECT DISTINCT base_key FROM apps")]
+            close = difflib.get_close_matches(base_key, self._base_names, n=1, cutoff=0.75)
+            if not close:
+                return None
+            candidates = self._query(
+                "SELECT name, version_key, edition FROM apps WHERE base_key = ? ORDER BY version_key DESC",
+                (close[0],))
+
+        if edition:
+            candidates = [c for c in candidates if (c[2] or "").lower() == edition.lower()] or candidates
+
+        if version:
+            match = _CONSTRAINT.match(str(version))
+            op, wanted = (match.group(1) or "==", version_key(match.group(2))) if match else ("==", version_key(version))
+            checks = {
+                "==": lambda v: v == wanted, ">=": lambda v: v >= wanted, "<=": lambda v: v <= wanted,
+                ">": lambda v: v > wanted, "<": lambda v: v < wanted,
+            }
+            candidates = [c for c in candidates if c[1] and checks[op](c[1])]
+
+        if not candidates:
+            return None
+        return candidates[0][0], self[candidates[0][0]]
+
+    def find(self, **limits):
+        """
+        Indexed range query: every app whose requirement fields are all <= the given limits,
+        e.g. find(min_ram=16, min_vram=4). Returns display names in catalog order.
+        """
+        unknown = set(limits) - set(NUMERIC_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown requirement fields: {sorted(unknown)}")
+
+        where = " AND ".join(f"{field} <= ?" for field in limits) or "1"
+        rows = self._query(f"SELECT name FROM apps WHERE {where} ORDER BY position", tuple(limits.values()))
+        return [name for (name,) in rows]
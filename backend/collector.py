@@ -0,0 +1,406 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.catalog import RequirementsCatalog
+from backend.fingerprint import app_data_dir
+from backend.fleet import evaluate_fleet
+from backend.scraper import UNKNOWN
+from backend.store import ResultStore
+from backend.jsonapi import JsonApiServer, HTTPError, encode
+
+
+# Machine ids per "IN (...)" query, below SQLite's bound-parameter limit
+_ID_CHUNK = 500
+# Spec fields the compatibility check reads as numbers
+_NUMERIC_SPECS = ("total_ram_gb", "available_ram_gb", "vram_gb")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fleet_machines (
+    machine_id TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    received REAL NOT NULL,
+    payload_hash TEXT NOT NULL,
+    specs TEXT
+);
+CREATE TABLE IF NOT EXISTS fleet_compat (
+    app TEXT NOT NULL,
+    machine_id TEXT NOT NULL,
+    compatible_min INTEGER NOT NULL,
+    compatible_rec INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    PRIMARY KEY (app, machine_id)
+);
+CREATE INDEX IF NOT EXISTS idx_fleet_compat_min ON fleet_compat(app, compatible_min);
+CREATE INDEX IF NOT EXISTS idx_fleet_compat_rec ON fleet_compat(app, compatible_rec);
+CREATE INDEX IF NOT EXISTS idx_fleet_compat_machine ON fleet_compat(machine_id);
+CREATE TABLE IF NOT EXISTS fleet_rollup (
+    app TEXT PRIMARY KEY,
+    machines INTEGER NOT NULL,
+    compatible_min INTEGER NOT NULL,
+    compatible_rec INTEGER NOT NULL,
+    score_sum INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fleet_meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def _chunks(items, size=_ID_CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _valid_number(value):
+    # A probe that failed or timed out reports UNKNOWN (or nothing) instead of a number
+    return value is None or value == UNKNOWN or (isinstance(value, (int, float)) and not isinstance(value, bool))
+
+
+def valid_specs(specs):
+    """Whether the fields the compatibility check reads have the types get_all_specs() gives them."""
+    if not isinstance(specs, dict) or not all(_valid_number(specs.get(key)) for key in _NUMERIC_SPECS):
+        return False
+    if not isinstance(specs.get("os_name", ""), (str, type(None))):
+        return False
+    disks = specs.get("disks", [])
+    return isinstance(disks, list) and all(isinstance(d, dict) and _valid_number(d.get("free_gb")) for d in disks)
+
+
+def parse_submission(body):
+    """
+    A submission body as a list of result payloads: one JSON object, a JSON list,
+    {"results": [...]}, or JSON lines (one object per line, blank lines ignored).
+    """
+    text = body.decode() if isinstance(body, bytes) else body
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = [json.loads(line) for line in text.splitlines() if line.strip()]
+    if isinstance(data, dict):
+        data = data.get("results", [data])
+    if not isinstance(data, list):
+        raise ValueError("Expected a result object, a list of them, or JSON lines")
+    return data
+
+
+class Collector:
+    """
+    Central store for results submitted by many Rig-Engineer instances.
+
+    A result is the agent's /latest payload: {"machine_id", "finished" (or "created"),
+    "specs": get_all_specs(), "benchmark": run_all_benchmarks()}. Each machine keeps only
+    its newest result (resubmissions and older results are skipped); accepted benchmarks
+    also go to the runs/metrics history of ResultStore in the same database.
+    Per-(app, machine) compatibility and per-app counts are updated incrementally as
+    results arrive, so fleet questions are indexed lookups instead of a rescoring pass.
+    The SQLite connection belongs to the thread that created the Collector.
+    """
+    def __init__(self, path=None, requirements_path="data/requirements.json"):
+        self.store = ResultStore(path or os.path.join(app_data_dir(), "fleet.sqlite"))
+        self.conn = self.store.conn
+        self.conn.executescript(_SCHEMA)
+        self.catalog = RequirementsCatalog(requirements_path)
+        self._apps = self.catalog.items()
+        self._catalog_hash = hashlib.sha1(json.dumps(self._apps, sort_keys=True).encode()).hexdigest()
+
+        row = self.conn.execute("SELECT value FROM fleet_meta WHERE key = 'catalog'").fetchone()
+        if not row or row[0] != self._catalog_hash:
+            self.rebuild_rollups()
+
+    def close(self):
+        self.store.close()
+
+    # --- Ingest --------------------------------------------------------------
+
+    def _existing(self, machine_ids):
+        existing = {}
+        for chunk in _chunks(machine_ids):
+            rows = self.conn.execute(
+                f"SELECT machine_id, created, payload_hash FROM fleet_machines "
+                f"WHERE machine_id IN ({', '.join('?' * len(chunk))})", chunk)
+            existing.update((m, (created, digest)) for m, created, digest in rows)
+        return existing
+
+    def _old_compat(self, machine_ids):
+        old = {}
+        for chunk in _chunks(machine_ids):
+            rows = self.conn.execute(
+                f"SELECT app, machine_id, compatible_min, compatible_rec, score FROM fleet_compat "
+                f"WHERE machine_id IN ({', '.join('?' * len(chunk))})", chunk)
+            old.update(((app, m), values) for app, m, *values in rows)
+        return old
+
+    def _compat_rows(self, records):
+        """(app, machine_id, compatible_min, compatible_rec, score) for every app x record."""
+        by_min = evaluate_fleet(records, self._apps, tier="min")
+        by_rec = evaluate_fleet(records, self._apps, tier="rec")
+        compatible_min, compatible_rec, scores = (
+            m.tolist() if hasattr(m, "tolist") else m
+            for m in (by_min.compatible, by_rec.compatible, by_min.score))
+        rows = []
+        for i, machine in enumerate(by_min.machine_ids):
+            for j, app in enumerate(by_min.app_names):
+                rows.append((app, machine, int(compatible_min[i][j]), int(compatible_rec[i][j]), int(scores[i][j])))
+        return rows
+
+    def ingest(self, payloads, received=None):
+        """
+        Stores a batch of results in one transaction. Returns one status per payload:
+        "stored", "duplicate" (same payload as stored), "stale" (older than what is stored,
+        or superseded by a newer result for the same machine in the batch) or "invalid"
+        (no machine_id, or specs that fail valid_specs()).
+        """
+        received = received or time.time()
+        statuses = ["invalid"] * len(payloads)
+        newest = {}
+        for index, payload in enumerate(payloads):
+            if not (isinstance(payload, dict) and isinstance(payload.get("machine_id"), str)
+                    and valid_specs(payload.get("specs"))):
+                continue
+            created = payload.get("finished") or payload.get("created") or received
+            if not isinstance(created, (int, float)):
+                continue
+            statuses[index] = "stale"
+            current = newest.get(payload["machine_id"])
+            if current is None or created >= current[1]:
+                newest[payload["machine_id"]] = (index, created)
+
+        existing = self._existing(list(newest))
+        accepted = []
+        for machine, (index, created) in newest.items():
+            digest = hashlib.sha1(json.dumps(payloads[index], sort_keys=True, default=str).encode()).hexdigest()
+            if machine in existing:
+                if existing[machine][1] == digest:
+                    statuses[index] = "duplicate"
+                    continue
+                if created < existing[machine][0]:
+                    continue
+            statuses[index] = "stored"
+            accepted.append((machine, created, digest, payloads[index]))
+
+        if accepted:
+            records = [dict(p["specs"], machine_id=m) for m, _, _, p in accepted]
+            compat_rows = self._compat_rows(records)
+            old = self._old_compat([m for m, _, _, _ in accepted])
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO fleet_machines (machine_id, created, received, payload_hash, specs) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(m, created, received, digest, json.dumps(p["specs"])) for m, created, digest, p in accepted])
+                self.store.insert_runs([
+                    {"machine_id": m, "benchmark_data": p["benchmark"], "scraper_data": p["specs"], "created": created}
+                    for m, created, _, p in accepted if isinstance(p.get("benchmark"), dict)])
+                self.conn.executemany("INSERT OR REPLACE INTO fleet_compat VALUES (?, ?, ?, ?, ?)", compat_rows)
+                self._apply_deltas(compat_rows, old)
+        return statuses
+
+    def _apply_deltas(self, compat_rows, old):
+        """Adds the change each new (app, machine) row makes to the per-app counts."""
+        deltas = {}
+        for app, machine, ok_min, ok_rec, score in compat_rows:
+            delta = deltas.setdefault(app, [0, 0, 0, 0])
+            previous = old.get((app, machine))
+            if previous is None:
+                delta[0] += 1
+                previous = (0, 0, 0)
+            delta[1] += ok_min - previous[0]
+            delta[2] += ok_rec - previous[1]
+            delta[3] += score - previous[2]
+        self.conn.executemany(
+            "INSERT INTO fleet_rollup (app, machines, compatible_min, compatible_rec, score_sum) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(app) DO UPDATE SET machines = machines + excluded.machines, "
+            "compatible_min = compatible_min + excluded.compatible_min, "
+            "compatible_rec = compatible_rec + excluded.compatible_rec, score_sum = score_sum + excluded.score_sum",
+            [(app, *delta) for app, delta in deltas.items()])
+
+    def rebuild_rollups(self):
+        """Rescores every stored machine; only needed when the requirements catalog changes."""
+        records = [dict(json.loads(specs), machine_id=m)
+                   for m, specs in self.conn.execute("SELECT machine_id, specs FROM fleet_machines")]
+        compat_rows = self._compat_rows(records) if records else []
+        with self.conn:
+            self.conn.execute("DELETE FROM fleet_compat")
+            self.conn.execute("DELETE FROM fleet_rollup")
+            self.conn.executemany("INSERT INTO fleet_compat VALUES (?, ?, ?, ?, ?)", compat_rows)
+            self._apply_deltas(compat_rows, {})
+            self.conn.execute("INSERT OR REPLACE INTO fleet_meta VALUES ('catalog', ?)", (self._catalog_hash,))
+
+    def ingest_spool(self, directory):
+        """
+        Ingests every *.jsonl file in directory as one batch and deletes the files.
+        Producers should write under another name and rename to .jsonl when complete.
+        Unreadable files are renamed to .bad. Returns the statuses, or [] if there was nothing.
+        """
+        payloads, done = [], []
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".jsonl"):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                with open(path, "rb") as f:
+                    payloads.extend(parse_submission(f.read()))
+                done.append(path)
+            except (OSError, ValueError) as e:
+                print(f"[WARNING] Skipping spool file {name}: {e}")
+                os.replace(path, path[:-len(".jsonl")] + ".bad")
+        if not payloads:
+            return []
+        statuses = self.ingest(payloads)
+        for path in done:
+            os.remove(path)
+        return statuses
+
+    # --- Queries -------------------------------------------------------------
+
+    def machines_for(self, app, tier="min"):
+        """Machine ids that meet the app's minimum (or recommended, tier="rec") requirements."""
+        if tier not in ("min", "rec"):
+            raise ValueError("tier must be 'min' or 'rec'")
+        rows = self.conn.execute(
+            f"SELECT machine_id FROM fleet_compat WHERE app = ? AND compatible_{tier} = 1 ORDER BY machine_id", (app,))
+        return [m for (m,) in rows]
+
+    def rollup(self):
+        """Per-app fleet counts in catalog order: machines, compatible_min/rec, avg_score."""
+        rows = {app: (machines, ok_min, ok_rec, score_sum) for app, machines, ok_min, ok_rec, score_sum
+                in self.conn.execute("SELECT * FROM fleet_rollup")}
+        summary = []
+        for app, _ in self._apps:
+            machines, ok_min, ok_rec, score_sum = rows.get(app, (0, 0, 0, 0))
+            summary.append({
+                "app": app,
+                "machines": machines,
+                "compatible_min": ok_min,
+                "compatible_rec": ok_rec,
+                "avg_score": round(score_sum / machines, 1) if machines else None,
+            })
+        return summary
+
+
+class CollectorServer:
+    """
+    HTTP front end for a Collector.
+
+    POST /submit              results as JSON, a JSON list or JSON lines; answers with per-status counts
+    GET  /rollup              per-app counts
+    GET  /machines?app=Ansys  machines that can run an app (&tier=rec for the recommended spec)
+    GET  /health
+
+    Submissions that arrive while a batch is being written are queued and written
+    together in the next transaction (group commit), so many small submissions from
+    many agents cost a few transactions rather than one each. All database work runs
+    on one thread.
+    """
+    def __init__(self, path=None, requirements_path="data/requirements.json", spool_dir=None, spool_every=10):
+        self.path = path
+        self.requirements_path = requirements_path
+        self.spool_dir = spool_dir
+        self.spool_every = spool_every
+        self.collector = None
+        self._db = ThreadPoolExecutor(max_workers=1)
+        self._pending = []
+        self._flushing = False
+        self._rollup_body = None
+
+    async def _call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._db, fn, *args)
+
+    async def submit(self, payloads):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((payloads, future))
+        if not self._flushing:
+            self._flushing = True
+            asyncio.ensure_future(self._flush())
+        return await future
+
+    async def _flush(self):
+        try:
+            while self._pending:
+                batch, self._pending = self._pending, []
+                try:
+                    statuses = await self._call(self.collector.ingest, [p for payloads, _ in batch for p in payloads])
+                except Exception:
+                    # The batch was rolled back; write each submission on its own so only
+                    # the one that fails gets the error, not everyone queued with it
+                    await self._ingest_each(batch)
+                    continue
+                self._rollup_body = None
+                start = 0
+                for payloads, future in batch:
+                    future.set_result(statuses[start:start + len(payloads)])
+                    start += len(payloads)
+        finally:
+            self._flushing = False
+
+    async def _ingest_each(self, batch):
+        for payloads, future in batch:
+            try:
+                future.set_result(await self._call(self.collector.ingest, payloads))
+                self._rollup_body = None
+            except Exception as e:
+                future.set_exception(e)
+
+    async def _watch_spool(self):
+        while True:
+            try:
+                if await self._call(self.collector.ingest_spool, self.spool_dir):
+                    self._rollup_body = None
+            except Exception as e:
+                print(f"[ERROR] Spool ingest failed: {e}")
+            await asyncio.sleep(self.spool_every)
+
+    # --- API -----------------------------------------------------------------
+
+    async def _submit_handler(self, request):
+        try:
+            payloads = parse_submission(request.body)
+        except ValueError as e:
+            raise HTTPError(400, f"Invalid submission: {e}")
+        statuses = await self.submit(payloads)
+        return 200, {status: statuses.count(status) for status in ("stored", "duplicate", "stale", "invalid")}
+
+    async def _rollup_handler(self, request):
+        if self._rollup_body is None:
+            self._rollup_body = encode(await self._call(self.collector.rollup))
+        return 200, self._rollup_body
+
+    async def _machines_handler(self, request):
+        query, tier = request.query.get("app"), request.query.get("tier", "min")
+        if not query:
+            raise HTTPError(400, "Missing ?app=")
+        if tier not in ("min", "rec"):
+            raise HTTPError(400, "tier must be 'min' or 'rec'")
+        match = self.collector.catalog.lookup(query)
+        if match is None:
+            raise HTTPError(404, f"Unknown app '{query}'")
+        machines = await self._call(self.collector.machines_for, match[0], tier)
+        return 200, {"app": match[0], "tier": tier, "count": len(machines), "machines": machines}
+
+    async def _health(self, request):
+        return 200, {"ok": True}
+
+    def routes(self):
+        return {
+            ("POST", "/submit"): self._submit_handler,
+            ("GET", "/rollup"): self._rollup_handler,
+            ("GET", "/machines"): self._machines_handler,
+            ("GET", "/health"): self._health,
+        }
+
+    async def serve(self, host="127.0.0.1", port=8767):
+        # Created on the database thread, which owns the SQLite connection
+        self.collector = await self._call(Collector, self.path, self.requirements_path)
+        server = JsonApiServer(self.routes(), host, port)
+        await server.start()
+        print(f"Rig-Engineer collector listening on http://{server.host}:{server.port}")
+        spool = asyncio.ensure_future(self._watch_spool()) if self.spool_dir else None
+        try:
+            await server.serve_forever()
+        finally:
+            if spool:
+                spool.cancel()
+            server.close()
+            await self._call(self.collector.close)
+            self._db.shutdown()
@@ -0,0 +1,49 @@
+import os
+import uuid
+import hashlib
+import platform
+
+
+def app_data_dir():
+    """
+    Per-user directory for Rig-Engineer's caches and databases.
+    RIG_ENGINEER_HOME overrides the default location.
+    """
+    path = os.environ.get("RIG_ENGINEER_HOME")
+    if not path:
+        if platform.system() == "Windows":
+            base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+            path = os.path.join(base, "RigEngineer")
+        else:
+            base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+            path = os.path.join(base, "rig-engineer")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _digest(*parts):
+    return hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:16]
+
+
+def machine_id():
+    """Stable identifier for this machine (hostname, architecture and hardware MAC address)."""
+    return _digest(platform.node(), platform.machine(), uuid.getnode())
+
+
+def _boot_id():
+    import psutil
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            return f.read().strip()
+    except OSError:
+        return int(psutil.boot_time())
+
+
+def boot_fingerprint():
+    """
+    Cheap fingerprint of the current hardware/boot state: changes after a reboot, a CPU
+    change or a new/removed partition. Reads no disk usage and spawns no subprocesses.
+    """
+    import psutil
+    partitions = sorted((p.device, p.mountpoint, p.fstype) for p in psutil.disk_partitions())
+    return _digest(machine_id(), _boot_id(), psutil.cpu_count(), psutil.virtual_memory().total, partitions)
@@ -0,0 +1,212 @@
+import re
+import math
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# OS families; 0 in a requirement means "Any"
+_FAMILIES = {"windows": 1, "linux": 2, "darwin": 3}
+# Rows per block when comparing; bounds the temporary arrays to block x apps
+CHUNK_ROWS = 8192
+# The first version number in an OS name: "Windows 8.1" -> 8.1, "Windows 11 Pro" -> 11
+_VERSION = re.compile(r"\d+(?:\.\d+)?")
+
+
+def _number(value):
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else math.nan
+
+
+def parse_os(os_name):
+    """("Windows 10") -> (family code, numeric version). Unknown parts (or a non-string) are 0 / NaN."""
+    if not isinstance(os_name, str):
+        return 0, math.nan
+    family = next((code for name, code in _FAMILIES.items() if name in os_name.lower()), 0)
+    version = _VERSION.search(os_name)
+    return family, float(version.group()) if version else math.nan
+
+
+class FleetSpecs:
+    """
+    Machine spec records (get_all_specs() output + "machine_id") stored as columns:
+    one float array per requirement dimension, plus interned OS strings.
+    Unknown values are NaN, which never satisfies a requirement.
+    """
+    def __init__(self, machine_ids, ram, vram, storage, os_code, os_family, os_version, os_strings):
+        self.machine_ids = machine_ids
+        self.ram = ram
+        self.vram = vram
+        self.storage = storage
+        self.os_code = os_code
+        self.os_family = os_family
+        self.os_version = os_version
+        self.os_strings = os_strings
+
+    @classmethod
+    def from_records(cls, records):
+        os_strings = {}
+        parsed_os = {}
+        machine_ids = []
+        columns = {name: array("d") for name in ("ram", "vram", "storage", "os_family", "os_version")}
+        os_code = array("l")
+
+        for index, record in enumerate(records):
+            machine_ids.append(record.get("machine_id", index))
+            columns["ram"].append(_number(record.get("total_ram_gb")))
+            columns["vram"].append(_number(record.get("vram_gb")))
+            free = [_number(d.get("free_gb")) for d in record.get("disks", [])]
+            free = [f for f in free if not math.isnan(f)]
+            columns["storage"].append(max(free) if free else math.nan)
+
+            # Each distinct OS string is parsed once, however many machines share it
+            os_name = record.get("os_name", "")
+            if os_name not in parsed_os:
+                os_strings[os_name] = len(os_strings)
+                parsed_os[os_name] = parse_os(os_name)
+            family, version = parsed_os[os_name]
+            os_code.append(os_strings[os_name])
+            columns["os_family"].append(family)
+            columns["os_version"].append(version)
+
+        if np is not None:
+            columns = {name: np.frombuffer(col, dtype=np.float64) for name, col in columns.items()}
+            os_code = np.frombuffer(os_code, dtype=f"i{os_code.itemsize}")
+        return cls(machine_ids, columns["ram"], columns["vram"], columns["storage"], os_code,
+                   columns["os_family"], columns["os_version"], os_strings)
+
+    def __len__(self):
+        return len(self.machine_ids)
+
+
+class AppColumns:
+    """Requirement columns for every app in a catalog, aligned with the fleet's OS codes."""
+    def __init__(self, catalog_items, os_strings):
+        self.names = []
+        columns = {name: [] for name in ("min_ram", "rec_ram", "min_vram", "rec_vram", "min_storage",
+                                         "os_any", "os_family", "os_version", "os_exact")}
+        for name, info in catalog_items:
+            self.names.append(name)
+            min_ram, min_vram = info.get("min_ram", 0), info.get("min_vram", 0)
+            columns["min_ram"].append(min_ram)
+            columns["rec_ram"].append(info.get("rec_ram", min_ram))
+            columns["min_vram"].append(min_vram)
+            columns["rec_vram"].append(info.get("rec_vram", min_vram))
+            columns["min_storage"].append(info.get("min_storage", 0))
+
+            req_os = info.get("os_version", "Any")
+            family, version = parse_os(req_os)
+            columns["os_any"].append(req_os == "Any")
+            # Same rule as DecisionEngine: Windows-vs-Windows compares version numbers,
+            # anything else needs the exact OS string (-1 = no machine has that string)
+            numeric = family == _FAMILIES["windows"] and not math.isnan(version)
+            columns["os_family"].append(family if numeric else -1)
+            columns["os_version"].append(version if numeric else math.inf)
+            columns["os_exact"].append(os_strings.get(req_os, -1))
+
+        if np is not None:
+            columns = {name: np.asarray(values, dtype=np.bool_ if name == "os_any" else np.float64)
+                       for name, values in columns.items()}
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.names)
+
+
+class FleetResult:
+    """
+    compatible: machines x apps booleans (every minimum met, or every recommendation for tier="rec")
+    score:      machines x apps 0-100 (uint8), how close each machine is to the recommended spec
+    """
+    def __init__(self, machine_ids, app_names, compatible, score):
+        self.machine_ids = machine_ids
+        self.app_names = app_names
+        self.compatible = compatible
+        self.score = score
+        self._app_index = {name: i for i, name in enumerate(app_names)}
+
+    def machines_for(self, app):
+        """Machine ids that can run the app at the evaluated tier."""
+        column = self._app_index[app]
+        if not isinstance(self.compatible, list):
+            return [self.machine_ids[i] for i in np.flatnonzero(self.compatible[:, column])]
+        return [m for m, row in zip(self.machine_ids, self.compatible) if row[column]]
+
+    def count_by_app(self):
+        if not isinstance(self.compatible, list):
+            return dict(zip(self.app_names, self.compatible.sum(axis=0).tolist()))
+        return {app: sum(row[i] for row in self.compatible) for i, app in enumerate(self.app_names)}
+
+
+def _evaluate_numpy(fleet, apps, tier):
+    c = apps.columns
+    n, m = len(fleet), len(apps)
+    compatible = np.empty((n, m), dtype=np.bool_)
+    score = np.empty((n, m), dtype=np.uint8)
+
+    req_ram, req_vram = c[f"{tier}_ram"], c[f"{tier}_vram"]
+    # Score work is float32; apps with no recommendation divide by 1 rather than 0
+    rec_ram = (25 / np.where(c["rec_ram"] > 0, c["rec_ram"], 1)).astype(np.float32)
+    rec_vram = (25 / np.where(c["rec_vram"] > 0, c["rec_vram"], 1)).astype(np.float32)
+    # Unknown RAM/VRAM earns no points (comparisons against NaN are already False)
+    known_ram = np.nan_to_num(fleet.ram).astype(np.float32)
+    known_vram = np.nan_to_num(fleet.vram).astype(np.float32)
+
+    for start in range(0, n, CHUNK_ROWS):
+        rows = slice(start, min(start + CHUNK_ROWS, n))
+
+        os_ok = (c["os_any"][None, :]
+                 | ((fleet.os_family[rows, None] == c["os_family"][None, :])
+                    & (fleet.os_version[rows, None] >= c["os_version"][None, :]))
+                 | (fleet.os_code[rows, None] == c["os_exact"][None, :]))
+        storage_ok = fleet.storage[rows, None] >= c["min_storage"][None, :]
+
+        ok = fleet.ram[rows, None] >= req_ram
+        ok &= fleet.vram[rows, None] >= req_vram
+        ok &= storage_ok
+        ok &= os_ok
+        compatible[rows] = ok
+
+        # 25 points each: RAM and VRAM scale up to the recommendation, storage and OS are pass/fail
+        points = np.minimum(known_ram[rows, None] * rec_ram, 25)
+        points += np.minimum(known_vram[rows, None] * rec_vram, 25)
+        points += (storage_ok.view(np.uint8) + os_ok.view(np.uint8)) * np.float32(25)
+        np.rint(points, out=points)
+        score[rows] = points
+    return compatible, score
+
+
+def _evaluate_python(fleet, apps, tier):
+    c = apps.columns
+    compatible, score = [], []
+    for i in range(len(fleet)):
+        ram, vram, storage = fleet.ram[i], fleet.vram[i], fleet.storage[i]
+        family, version, code = fleet.os_family[i], fleet.os_version[i], fleet.os_code[i]
+        ok_row, score_row = [], []
+        for j in range(len(apps)):
+            os_ok = (c["os_any"][j] or (family == c["os_family"][j] and version >= c["os_version"][j])
+                     or code == c["os_exact"][j])
+            storage_ok = storage >= c["min_storage"][j]
+            ok_row.append(ram >= c[f"{tier}_ram"][j] and vram >= c[f"{tier}_vram"][j] and storage_ok and os_ok)
+            ram_part = 0 if math.isnan(ram) else min(ram / (c["rec_ram"][j] or 1), 1)
+            vram_part = 0 if math.isnan(vram) else min(vram / (c["rec_vram"][j] or 1), 1)
+            score_row.append(round((ram_part + vram_part + storage_ok + os_ok) * 25))
+        compatible.append(ok_row)
+        score.append(score_row)
+    return compatible, score
+
+
+def evaluate_fleet(records, catalog_items, tier="min"):
+    """
+    Evaluates RAM/VRAM/storage/OS constraints for every machine x every app at once.
+    Uses NumPy broadcasting over machine blocks when available, plain loops otherwise.
+    """
+    if tier not in ("min", "rec"):
+        raise ValueError("tier must be 'min' or 'rec'")
+    fleet = records if isinstance(records, FleetSpecs) else FleetSpecs.from_records(records)
+    apps = AppColumns(catalog_items, fleet.os_strings)
+    evaluate = _evaluate_numpy if np is not None else _evaluate_python
+    compatible, score = evaluate(fleet, apps, tier)
+    return FleetResult(fleet.machine_ids, apps.names, compatible, score)
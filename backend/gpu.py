@@ -0,0 +1,190 @@
+import math
+import time
+import threading
+
+from backend.cancel import CancelToken
+from backend.instrument import span, traced
+
+
+NO_GPU = "no GPU acceleration"
+
+_FMA_KERNEL = """
+__kernel void fma_loop(__global float *out, const int iterations) {
+    int gid = get_global_id(0);
+    float a = gid * 0.0001f, b = 1.0001f, c = 0.9999f, d = 0.5f;
+    for (int i = 0; i < iterations; i++) {
+        a = fma(a, b, c); d = fma(d, c, b);
+        a = fma(a, c, d); d = fma(d, b, a);
+    }
+    out[gid] = a + d;
+}
+"""
+
+
+class CudaBackend:
+    """CUDA through CuPy: cuBLAS SGEMM for FLOPS and a device-to-device copy for bandwidth."""
+    name = "cuda"
+
+    def __init__(self):
+        import cupy
+        self.cp = cupy
+        self.device = cupy.cuda.runtime.getDeviceProperties(0)["name"].decode()
+        self.a = cupy.random.random((2048, 2048), dtype=cupy.float32)
+        self.b = cupy.random.random((2048, 2048), dtype=cupy.float32)
+        self.src = cupy.ones(64 * 1024 * 1024 // 4, dtype=cupy.float32)
+        self.dst = cupy.empty_like(self.src)
+
+    def compute_batch(self):
+        """Runs one batch of work and returns the flops it did (synchronised)."""
+        for _ in range(10):
+            self.a @ self.b
+        self.cp.cuda.Device().synchronize()
+        return 2 * 2048 ** 3 * 10
+
+    def copy_batch(self):
+        for _ in range(10):
+            self.cp.copyto(self.dst, self.src)
+        self.cp.cuda.Device().synchronize()
+        return 2 * self.src.nbytes * 10
+
+
+class OpenCLBackend:
+    """Any OpenCL GPU through pyopencl: an FMA-bound kernel for FLOPS and a buffer copy for bandwidth."""
+    name = "opencl"
+
+    def __init__(self, work_items=1 << 20, iterations=256):
+        import numpy as np
+        import pyopencl as cl
+        self.cl = cl
+        devices = [d for p in cl.get_platforms() for d in p.get_devices(device_type=cl.device_type.GPU)]
+        if not devices:
+            raise RuntimeError("no OpenCL GPU device")
+        self.device = devices[0].name.strip()
+        self.context = cl.Context([devices[0]])
+        self.queue = cl.CommandQueue(self.context)
+        self.program = cl.Program(self.context, _FMA_KERNEL).build()
+        self.kernel = self.program.fma_loop
+        self.work_items = work_items
+        self.iterations = iterations
+        self.iterations_arg = np.int32(iterations)
+        flags = cl.mem_flags
+        self.out = cl.Buffer(self.context, flags.WRITE_ONLY, work_items * 4)
+        self.copy_bytes = 64 * 1024 * 1024
+        self.src = cl.Buffer(self.context, flags.READ_WRITE, self.copy_bytes)
+        self.dst = cl.Buffer(self.context, flags.READ_WRITE, self.copy_bytes)
+
+    def compute_batch(self):
+        self.kernel(self.queue, (self.work_items,), None, self.out, self.iterations_arg)
+        self.queue.finish()
+        # 4 FMAs (2 flops each) per iteration per work item
+        return self.work_items * self.iterations * 8
+
+    def copy_batch(self):
+        for _ in range(10):
+            self.cl.enqueue_copy(self.queue, self.dst, self.src)
+        self.queue.finish()
+        return 2 * self.copy_bytes * 10
+
+
+# Tried in order. Vulkan compute has no maintained Python binding that can run a kernel
+# without a shader toolchain, so CUDA and OpenCL cover NVIDIA, AMD and Intel GPUs.
+BACKENDS = (CudaBackend, OpenCLBackend)
+
+
+def open_backend():
+    """First GPU compute backend that initialises, or (None, reasons) if none does."""
+    reasons = []
+    for backend in BACKENDS:
+        try:
+            return backend(), reasons
+        except ImportError:
+            reasons.append(f"{backend.name}: not installed")
+        except Exception as e:
+            reasons.append(f"{backend.name}: {e}")
+    return None, reasons
+
+
+class GpuSampler(threading.Thread):
+    """Samples GPU load, temperature and memory use through GPUtil while a test runs."""
+    def __init__(self, interval=0.5):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        try:
+            import GPUtil
+        except ImportError:
+            return
+        while not self._stop_event.wait(self.interval):
+            try:
+                gpus = GPUtil.getGPUs()
+            except Exception:
+                return
+            if gpus:
+                self.samples.append((gpus[0].load * 100, gpus[0].temperature, gpus[0].memoryUsed))
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _result(**values):
+    result = {
+        "available": False, "backend": None, "device": None, "gflops": None, "bandwidth_gbps": None,
+        "sustained_ratio": None, "avg_load_pct": None, "max_temp_c": None, "reason": None,
+    }
+    result.update(values)
+    return result
+
+
+@traced("gpu.run")
+def run_gpu_benchmark(duration=8, cancel=None):
+    """
+    Sustained GPU compute test: repeats compute batches for `duration` seconds and reports
+    peak GFLOPS, the sustained ratio (throughput over the last third / first third, < 1
+    means the GPU slowed down, e.g. thermal or power throttling) and device copy bandwidth.
+    GPUtil load/temperature are sampled during the run (GPUtil does not expose clocks).
+    Without a usable backend it returns available=False and reason "no GPU acceleration".
+    """
+    cancel = cancel or CancelToken()
+    with span("gpu.open_backend"):
+        backend, reasons = open_backend()
+    if backend is None:
+        return _result(reason=f"{NO_GPU} ({'; '.join(reasons)})")
+
+    sampler = GpuSampler()
+    sampler.start()
+    try:
+        backend.compute_batch() # Warm-up: kernel compilation, clocks ramping up
+        rates = []
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            cancel.check()
+            start_time = time.perf_counter()
+            flops = backend.compute_batch()
+            rates.append((flops / (time.perf_counter() - start_time)) / 1e9)
+
+        cancel.check()
+        start_time = time.perf_counter()
+        copied = backend.copy_batch()
+        bandwidth = copied / (time.perf_counter() - start_time) / 1e9
+    finally:
+        sampler.stop()
+
+    third = max(len(rates) // 3, 1)
+    first = sum(rates[:third]) / third
+    last = sum(rates[-third:]) / third
+    loads = [s[0] for s in sampler.samples]
+    temps = [s[1] for s in sampler.samples if s[1] is not None and not math.isnan(s[1])]
+    return _result(
+        available=True,
+        backend=backend.name,
+        device=backend.device,
+        gflops=round(max(rates), 1),
+        bandwidth_gbps=round(bandwidth, 1),
+        sustained_ratio=round(last / first, 3) if first else None,
+        avg_load_pct=round(sum(loads) / len(loads), 1) if loads else None,
+        max_temp_c=max(temps) if temps else None,
+    )
@@ -0,0 +1,223 @@
+import os
+import json
+import time
+import threading
+import functools
+import subprocess
+import tracemalloc
+
+
+# Tracing is off unless enable() is called; span() then returns a shared no-op object
+# and @traced functions cost one flag check per call.
+_enabled = False
+_memory = False
+_lock = threading.Lock()
+_local = threading.local()
+_events = []
+_subprocesses = []
+_epoch_ns = 0
+_original_popen_init = None
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    """One timed region. Nested spans on the same thread become children in the trace."""
+    __slots__ = ("name", "args", "start_ns", "spawned", "mem_start", "mem_peak")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        if _memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].mem_peak = max(stack[-1].mem_peak, peak)
+            tracemalloc.reset_peak()
+            self.mem_start, self.mem_peak = current, current
+        stack.append(self)
+        self.spawned = len(_subprocesses)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        stack = _local.stack
+        stack.pop()
+        event = {
+            "name": self.name,
+            "start_ns": self.start_ns - _epoch_ns,
+            "dur_ns": end_ns - self.start_ns,
+            "tid": threading.get_native_id(),
+            "thread": threading.current_thread().name,
+            "depth": len(stack),
+            "subprocesses": len(_subprocesses) - self.spawned,
+            "args": self.args,
+        }
+        if _memory:
+            # tracemalloc's peak is process-wide: allocations by other threads count too
+            self.mem_peak = max(self.mem_peak, tracemalloc.get_traced_memory()[1])
+            event["peak_kb"] = round((self.mem_peak - self.mem_start) / 1024, 1)
+            if stack:
+                stack[-1].mem_peak = max(stack[-1].mem_peak, self.mem_peak)
+        if exc_type is not None:
+            event["error"] = exc_type.__name__
+        with _lock:
+            _events.append(event)
+        return False
+
+
+def span(name, **args):
+    """with span("benchmark.memory"): ...  Records the block when tracing is enabled."""
+    if not _enabled:
+        return _NOOP
+    return _Span(name, args)
+
+
+def traced(name):
+    """Decorator form of span() for whole functions."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _counting_popen_init(self, args, *rest, **kwargs):
+    command = args if isinstance(args, str) else " ".join(str(a) for a in args)
+    with _lock:
+        _subprocesses.append({
+            "name": "subprocess",
+            "start_ns": time.perf_counter_ns() - _epoch_ns,
+            "tid": threading.get_native_id(),
+            "command": command[:200],
+        })
+    _original_popen_init(self, args, *rest, **kwargs)
+
+
+def enable(memory=False):
+    """
+    Starts recording spans and counting subprocess launches (subprocess.Popen, which
+    also covers check_output/run and GPUtil's nvidia-smi calls). memory=True also
+    tracks peak Python allocations per span with tracemalloc, which slows allocations down.
+    """
+    global _enabled, _memory, _epoch_ns, _original_popen_init
+    with _lock:
+        _events.clear()
+        _subprocesses.clear()
+    _epoch_ns = time.perf_counter_ns()
+    if _original_popen_init is None:
+        _original_popen_init = subprocess.Popen.__init__
+        subprocess.Popen.__init__ = _counting_popen_init
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _memory = memory
+    _enabled = True
+
+
+def disable():
+    global _enabled, _memory, _original_popen_init
+    _enabled = False
+    if _original_popen_init is not None:
+        subprocess.Popen.__init__ = _original_popen_init
+        _original_popen_init = None
+    if _memory:
+        tracemalloc.stop()
+        _memory = False
+
+
+def events():
+    with _lock:
+        return list(_events), list(_subprocesses)
+
+
+def chrome_trace(path):
+    """Writes the recorded spans as Chrome trace-event JSON (chrome://tracing, Perfetto)."""
+    spans, spawned = events()
+    pid = os.getpid()
+    trace = []
+    threads = {}
+    for e in spans:
+        threads[e["tid"]] = e["thread"]
+        args = dict(e["args"], subprocesses=e["subprocesses"])
+        for key in ("peak_kb", "error"):
+            if key in e:
+                args[key] = e[key]
+        trace.append({"name": e["name"], "cat": e["name"].split(".")[0], "ph": "X", "pid": pid, "tid": e["tid"],
+                      "ts": e["start_ns"] / 1000, "dur": e["dur_ns"] / 1000, "args": args})
+    for s in spawned:
+        trace.append({"name": "subprocess", "cat": "subprocess", "ph": "i", "s": "t", "pid": pid, "tid": s["tid"],
+                      "ts": s["start_ns"] / 1000, "args": {"command": s["command"]}})
+    for tid, name in threads.items():
+        trace.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+    with open(path, "w") as f:
+        json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+
+
+def summary():
+    """
+    Spans grouped by name, slowest total first: calls, total/self/max ms, subprocesses
+    started while they ran (process-wide) and, with memory tracing, the largest peak
+    allocation in KB. Self time is the span's time minus its child spans on the same thread.
+    """
+    spans, _ = events()
+    child_ns = [0] * len(spans)
+    # A span's parent is the nearest enclosing span one level up on the same thread
+    open_spans = {}
+    for index in sorted(range(len(spans)), key=lambda i: spans[i]["start_ns"]):
+        e = spans[index]
+        stack = open_spans.setdefault(e["tid"], [])
+        while stack and spans[stack[-1]]["depth"] >= e["depth"]:
+            stack.pop()
+        if stack:
+            child_ns[stack[-1]] += e["dur_ns"]
+        stack.append(index)
+
+    rows = {}
+    for index, e in enumerate(spans):
+        row = rows.setdefault(e["name"], {"name": e["name"], "calls": 0, "total_ms": 0.0, "self_ms": 0.0,
+                                          "max_ms": 0.0, "subprocesses": 0, "peak_kb": None})
+        ms = e["dur_ns"] / 1e6
+        row["calls"] += 1
+        row["total_ms"] += ms
+        row["self_ms"] += (e["dur_ns"] - child_ns[index]) / 1e6
+        row["max_ms"] = max(row["max_ms"], ms)
+        row["subprocesses"] += e["subprocesses"]
+        if "peak_kb" in e:
+            row["peak_kb"] = max(row["peak_kb"] or 0, e["peak_kb"])
+    return sorted(rows.values(), key=lambda r: -r["total_ms"])
+
+
+def format_summary(rows=None, top=40):
+    rows = summary() if rows is None else rows
+    _, spawned = events()
+    memory = any(r["peak_kb"] is not None for r in rows)
+    header = f"{'SPAN':<36} {'CALLS':>5} {'TOTAL ms':>10} {'SELF ms':>10} {'MAX ms':>9} {'PROCS':>5}"
+    lines = [header + (f" {'PEAK KB':>9}" if memory else "")]
+    for r in rows[:top]:
+        line = (f"{r['name'][:36]:<36} {r['calls']:>5} {r['total_ms']:>10.1f} {r['self_ms']:>10.1f} "
+                f"{r['max_ms']:>9.1f} {r['subprocesses']:>5}")
+        if memory:
+            line += f" {r['peak_kb'] if r['peak_kb'] is not None else '-':>9}"
+        lines.append(line)
+    lines.append(f"Subprocesses started: {len(spawned)}")
+    return lines
@@ -0,0 +1,241 @@
+import os
+import sys
+import time
+import threading
+import multiprocessing
+
+import psutil
+
+
+# Background CPU use (percent of the whole machine, excluding the benchmark itself)
+# above which a run is labelled "moderate" or "noisy"
+NOISE_LEVELS = ((5, "quiet"), (15, "moderate"))
+
+# How far process priority is raised: a nice value on POSIX (needs CAP_SYS_NICE or root),
+# a priority class on Windows. REALTIME_PRIORITY_CLASS could starve the OS, so it is not used.
+RAISED_NICE = -10
+
+
+def _raised_priority():
+    if sys.platform == "win32":
+        return psutil.HIGH_PRIORITY_CLASS
+    return RAISED_NICE
+
+
+def get_affinity():
+    """The CPUs this process may run on, or None where affinity is not supported (macOS)."""
+    if hasattr(psutil.Process, "cpu_affinity"):
+        try:
+            return sorted(psutil.Process().cpu_affinity())
+        except (psutil.Error, OSError):
+            return None
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return None
+
+
+def set_affinity(cores):
+    """Restricts this process to `cores`. Returns False where that is not possible."""
+    try:
+        if hasattr(psutil.Process, "cpu_affinity"):
+            psutil.Process().cpu_affinity(list(cores))
+            return True
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, set(cores))
+            return True
+    except (psutil.Error, OSError, ValueError):
+        pass
+    return False
+
+
+def set_priority(priority):
+    """Sets this process's nice value / priority class. Returns False when not permitted."""
+    try:
+        psutil.Process().nice(priority)
+        return True
+    except (psutil.Error, OSError):
+        return False
+
+
+def spin(seconds):
+    """
+    Busy-waits for `seconds` so the core leaves its idle/low-clock states before timing
+    starts. Returns the number of loop iterations (picklable, so pool workers can run it).
+    """
+    deadline = time.perf_counter() + seconds
+    rounds = 0
+    while time.perf_counter() < deadline:
+        rounds += 1
+    return rounds
+
+
+def _pin_worker(cores, counter, priority):
+    """Pool initializer: each worker takes the next core in `cores` and the raised priority."""
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    set_affinity([cores[index % len(cores)]])
+    if priority is not None:
+        set_priority(priority)
+
+
+def _busy_seconds(times):
+    idle = times.idle + getattr(times, "iowait", 0)
+    return sum(times) - idle
+
+
+def _own_cpu_seconds(process):
+    """CPU time of this process and all its children, alive or already reaped."""
+    times = process.cpu_times()
+    total = times.user + times.system + getattr(times, "children_user", 0) + getattr(times, "children_system", 0)
+    for child in process.children(recursive=True):
+        try:
+            child_times = child.cpu_times()
+            total += child_times.user + child_times.system
+        except psutil.Error:
+            pass # Exited between listing and reading; counted in children_* once reaped
+    return total
+
+
+class BackgroundLoad(threading.Thread):
+    """
+    Measures how much CPU other programs use while the benchmark runs: machine-wide busy
+    time minus the time used by this process and its worker processes, every `interval`
+    seconds. Reported as a percentage of all logical CPUs.
+    """
+    def __init__(self, interval=0.5):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.cpus = psutil.cpu_count(logical=True) or 1
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        process = psutil.Process()
+        last_busy, last_own, last_time = _busy_seconds(psutil.cpu_times()), _own_cpu_seconds(process), time.perf_counter()
+        while not self._stop_event.wait(self.interval):
+            busy, own, now = _busy_seconds(psutil.cpu_times()), _own_cpu_seconds(process), time.perf_counter()
+            capacity = (now - last_time) * self.cpus
+            if capacity > 0:
+                background = max(busy - last_busy - (own - last_own), 0)
+                self.samples.append(min(background / capacity * 100, 100))
+            last_busy, last_own, last_time = busy, own, now
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def wait_until_quiet(threshold_pct, max_wait_s, interval=0.5, cancel=None):
+    """
+    Samples machine-wide CPU use until it drops below threshold_pct or max_wait_s passes.
+    The benchmark is idle meanwhile, so whatever is measured is background load.
+    Returns (seconds waited, last load percentage).
+    """
+    start = time.perf_counter()
+    while True:
+        load = psutil.cpu_percent(interval=interval)
+        waited = time.perf_counter() - start
+        if load < threshold_pct or waited >= max_wait_s:
+            return round(waited, 1), load
+        if cancel:
+            cancel.check()
+
+
+def noise_level(background_pct):
+    for limit, label in NOISE_LEVELS:
+        if background_pct < limit:
+            return label
+    return "noisy"
+
+
+class Isolation:
+    """
+    Settings that make benchmark results more repeatable. Applied around a whole run by
+    BenchmarkEngine:
+    cores       - CPUs to run on (default: all of them). Pool workers are pinned one per core
+                  and the benchmark process is kept within the set, so the scheduler does not
+                  move work between cores mid-measurement.
+    priority    - raise process priority where the OS permits it (silently skipped otherwise)
+    warmup_s    - busy-spin before timing so cores are out of their idle states
+    quiet_pct   - wait (up to max_wait_s) until background CPU use is below this before starting
+    Background CPU use during the run is measured either way and reported by report().
+    """
+    def __init__(self, cores=None, priority=True, warmup_s=0.5, quiet_pct=10.0, max_wait_s=30.0, sample_interval=0.5):
+        available = get_affinity()
+        self.cores = sorted(set(cores) & set(available)) if cores and available else available
+        if cores and not self.cores:
+            raise ValueError(f"None of the requested cores {sorted(cores)} are available (have {available}).")
+        self.priority = priority
+        self.warmup_s = warmup_s
+        self.quiet_pct = quiet_pct
+        self.max_wait_s = max_wait_s
+        self.sample_interval = sample_interval
+        self._saved = None
+        self._load = None
+        self._report = {}
+
+    def pool_options(self):
+        """Keyword arguments for multiprocessing.Pool that pin each worker to its own core."""
+        if not self.cores:
+            return {}
+        priority = _raised_priority() if self._report.get("priority_raised") else None
+        return {"initializer": _pin_worker, "initargs": (self.cores, multiprocessing.Value("i", 0), priority)}
+
+    def workers(self):
+        """Worker count for all-core tests: one per pinned core."""
+        return len(self.cores) if self.cores else None
+
+    def apply(self, cancel=None):
+        process = psutil.Process()
+        self._saved = (get_affinity(), process.nice())
+        report = {"cores": self.cores, "pinned": False, "priority_raised": False}
+        self._report = report
+
+        waited, load = wait_until_quiet(self.quiet_pct, self.max_wait_s, self.sample_interval, cancel)
+        report["waited_s"] = waited
+        report["load_at_start_pct"] = load
+
+        if self.cores:
+            report["pinned"] = set_affinity(self.cores)
+        if self.priority:
+            report["priority_raised"] = set_priority(_raised_priority())
+        if self.warmup_s:
+            spin(self.warmup_s)
+        report["warmup_s"] = self.warmup_s
+
+        self._load = BackgroundLoad(self.sample_interval)
+        self._load.start()
+
+    def restore(self):
+        if self._load is not None:
+            self._load.stop()
+            samples = self._load.samples
+            background = sum(samples) / len(samples) if samples else self._report.get("load_at_start_pct", 0)
+            self._report["background_cpu_pct"] = round(background, 1)
+            self._report["background_cpu_peak_pct"] = round(max(samples, default=background), 1)
+            self._report["noise"] = noise_level(background)
+            self._load = None
+        if self._saved is not None:
+            affinity, nice = self._saved
+            if affinity and self._report.get("pinned"):
+                set_affinity(affinity)
+            if self._report.get("priority_raised"):
+                set_priority(nice)
+            self._saved = None
+
+    def __enter__(self):
+        self.apply()
+        return self
+
+    def __exit__(self, *exc):
+        self.restore()
+        return False
+
+    def report(self):
+        """
+        What was applied and how noisy the run was: cores, pinned, priority_raised,
+        waited_s, load_at_start_pct, warmup_s, background_cpu_pct (average CPU use by other
+        programs during the run), background_cpu_peak_pct and noise ("quiet"/"moderate"/"noisy").
+        """
+        return dict(self._report)
@@ -0,0 +1,135 @@
+import json
+import asyncio
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs
+
+
+MAX_BODY = 64 * 1024 * 1024
+MAX_HEADER_LINES = 100
+
+
+class HTTPError(Exception):
+    """Raise from a handler to answer with an error status and {"error": message}."""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    def __init__(self, method, target, headers, body):
+        parts = urlsplit(target)
+        self.method = method
+        self.path = parts.path
+        self.query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        try:
+            return json.loads(self.body or b"null")
+        except ValueError as e:
+            raise HTTPError(400, f"Invalid JSON body: {e}")
+
+
+class RawJson(bytes):
+    """Already-encoded JSON; returned as-is so hot responses are serialised once, not per reader."""
+
+
+def encode(obj):
+    return RawJson(json.dumps(obj, default=str).encode())
+
+
+def _response(status, body, keep_alive):
+    reason = HTTPStatus(status).phrase
+    head = (f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+class JsonApiServer:
+    """
+    Minimal asyncio HTTP/1.1 server for small JSON APIs (keep-alive, Content-Length bodies).
+    routes maps (method, path) to `async def handler(request)` returning (status, body),
+    where body is any JSON-serialisable object or a RawJson. Every connection is a
+    coroutine on one event loop, so thousands of idle or polling readers cost little.
+    """
+    def __init__(self, routes, host="127.0.0.1", port=0):
+        self.routes = routes
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.host, self.port
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self):
+        if self._server:
+            self._server.close()
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY:
+            raise HTTPError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return Request(method.upper(), target, headers, body)
+
+    async def _dispatch(self, request):
+        handler = self.routes.get((request.method, request.path))
+        if handler is None:
+            known = any(path == request.path for _, path in self.routes)
+            raise HTTPError(405 if known else 404, f"No route for {request.method} {request.path}")
+        status, body = await handler(request)
+        return status, body if isinstance(body, RawJson) else encode(body)
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    keep_alive = request.headers.get("connection", "keep-alive").lower() != "close"
+                    status, body = await self._dispatch(request)
+                except HTTPError as e:
+                    status, body = e.status, encode({"error": e.message})
+                except (ValueError, asyncio.IncompleteReadError):
+                    status, body = 400, encode({"error": "Malformed request"})
+                except Exception as e:
+                    status, body = 500, encode({"error": f"{type(e).__name__}: {e}"})
+
+                writer.write(_response(status, body, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,189 @@
+import time
+import math
+from array import array
+
+from backend.instrument import span
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Throughput of each kernel on the reference machine (Ryzen 7 5800X, CPython 3.11).
+# Keyed by (kernel, backend) because the NumPy and pure-Python paths differ by orders of magnitude.
+# A normalized score of 1.0 means "as fast as the reference machine".
+REFERENCE_OPS_PER_SEC = {
+    ("integer_sieve", "python"): 200_000_000,
+    ("float_matmul", "python"): 32_000_000,
+    ("float_matmul", "numpy"): 40_000_000_000,
+    ("float_fft", "python"): 32_000_000,
+    ("float_fft", "numpy"): 2_500_000_000,
+    ("branchy_compile", "python"): 4_500_000,
+    ("memory_reduction", "python"): 65_000_000,
+    ("memory_reduction", "numpy"): 800_000_000,
+}
+
+
+def _backend():
+    return "numpy" if np is not None else "python"
+
+
+def integer_sieve(size=20_000_000):
+    """Sieve of Eratosthenes over a bytearray. One op = one candidate number."""
+    sieve = bytearray([1]) * (size + 1)
+    sieve[0:2] = b"\x00\x00"
+    for i in range(2, int(size ** 0.5) + 1):
+        if sieve[i]:
+            # Slice assignment strikes out all multiples in one C-level pass
+            sieve[i * i::i] = bytes(len(range(i * i, size + 1, i)))
+    sieve.count(1)
+    return size
+
+
+def float_matmul(size=None):
+    """Dense square matrix multiply. One op = one floating-point multiply or add."""
+    if np is not None:
+        size = size or 512
+        a = np.random.default_rng(1).random((size, size))
+        b = np.random.default_rng(2).random((size, size))
+        repeats = 8
+        for _ in range(repeats):
+            a @ b
+        return 2 * size ** 3 * repeats
+
+    size = size or 128
+    a = [[(i * size + j) % 7 / 7.0 for j in range(size)] for i in range(size)]
+    b_cols = [list(col) for col in zip(*a)]
+    for row in a:
+        [sum(x * y for x, y in zip(row, col)) for col in b_cols]
+    return 2 * size ** 3
+
+
+def _fft(values):
+    """Iterative radix-2 Cooley-Tukey FFT (len(values) must be a power of two)."""
+    n = len(values)
+    j = 0
+    for i in range(1, n):
+        bit = n >> 1
+        while j & bit:
+            j ^= bit
+            bit >>= 1
+        j |= bit
+        if i < j:
+            values[i], values[j] = values[j], values[i]
+
+    length = 2
+    while length <= n:
+        angle = -2 * math.pi / length
+        w_len = complex(math.cos(angle), math.sin(angle))
+        half = length // 2
+        for start in range(0, n, length):
+            w = 1 + 0j
+            for k in range(start, start + half):
+                u = values[k]
+                v = values[k + half] * w
+                values[k] = u + v
+                values[k + half] = u - v
+                w *= w_len
+        length <<= 1
+    return values
+
+
+def float_fft(size=None):
+    """Complex FFT. One op = one of the 5*N*log2(N) flops of a radix-2 FFT."""
+    if np is not None:
+        size = size or 2 ** 20
+        signal = np.random.default_rng(3).random(size) + 0j
+        repeats = 8
+        for _ in range(repeats):
+            np.fft.fft(signal)
+        return int(5 * size * math.log2(size)) * repeats
+
+    size = size or 2 ** 16
+    _fft([complex(i % 17, 0) for i in range(size)])
+    return int(5 * size * math.log2(size))
+
+
+_SOURCE_SNIPPET = "let alpha_{n} = (beta + {n}) * gamma_{n} - 42; if alpha_{n} >= 7 {{ call(x, \"s{n}\"); }}\n"
+
+
+def branchy_compile(size=1_000_000):
+    """
+    Compiler-front-end style work: a hand-written tokenizer with lots of unpredictable branches.
+    One op = one source character processed.
+    """
+    source = "".join(_SOURCE_SNIPPET.format(n=i) for i in range(size // len(_SOURCE_SNIPPET) + 1))[:size]
+    counts = {"ident": 0, "number": 0, "string": 0, "op": 0, "keyword": 0}
+    keywords = {"let", "if", "call"}
+    i = 0
+    n = len(source)
+    while i < n:
+        c = source[i]
+        if c.isspace():
+            i += 1
+        elif c.isalpha() or c == "_":
+            start = i
+            while i < n and (source[i].isalnum() or source[i] == "_"):
+                i += 1
+            counts["keyword" if source[start:i] in keywords else "ident"] += 1
+        elif c.isdigit():
+            while i < n and source[i].isdigit():
+                i += 1
+            counts["number"] += 1
+        elif c == '"':
+            i = source.find('"', i + 1) + 1 or n
+            counts["string"] += 1
+        elif c in "<>=!" and i + 1 < n and source[i + 1] == "=":
+            i += 2
+            counts["op"] += 1
+        else:
+            i += 1
+            counts["op"] += 1
+    return n
+
+
+def memory_reduction(size=8_000_000):
+    """Sum over a contiguous float64 buffer larger than typical L2 caches. One op = one element."""
+    if np is not None:
+        data = np.ones(size, dtype=np.float64)
+        repeats = 8
+        for _ in range(repeats):
+            data.sum()
+        return size * repeats
+
+    data = array("d", bytes(8 * size))
+    sum(data)
+    return size
+
+
+KERNELS = {
+    "integer_sieve": integer_sieve,
+    "float_matmul": float_matmul,
+    "float_fft": float_fft,
+    "branchy_compile": branchy_compile,
+    "memory_reduction": memory_reduction,
+}
+
+
+def run_kernel(name, size=None):
+    """
+    Runs a single kernel once with a fixed amount of work.
+    Returns its raw ops/sec and the score normalized to the reference machine.
+    """
+    kernel = KERNELS[name]
+    # The sieve, tokenizer and fallback reduction are pure Python regardless of NumPy
+    backend = _backend() if (name, "numpy") in REFERENCE_OPS_PER_SEC else "python"
+
+    with span(f"kernel.{name}"):
+        start_time = time.perf_counter_ns()
+        ops = kernel(size) if size else kernel()
+        duration = (time.perf_counter_ns() - start_time) / 1e9
+
+    ops_per_sec = ops / duration if duration > 0 else 0
+    return {
+        "backend": backend,
+        "ops_per_sec": round(ops_per_sec),
+        "normalized": round(ops_per_sec / REFERENCE_OPS_PER_SEC[(name, backend)], 3),
+        "duration": round(duration, 4)
+    }
@@ -1,16 +1,82 @@
 import platform
-import json
+import math
+from backend.catalog import RequirementsCatalog
+from backend.store import metric_direction
+from backend.instrument import traced
+
+# Processes the OS needs; never suggested for closing
+_PROTECTED_PROCESSES = {
+    "system", "system idle process", "registry", "smss.exe", "csrss.exe", "wininit.exe", "winlogon.exe",
+    "services.exe", "lsass.exe", "svchost.exe", "dwm.exe", "explorer.exe", "memory compression",
+    "systemd", "init", "kthreadd", "xorg", "gnome-shell", "kernel_task", "launchd", "windowserver",
+}
+
+# How the workload replay stages are described in warnings
+_REPLAY_LABELS = {
+    "small_files": "small-file I/O (indexing, incremental builds)",
+    "compile": "parallel compiling",
+    "blas": "matrix math (BLAS)",
+    "render": "all-core rendering",
+}
+
+def _is_known(value):
+    """False for values a hardware probe reported as "unknown" (timed out or failed)."""
+    return isinstance(value, (int, float))
+
 
 class DecisionEngine:
     def __init__(self, requirements_path="data/requirements.json"):
-        with open(requirements_path, "r") as f:
-            self.software_info = json.load(f)
+        # Compiled, indexed catalog; behaves like the {app: requirements} dict and loads lazily
+        self.software_info = RequirementsCatalog(requirements_path)
+
+    def find_app(self, query, version=None):
+        """Version-aware / fuzzy app lookup. Returns the catalog display name or None."""
+        match = self.software_info.lookup(query, version=version)
+        return match[0] if match else None
+
+    def apps_within(self, ram_gb, vram_gb, storage_gb=None, tier="min"):
+        """Apps whose min (or rec) RAM/VRAM/storage requirements fit these numbers (indexed query)."""
+        limits = {f"{tier}_ram": ram_gb, f"{tier}_vram": vram_gb}
+        if storage_gb is not None:
+            limits["min_storage"] = storage_gb
+        return self.software_info.find(**limits)
+
+    @traced("score.fleet")
+    def evaluate_fleet(self, spec_records, tier="min"):
+        """
+        Every catalog app x every machine in one vectorized pass.
+        spec_records are get_all_specs() dicts with a "machine_id"; unknown values count as unmet.
+        Returns a FleetResult (compatible/score matrices, machines_for(app)).
+        """
+        from backend.fleet import evaluate_fleet # NumPy; not needed for single-machine scoring
+        return evaluate_fleet(spec_records, self.software_info.items(), tier=tier)
 
     def theoretical_compatibility_test(self, target_app, scraper_data):
         target_info = self.software_info.get(target_app) 
         if not target_info:
             return False, ["Application not found in database."]
+
+        problems, messages = self.check_requirements(target_info, scraper_data)
+
+        if platform.system() != "Windows":
+            os_name = scraper_data.get("os_name", "")
+            print(f"Unsupported OS: Analysis targets Windows systems. Your OS ({os_name}) is incompatible.")
+            
+        if problems:
+            return False, problems
+            
+        if messages:
+            for msg in messages:
+                print(msg)
         
+        return True, []
+
+    @traced("score.requirements")
+    def check_requirements(self, target_info, scraper_data):
+        """
+        Compares one app's requirements with the scanned hardware without printing anything.
+        Returns (problems, messages): problems block the app, messages are informational.
+        """
         req_ram = target_info.get("min_ram", 0) 
         req_vram = target_info.get("min_vram", 0) 
         req_os = target_info.get("os_version", "Any")
@@ -20,17 +86,29 @@ class DecisionEngine:
         problems = []
         messages = [] # Non-blocking messages (Info/Warnings)
 
-        if scraper_data.get("total_ram_gb", 0) < req_ram:
+        # Values a hardware probe couldn't read in time are "unknown": report them, don't fail on them
+        total_ram = scraper_data.get("total_ram_gb", 0)
+        if not _is_known(total_ram):
+            messages.append("INFO: Total RAM could not be determined.")
+        elif total_ram < req_ram:
             problems.append(f"Insufficient Total RAM: {req_ram}GB required.")
         
-        if scraper_data.get("vram_gb", 0) < req_vram:
+        vram = scraper_data.get("vram_gb", 0)
+        if not _is_known(vram):
+            messages.append("INFO: GPU memory could not be determined.")
+        elif vram < req_vram:
             problems.append(f"Insufficient VRAM: {req_vram}GB required.")
 
         # Disk Storage Check
         disks = scraper_data.get("disks", [])
-        compatible_disks = [d for d in disks if d["free_gb"] >= req_storage]
+        compatible_disks = [d for d in disks if _is_known(d["free_gb"]) and d["free_gb"] >= req_storage]
+        unknown_disks = [d["mountpoint"] for d in disks if not _is_known(d["free_gb"])]
+        if scraper_data.get("probe_status", {}).get("disks", "ok") != "ok":
+            unknown_disks.append("all drives (disk scan did not finish)")
         
-        if not compatible_disks:
+        if not compatible_disks and unknown_disks:
+            messages.append(f"INFO: Free space could not be read on: {', '.join(unknown_disks)}")
+        elif not compatible_disks:
             problems.append(f"Insufficient Storage checking all drivers: {req_storage}GB required.")
         else:
             # Tell user which disks are valid
@@ -42,34 +120,160 @@ class DecisionEngine:
             if req_os == "Any":
                 pass # Herhangi bir Windows sürümü kabul
             elif "Windows" in os_name and "Windows" in req_os:
-                try:
-                    # Sadece sayıları alıp karşılaştırıyoruz (Örn: "Windows 10" -> 10)
-                    current_v = int(''.join(filter(str.isdigit, os_name)))
-                    req_v = int(''.join(filter(str.isdigit, req_os)))
-                    
-                    if current_v < req_v:
-                        problems.append(f"OS Mismatch: {req_os} or newer required.")
-                except:
+                from backend.fleet import parse_os # Same parsing as the fleet check; imported lazily (NumPy)
+                # Sürüm numaralarını karşılaştırıyoruz (Örn: "Windows 8.1" -> 8.1, "Windows 10" -> 10)
+                current_v, req_v = parse_os(os_name)[1], parse_os(req_os)[1]
+                if math.isnan(current_v) or math.isnan(req_v):
                     # Sayı bulunamazsa klasik string kontrolüne dön
                     if req_os != os_name:
                         problems.append(f"OS Mismatch: {req_os} required.")
+                elif current_v < req_v:
+                    problems.append(f"OS Mismatch: {req_os} or newer required.")
             elif req_os != os_name:
                 problems.append(f"OS Mismatch: {req_os} required.")
-        else:
-            print("Unsupported OS: Analysis targets Windows systems. Your OS ({os_name}) is incompatible.")
-            
-        if problems:
-            return False, problems
-            
-        if messages:
-            for msg in messages:
-                print(msg)
-        
-        return True, []
 
+        return problems, messages
+
+
+    @traced("score.all_apps")
+    def evaluate_all(self, scraper_data, benchmark_data):
+        """
+        Scores every app in the catalog against one hardware scan + one benchmark run.
+        Returns a ranked compatibility matrix: compatible apps first, then by score.
+        Each row: {"app", "compatible", "problems", "score", "warnings"}.
+        """
+        matrix = []
+        for app, target_info in self.software_info.items():
+            problems, _ = self.check_requirements(target_info, scraper_data)
+            score, warnings = self.calculate_performance_score(app, scraper_data, benchmark_data, target_info)
+            matrix.append({
+                "app": app,
+                "compatible": not problems,
+                "problems": problems,
+                "score": score,
+                "warnings": warnings
+            })
+        matrix.sort(key=lambda row: (not row["compatible"], -row["score"], row["app"]))
+        return matrix
+
+    def pick_install_disk(self, target_app, scraper_data):
+        """
+        Returns the disk the app would be installed on: the drive with the most free space
+        among those that pass the storage requirement (or None if no drive fits).
+        """
+        target_info = self.software_info.get(target_app, {})
+        req_storage = target_info.get("min_storage", 0)
+        disks = [d for d in scraper_data.get("disks", []) if _is_known(d["free_gb"]) and d["free_gb"] >= req_storage]
+        if not disks:
+            return None
+        return max(disks, key=lambda d: d["free_gb"])
+
+    @traced("score.reclaimable")
+    def estimate_reclaimable(self, target_app, scraper_data, cpu_threshold=5, target_info=None):
+        """
+        From the scan's top processes, estimates what closing background programs would free
+        for the target app. Memory hogs are picked (largest first) until available RAM reaches
+        the app's recommended RAM; CPU hogs above cpu_threshold % are always listed.
+        Returns {"ram_gb", "cpu_pct", "processes"} or None if no process data was collected.
+        target_info: the app's catalog entry if the caller already has it.
+        """
+        top = scraper_data.get("top_processes")
+        if not top:
+            return None
+        if target_info is None:
+            target_info = self.software_info.get(target_app, {})
+        rec_ram = target_info.get("rec_ram", target_info.get("min_ram", 0))
+        available_ram = scraper_data.get("available_ram_gb")
+        shortfall = rec_ram - available_ram if _is_known(available_ram) else 0
+
+        def closable(proc):
+            return proc["name"] != "unknown" and proc["name"].lower() not in _PROTECTED_PROCESSES
+
+        chosen = {}
+        ram_gb = 0
+        for proc in filter(closable, top.get("by_memory", [])):
+            if ram_gb >= shortfall:
+                break
+            chosen[proc["pid"]] = proc
+            ram_gb += proc["rss_gb"]
+
+        for proc in filter(closable, top.get("by_cpu", [])):
+            if proc["cpu_pct"] >= cpu_threshold:
+                chosen[proc["pid"]] = proc
 
-    def calculate_performance_score(self, target_app, scraper_data, benchmark_data):
+        # A process picked for memory may also be a CPU hog (and the reverse)
+        return {
+            "ram_gb": round(sum(p["rss_gb"] for p in chosen.values()), 2),
+            "cpu_pct": round(sum(p["cpu_pct"] for p in chosen.values()), 1),
+            "processes": [p["name"] for p in chosen.values()]
+        }
+
+    def _shift_metrics(self, benchmark_data, direction):
+        """
+        Copy of benchmark_data with every metric that has an uncertainty moved to the edge of
+        its confidence interval: direction -1 = the unfavourable edge, +1 = the favourable one.
+        """
+        shifted = dict(benchmark_data)
+        shifted["cpu_kernels"] = dict(benchmark_data.get("cpu_kernels", {}))
+        for metric, ci_rel in benchmark_data.get("uncertainty", {}).items():
+            better = metric_direction(metric)
+            if better is None:
+                continue
+            sign = direction * better
+            parent, _, key = metric.rpartition(".")
+            container = shifted["cpu_kernels"] if parent == "cpu_kernels" else shifted
+            if isinstance(container.get(key), (int, float)):
+                container[key] = container[key] * (1 + sign * ci_rel)
+        return shifted
+
+    @traced("score.range")
+    def score_range(self, target_app, scraper_data, benchmark_data):
+        """
+        (low, score, high): the score from the measured medians, and the scores with every
+        noisy metric at the pessimistic / optimistic end of its 95% confidence interval.
+        Without uncertainty data (single-shot runs) all three are the same.
+        """
         target_info = self.software_info.get(target_app)
+        score, _ = self.calculate_performance_score(target_app, scraper_data, benchmark_data, target_info)
+        if not benchmark_data.get("uncertainty"):
+            return score, score, score
+        low, _ = self.calculate_performance_score(target_app, scraper_data, self._shift_metrics(benchmark_data, -1), target_info)
+        high, _ = self.calculate_performance_score(target_app, scraper_data, self._shift_metrics(benchmark_data, 1), target_info)
+        return min(low, score), score, max(high, score)
+
+    def replay_stages(self, apps):
+        """Workload replay stages needed to score `apps` (stages with a weight in their workload_profile)."""
+        stages = set()
+        for app in apps:
+            profile = (self.software_info.get(app) or {}).get("workload_profile") or {}
+            if profile.get("replay_weight"):
+                stages.update(stage for stage, weight in profile.get("stages", {}).items() if weight > 0)
+        return sorted(stages)
+
+    def weighted_kernel_index(self, target_info, kernel_scores):
+        """
+        Combines normalized kernel scores (1.0 = reference machine) into one index using
+        the app's kernel_weights. A weighted geometric mean is used so a single very fast
+        kernel can't hide a very slow one.
+        """
+        weights = target_info.get("kernel_weights") or {name: 1 for name in kernel_scores}
+        return self._geometric_index(weights, kernel_scores)
+
+    def _geometric_index(self, weights, scores):
+        weights = {k: w for k, w in weights.items() if w > 0 and scores.get(k, 0) > 0}
+        total_weight = sum(weights.values())
+        if not total_weight:
+            return 0
+
+        log_sum = sum(w * math.log(scores[k]) for k, w in weights.items())
+        return round(math.exp(log_sum / total_weight), 3)
+
+    @traced("score.app")
+    def calculate_performance_score(self, target_app, scraper_data, benchmark_data, target_info=None):
+        # target_info: the app's catalog entry when the caller already fetched it (each
+        # catalog lookup parses a fresh copy)
+        if target_info is None:
+            target_info = self.software_info.get(target_app)
         if not target_info:
             return 0, ["Application data missing."]
         
@@ -80,7 +284,10 @@ class DecisionEngine:
         req_ram = target_info.get("min_ram", 0) 
         available_ram = scraper_data.get("available_ram_gb", 0) 
 
-        if available_ram >= req_ram + 2:
+        if not _is_known(available_ram):
+            performance_score += 10
+            warnings.append("Available RAM could not be measured.")
+        elif available_ram >= req_ram + 2:
             performance_score += 15
         elif available_ram >= req_ram:
             performance_score += 10
@@ -88,45 +295,124 @@ class DecisionEngine:
             performance_score += 5
             warnings.append("Low available RAM. Please close background applications.")
 
-        ram_latency = benchmark_data.get("ram_test_speed", 99)
-        if ram_latency <= 0.1:
-            performance_score += 15
-        elif 0.1 < ram_latency <= 0.25:
-            performance_score += 10
-        elif 0.25 < ram_latency <= 0.5:
+        reclaimable = self.estimate_reclaimable(target_app, scraper_data, target_info=target_info)
+        if reclaimable and reclaimable["processes"] and (
+                (_is_known(available_ram) and available_ram < req_ram + 2) or reclaimable["cpu_pct"] >= 10):
+            warnings.append(f"Processes to close: {', '.join(reclaimable['processes'])} "
+                            f"(frees ~{reclaimable['ram_gb']}GB RAM and ~{reclaimable['cpu_pct']}% CPU).")
+
+        # Memory bandwidth (8 points): large copies, mesh/texture loading
+        ram_bandwidth = benchmark_data.get("ram_copy_gbps", 0)
+        if ram_bandwidth >= 10:
+            performance_score += 8
+        elif 5 <= ram_bandwidth < 10:
             performance_score += 5
+        elif 2 <= ram_bandwidth < 5:
+            performance_score += 2
+        else:
+            warnings.append(f"Low memory bandwidth ({ram_bandwidth} GB/s). Large datasets will load slowly.")
+
+        # Memory latency (7 points): random access beyond the CPU caches
+        ram_latency = benchmark_data.get("ram_latency_ns", 999)
+        if ram_latency <= 90:
+            performance_score += 7
+        elif 90 < ram_latency <= 130:
+            performance_score += 4
+        elif 130 < ram_latency <= 200:
+            performance_score += 2
         else:
-            warnings.append("High RAM latency detected. Your memory response is slow.")
+            warnings.append(f"High RAM latency detected ({ram_latency} ns). Your memory response is slow.")
 
         #CPU Test (40 points max)
-        cpu_duration = benchmark_data.get("cpu_stress_time", 99)
-        if cpu_duration <= 0.4:
-            performance_score += 40
-        elif 0.4 < cpu_duration <= 0.8:
-            performance_score += 25
-        elif 0.8 < cpu_duration <= 1.5:
-            performance_score += 10
+        # Each app decides how much single-core speed vs. parallel capacity matters
+        cpu_weights = target_info.get("cpu_weights", {"single_core": 1.0, "multi_core": 0.0})
+        single_weight = cpu_weights.get("single_core", 1.0)
+        multi_weight = cpu_weights.get("multi_core", 0.0)
+        total_weight = (single_weight + multi_weight) or 1.0
+
+        # Single-core: kernel suite scores weighted by what this app actually does
+        cpu_index = self.weighted_kernel_index(target_info, benchmark_data.get("cpu_kernels", {}))
+        if cpu_index >= 1.0:
+            single_points = 40
+        elif 0.6 <= cpu_index < 1.0:
+            single_points = 25
+        elif 0.3 <= cpu_index < 0.6:
+            single_points = 10
         else:
+            single_points = 0
             warnings.append("CPU performance is below optimal levels for this task.")
 
+        # Parallel throughput, measured in reference-machine cores
+        multi_index = benchmark_data.get("cpu_multi_core_index")
+        if multi_index is not None:
+            if multi_index >= 12:
+                multi_points = 40
+            elif 6 <= multi_index < 12:
+                multi_points = 25
+            elif 3 <= multi_index < 6:
+                multi_points = 10
+            else:
+                multi_points = 0
+                if multi_weight > 0:
+                    warnings.append("Low multi-core throughput. Parallel tasks (compiling, solving) will be slow.")
+
+            efficiency = benchmark_data.get("cpu_scaling_efficiency", 1)
+            if multi_weight > 0 and efficiency < 0.6:
+                warnings.append(f"Poor multi-core scaling ({int(efficiency * 100)}%). Cores may be throttling or shared.")
+        else:
+            # No multi-core data: fall back to the single-core result
+            multi_points = single_points
+
+        performance_score += round((single_points * single_weight + multi_points * multi_weight) / total_weight)
+
         #Thermal Deviation (20 points max)
-        thermal_deviation = benchmark_data.get("thermal_deviation", 100)
-        if thermal_deviation < 5:
+        thermal_deviation = benchmark_data.get("thermal_deviation")
+        if "thermal_deviation" not in benchmark_data:
+            # Thermal test skipped (e.g. the quick preset): neutral, nothing to warn about
+            performance_score += 10
+        elif thermal_deviation is None:
+            # Clock speeds are not readable here (e.g. inside a VM); don't punish or reward
+            performance_score += 10
+            warnings.append("CPU clock speed could not be monitored. Thermal throttling was not measured.")
+        elif thermal_deviation < 5:
             performance_score += 20
         elif 5 <= thermal_deviation < 15:
             performance_score += 10
         else:
             warnings.append("High thermal deviation! Your system might be overheating (Throttling).")
 
+        time_to_throttle = benchmark_data.get("thermal_time_to_throttle_s")
+        if time_to_throttle is not None:
+            warnings.append(f"CPU started throttling after {time_to_throttle}s of full load. Long renders/solves will run slower.")
+
         #Disk Speed Test (10 points max)
-        disk_speed = benchmark_data.get("disk_test_speed", 99)
-        if disk_speed <= 0.3:
-            performance_score += 10
-        elif 0.3 < disk_speed <= 0.8:
+        # Sequential read (5 points): project/asset loading
+        seq_read = benchmark_data.get("disk_seq_read_mbps", 0)
+        if seq_read >= 1500:
             performance_score += 5
-        else:
+        elif 400 <= seq_read < 1500:
+            performance_score += 3
+        elif 150 <= seq_read < 400:
+            performance_score += 1
+
+        # 4K random read (5 points): many small files (builds, caches, indexes)
+        rand_iops = benchmark_data.get("disk_rand_read_iops", 0)
+        if rand_iops >= 20000:
+            performance_score += 5
+        elif 5000 <= rand_iops < 20000:
+            performance_score += 3
+        elif 1000 <= rand_iops < 5000:
+            performance_score += 1
+
+        if seq_read < 150 or rand_iops < 1000:
             warnings.append("Slow storage speed. This may cause long loading times.")
 
+        # Other programs competing for the CPU during the benchmark (measured in isolation mode)
+        isolation = benchmark_data.get("isolation") or {}
+        if isolation.get("noise") == "noisy":
+            warnings.append(f"Other programs used {isolation['background_cpu_pct']}% of the CPU during the benchmark. "
+                            "Results may understate this machine; rerun when it is idle.")
+
         #Battery & Power Control
         if not benchmark_data.get("is_plugged", True):
             performance_score -= 25
@@ -139,9 +425,78 @@ class DecisionEngine:
             warnings.append("Battery is critical (<20%). High-performance mode is disabled.")
 
         #Network Control
-        ping = benchmark_data.get("network_test_speed", 0)
-        if ping > 150:
-            warnings.append(f"High network latency ({ping}ms). Cloud tools may experience lag.")
+        req_network = target_info.get("min_network_mbps", 0)
+        if not benchmark_data.get("network_available", False):
+            if req_network:
+                warnings.append(f"Network speed could not be measured. This app needs at least {req_network} Mbps.")
+        else:
+            ping = benchmark_data.get("network_ping_ms") or 0
+            if ping > 150:
+                warnings.append(f"High network latency ({ping}ms). Cloud tools may experience lag.")
+
+            download = benchmark_data.get("network_download_mbps") or 0
+            if download < req_network:
+                performance_score -= 10
+                warnings.append(f"Slow internet ({download} Mbps). This app needs at least {req_network} Mbps.")
+
+        # GPU compute (blended in by the app's gpu_weight): sustained GFLOPS from the GPU stage
+        gpu_weight = target_info.get("gpu_weight", 0)
+        if gpu_weight and "gpu_available" in benchmark_data:
+            gflops = benchmark_data.get("gpu_gflops") or 0
+            if not benchmark_data["gpu_available"]:
+                gpu_points = 0
+                warnings.append("No GPU acceleration available. GPU-heavy work (rendering, simulation) will run on the CPU.")
+            elif gflops >= 15000:
+                gpu_points = 100
+            elif 6000 <= gflops < 15000:
+                gpu_points = 75
+            elif 2000 <= gflops < 6000:
+                gpu_points = 50
+            elif 500 <= gflops < 2000:
+                gpu_points = 25
+            else:
+                gpu_points = 10
+                warnings.append(f"Low GPU compute throughput ({gflops} GFLOPS).")
+
+            sustained = benchmark_data.get("gpu_sustained_ratio")
+            if sustained is not None and sustained < 0.9:
+                warnings.append(f"GPU throughput dropped to {int(sustained * 100)}% under sustained load (throttling).")
+            performance_score = round(performance_score * (1 - gpu_weight) + gpu_points * gpu_weight)
+
+        # Workload replay (blended in by the profile's replay_weight): the app's own mix of
+        # work, e.g. small-file I/O + compiling for Android Studio, BLAS for MATLAB
+        profile = target_info.get("workload_profile") or {}
+        replay = benchmark_data.get("workload_replay") or {}
+        replay_weight = profile.get("replay_weight", 0) if replay else 0
+        stage_scores = {stage: r["index"] for stage, r in replay.items() if r.get("index")} if replay_weight else {}
+        replay_index = self._geometric_index(profile["stages"], stage_scores) if stage_scores else 0
+        if replay_index:
+            if replay_index >= 1.0:
+                replay_points = 100
+            elif 0.6 <= replay_index < 1.0:
+                replay_points = 75
+            elif 0.3 <= replay_index < 0.6:
+                replay_points = 50
+            elif 0.15 <= replay_index < 0.3:
+                replay_points = 25
+            else:
+                replay_points = 10
+            weighted = [stage for stage, weight in profile["stages"].items() if weight > 0 and stage in stage_scores]
+            slowest = min(weighted, key=stage_scores.get)
+            if stage_scores[slowest] < 0.3:
+                warnings.append(f"Slow {_REPLAY_LABELS.get(slowest, slowest)} in the {target_app} workload replay "
+                                f"({int(stage_scores[slowest] * 100)}% of the reference machine).")
+            sustained = replay.get("render", {}).get("sustained_ratio")
+            if profile["stages"].get("render") and sustained is not None and sustained < 0.85:
+                warnings.append(f"Render throughput dropped to {int(sustained * 100)}% during the replay. Long renders will slow down.")
+            performance_score = round(performance_score * (1 - replay_weight) + replay_points * replay_weight)
+
+        # Noisy measurements: the score may sit on the wrong side of a threshold
+        noisy = {m: ci for m, ci in benchmark_data.get("uncertainty", {}).items() if ci > 0.1}
+        if noisy:
+            worst = max(noisy, key=noisy.get)
+            warnings.append(f"Some measurements were noisy ({worst} +-{round(noisy[worst] * 100)}%). "
+                            f"Close other programs or use the thorough preset for a firmer score.")
 
         # Skoru 0-100 arasında sınırla
         performance_score = max(0, min(100, performance_score))
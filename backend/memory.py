@@ -0,0 +1,121 @@
+import time
+import ctypes
+import random
+from array import array
+
+from backend.cancel import CancelToken
+from backend.instrument import traced
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+CACHE_LINE = 64
+# Working-set sizes for the latency sweep. The last one is larger than the L3 cache of
+# current desktop CPUs so it lands in DRAM; the steps in between expose the cache-level cliffs.
+DEFAULT_SWEEP_KB = (16, 128, 1024, 8 * 1024, 32 * 1024, 128 * 1024)
+
+
+def _best_time(fn, repeats):
+    """Runs fn several times and keeps the fastest run (least disturbed by the OS)."""
+    best = None
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        fn()
+        duration = time.perf_counter() - start_time
+        if best is None or duration < best:
+            best = duration
+    return best
+
+
+@traced("memory.bandwidth")
+def measure_bandwidth(size_mb=128, repeats=5, cancel=None):
+    """
+    Sequential read, write and copy bandwidth over preallocated contiguous buffers.
+    Returns GB/s for each. Buffers are allocated and touched once before timing,
+    so page faults and allocation are not part of the measurement.
+    """
+    cancel = cancel or CancelToken()
+    size = size_mb * 1024 * 1024
+
+    if np is not None:
+        src = np.ones(size // 8, dtype=np.uint64)
+        dst = np.zeros(size // 8, dtype=np.uint64)
+        read = lambda: np.add.reduce(src)
+        write = lambda: dst.fill(7)
+        copy = lambda: np.copyto(dst, src)
+    else:
+        src = bytearray(b"\x01") * size
+        dst = bytearray(size)
+        dst_view = memoryview(dst)
+        src_view = memoryview(src)
+        dst_addr = ctypes.addressof(ctypes.c_char.from_buffer(dst))
+        # Searching for a byte that isn't there is a memchr scan over the whole buffer
+        read = lambda: src.find(b"\x00")
+        write = lambda: ctypes.memset(dst_addr, 7, size)
+        copy = lambda: dst_view.__setitem__(slice(None), src_view)
+
+    results = {}
+    for name, fn in (("read", read), ("write", write), ("copy", copy)):
+        cancel.check()
+        fn() # Touch the pages once
+        duration = _best_time(fn, repeats)
+        results[f"{name}_gbps"] = round(size / duration / 1e9, 2) if duration > 0 else 0
+    return results
+
+
+def _build_chain(working_set_bytes, seed=1):
+    """
+    Builds a random cyclic pointer chain with one node per cache line.
+    chain[i] holds the index of the next node, so every load depends on the previous one
+    and the hardware prefetcher can't guess the next address.
+    """
+    slots = max(working_set_bytes // 8, CACHE_LINE // 8)
+    stride = CACHE_LINE // 8
+    lines = slots // stride
+
+    if np is not None:
+        order = np.random.default_rng(seed).permutation(lines) * stride
+        chain = np.zeros(slots, dtype=np.int64)
+        chain[order] = np.roll(order, -1)
+        return array("q", chain.tobytes())
+
+    order = [i * stride for i in range(lines)]
+    random.Random(seed).shuffle(order)
+    chain = array("q", bytes(8 * slots))
+    for k in range(lines - 1):
+        chain[order[k]] = order[k + 1]
+    chain[order[-1]] = order[0]
+    return chain
+
+
+def _chase(chain, steps):
+    idx = 0
+    start_time = time.perf_counter()
+    for _ in range(steps):
+        idx = chain[idx]
+    return time.perf_counter() - start_time
+
+
+@traced("memory.latency")
+def measure_latency(sweep_kb=DEFAULT_SWEEP_KB, steps=200_000, cancel=None):
+    """
+    Random-access latency via pointer chasing, in ns per dependent load.
+    The interpreter's per-step cost is measured on a tiny (L1-resident) chain and subtracted,
+    so what remains is the extra time the memory hierarchy adds at each working-set size.
+    """
+    cancel = cancel or CancelToken()
+    baseline_chain = _build_chain(4 * 1024)
+    _chase(baseline_chain, steps)
+    baseline = min(_chase(baseline_chain, steps) for _ in range(3))
+
+    sweep = {}
+    for size_kb in sweep_kb:
+        cancel.check()
+        chain = _build_chain(size_kb * 1024)
+        _chase(chain, steps // 4) # Warm the TLB and caches that should be warm
+        duration = min(_chase(chain, steps) for _ in range(2))
+        sweep[size_kb] = round(max(duration - baseline, 0) / steps * 1e9, 2)
+    return sweep
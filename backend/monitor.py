@@ -0,0 +1,166 @@
+import time
+import threading
+import statistics
+import multiprocessing
+from array import array
+
+import psutil
+
+from backend.kernels import branchy_compile
+from backend.cancel import pool_map
+
+
+class RingBuffer:
+    """
+    Fixed-size ring buffer of numeric rows stored in one flat array('d').
+    No per-sample Python objects are kept, so long monitoring runs stay small and cheap.
+    """
+    def __init__(self, capacity, width):
+        self.capacity = capacity
+        self.width = width
+        self._data = array("d", bytes(8 * capacity * width))
+        self._next = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def append(self, row):
+        with self._lock:
+            start = self._next * self.width
+            self._data[start:start + self.width] = array("d", row)
+            self._next = (self._next + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+    def rows(self):
+        """Returns the stored rows, oldest first."""
+        with self._lock:
+            first = (self._next - self._count) % self.capacity
+            indexes = [(first + k) % self.capacity for k in range(self._count)]
+            return [self._data[i * self.width:(i + 1) * self.width].tolist() for i in indexes]
+
+    def __len__(self):
+        return self._count
+
+
+# Column layout of one thermal sample; per-core frequencies follow these columns
+T, UTIL, TEMP, FREQ_AVG, FREQ_MAX, FREQ_MIN = range(6)
+
+
+def _max_temperature():
+    """Hottest CPU-ish sensor reading in C, or 0 when the platform exposes none."""
+    if not hasattr(psutil, "sensors_temperatures"):
+        return 0
+    try:
+        sensors = psutil.sensors_temperatures()
+    except Exception:
+        return 0
+    readings = [t.current for name, entries in sensors.items() for t in entries
+                if t.current and name.lower() in ("coretemp", "k10temp", "zenpower", "cpu_thermal", "acpitz")]
+    return max(readings, default=0)
+
+
+class ThermalSampler(threading.Thread):
+    """
+    Background thread sampling per-core frequency, CPU utilization and temperature
+    at a fixed rate into a RingBuffer. Temperature sensors are slower to read than
+    frequencies, so they are read only every temperature_every samples.
+    """
+    def __init__(self, interval=0.25, capacity=4096, temperature_every=4):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.temperature_every = temperature_every
+        self.cores = len(psutil.cpu_freq(percpu=True) or []) or 1
+        self.buffer = RingBuffer(capacity, 6 + self.cores)
+        self._stop_event = threading.Event()
+
+    def run(self):
+        start_time = time.perf_counter()
+        psutil.cpu_percent(interval=None) # Prime the utilization counter
+        temperature = _max_temperature()
+        sample = 0
+        while not self._stop_event.wait(self.interval):
+            if sample % self.temperature_every == 0:
+                temperature = _max_temperature()
+            freqs = [f.current for f in (psutil.cpu_freq(percpu=True) or [])]
+            freqs = (freqs + [0.0] * self.cores)[:self.cores]
+            self.buffer.append([
+                time.perf_counter() - start_time,
+                psutil.cpu_percent(interval=None),
+                temperature,
+                sum(freqs) / len(freqs),
+                max(freqs),
+                min(freqs),
+            ] + freqs)
+            sample += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _load_until(deadline):
+    """Keeps one core busy with compile-like work until the (perf_counter) deadline."""
+    rounds = 0
+    while time.perf_counter() < deadline:
+        branchy_compile(20_000)
+        rounds += 1
+    return rounds
+
+
+def run_sustained_load(duration, workers=None, cancel=None, pool_options=None):
+    """
+    Puts every logical CPU under load for `duration` seconds (stops early if cancelled).
+    pool_options are passed on to multiprocessing.Pool (e.g. an initializer that pins workers).
+    """
+    workers = workers or psutil.cpu_count(logical=True) or 1
+    with multiprocessing.Pool(processes=workers, **(pool_options or {})) as pool:
+        deadline = time.perf_counter() + duration
+        # perf_counter is system-wide on the platforms we support, so children can share the deadline
+        return sum(pool_map(pool, _load_until, [deadline] * workers, cancel=cancel))
+
+
+def downsample(rows, points=60):
+    """Averages rows into at most `points` buckets for a compact trace."""
+    if len(rows) <= points:
+        buckets = [[row] for row in rows]
+    else:
+        size = len(rows) / points
+        buckets = [rows[int(i * size):int((i + 1) * size)] for i in range(points)]
+    trace = []
+    for bucket in buckets:
+        trace.append({
+            "t": round(statistics.fmean(r[T] for r in bucket), 2),
+            "freq_mhz": round(statistics.fmean(r[FREQ_AVG] for r in bucket)),
+            "util_pct": round(statistics.fmean(r[UTIL] for r in bucket), 1),
+            "temp_c": round(max(r[TEMP] for r in bucket), 1),
+        })
+    return trace
+
+
+def analyze_thermal_trace(rows, throttle_ratio=0.9):
+    """
+    Turns raw samples into throttling figures:
+    time_to_throttle_s - first time the average clock fell below throttle_ratio * peak (None if never)
+    sustained_ratio    - median clock over the second half of the run divided by the peak clock
+    """
+    freqs = [r[FREQ_AVG] for r in rows]
+    peak = max(freqs, default=0)
+    if peak <= 0:
+        # Frequency is not exposed on this platform (e.g. some VMs)
+        return {"peak_mhz": 0, "sustained_mhz": 0, "sustained_ratio": None, "time_to_throttle_s": None,
+                "max_temp_c": max((r[TEMP] for r in rows), default=0)}
+
+    peak_index = freqs.index(peak)
+    time_to_throttle = None
+    for r in rows[peak_index:]:
+        if r[FREQ_AVG] < peak * throttle_ratio:
+            time_to_throttle = round(r[T], 2)
+            break
+
+    sustained = statistics.median(freqs[len(freqs) // 2:])
+    return {
+        "peak_mhz": round(peak),
+        "sustained_mhz": round(sustained),
+        "sustained_ratio": round(sustained / peak, 3),
+        "time_to_throttle_s": time_to_throttle,
+        "max_temp_c": max(r[TEMP] for r in rows),
+    }
@@ -0,0 +1,345 @@
+import os
+import time
+import asyncio
+import argparse
+import threading
+import statistics
+from urllib.parse import urlsplit
+
+
+CHUNK = 64 * 1024
+# One shared chunk of payload; the probe measures the network, not data generation
+_PAYLOAD = os.urandom(CHUNK)
+
+
+# --- Local stand-in server -------------------------------------------------
+# Line-based protocol:
+#   PING\n        -> PONG\n
+#   DOWN <n>\n    -> server sends n bytes
+#   UP <n>\n      -> client sends n bytes, server answers OK\n once they have arrived
+
+async def _handle_client(reader, writer):
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command, _, arg = line.decode().strip().partition(" ")
+            if command == "PING":
+                writer.write(b"PONG\n")
+            elif command == "DOWN":
+                remaining = int(arg)
+                while remaining > 0:
+                    writer.write(_PAYLOAD[:min(CHUNK, remaining)])
+                    remaining -= CHUNK
+                    await writer.drain()
+            elif command == "UP":
+                remaining = int(arg)
+                while remaining > 0:
+                    data = await reader.read(min(CHUNK, remaining))
+                    if not data:
+                        break
+                    remaining -= len(data)
+                writer.write(b"OK\n")
+            else:
+                writer.write(b"ERR\n")
+            await writer.drain()
+    except (ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+class LocalProbeServer:
+    """
+    Bundled echo/sink/source server, run on a background event loop.
+    Useful in air-gapped labs (run it on a lab host) and for testing the TCP probe locally.
+    """
+    def __init__(self, host="127.0.0.1", port=0):
+        self.host = host
+        self.port = port
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+
+    def start(self, timeout=10):
+        """
+        Starts the server thread and returns the (host, port) it listens on.
+        Raises the server's startup error (e.g. the port is in use), or TimeoutError.
+        """
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise TimeoutError(f"Probe server did not start on {self.host}:{self.port} within {timeout}s")
+        if self._error is not None:
+            self._thread.join()
+            self._loop = None
+            raise self._error
+        return self.host, self.port
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._server = self._loop.run_until_complete(asyncio.start_server(_handle_client, self.host, self.port))
+        except Exception as e:
+            self._error = e
+            self._loop.close()
+            self._ready.set()
+            return
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+        self._server.close()
+        self._loop.run_until_complete(self._server.wait_closed())
+        self._loop.close()
+
+    def stop(self):
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+
+# --- Probe backends ---------------------------------------------------------
+
+def _result(backend, download_mbps=None, upload_mbps=None, latencies=None, error=None):
+    """Standard result shape. Values are None (never 0) when something was not measured."""
+    latencies = sorted(latencies or [])
+
+    def percentile(p):
+        if not latencies:
+            return None
+        return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))], 2)
+
+    return {
+        "backend": backend,
+        "available": error is None,
+        "download_mbps": round(download_mbps, 1) if download_mbps is not None else None,
+        "upload_mbps": round(upload_mbps, 1) if upload_mbps is not None else None,
+        "ping_ms": round(statistics.median(latencies), 2) if latencies else None,
+        "latency_p50_ms": percentile(50),
+        "latency_p90_ms": percentile(90),
+        "latency_p99_ms": percentile(99),
+        "error": str(error) if error is not None else None
+    }
+
+
+class SpeedtestBackend:
+    """Public speedtest.net servers via speedtest-cli (needs internet access)."""
+    name = "speedtest"
+
+    def measure(self):
+        try:
+            import speedtest
+            st = speedtest.Speedtest()
+            st.get_best_server()
+            download = st.download() / 1_000_000 # Mbps
+            upload = st.upload() / 1_000_000
+            return _result(self.name, download, upload, [st.results.ping])
+        except Exception as e:
+            return _result(self.name, error=str(e) or type(e).__name__)
+
+
+class TcpProbeBackend:
+    """
+    asyncio TCP probe against a LocalProbeServer-compatible endpoint.
+    Measures download/upload over several concurrent streams and RTT percentiles.
+    """
+    name = "tcp"
+
+    def __init__(self, host, port, streams=4, transfer_mb=32, pings=50, timeout=30):
+        self.host = host
+        self.port = port
+        self.streams = streams
+        self.transfer_bytes = transfer_mb * 1024 * 1024
+        self.pings = pings
+        self.timeout = timeout
+
+    async def _ping(self, reader, writer):
+        latencies = []
+        for _ in range(self.pings):
+            start_time = time.perf_counter()
+            writer.write(b"PING\n")
+            await writer.drain()
+            await reader.readline()
+            latencies.append((time.perf_counter() - start_time) * 1000)
+        return latencies
+
+    async def _download(self, reader, writer, nbytes):
+        writer.write(f"DOWN {nbytes}\n".encode())
+        await writer.drain()
+        remaining = nbytes
+        while remaining > 0:
+            data = await reader.read(min(CHUNK * 4, remaining))
+            if not data:
+                raise ConnectionError("Connection closed during download")
+            remaining -= len(data)
+
+    async def _upload(self, reader, writer, nbytes):
+        writer.write(f"UP {nbytes}\n".encode())
+        remaining = nbytes
+        while remaining > 0:
+            writer.write(_PAYLOAD[:min(CHUNK, remaining)])
+            remaining -= CHUNK
+            await writer.drain()
+        await reader.readline()
+
+    async def _transfer(self, connections, step):
+        per_stream = self.transfer_bytes // len(connections)
+        start_time = time.perf_counter()
+        await asyncio.gather(*(step(r, w, per_stream) for r, w in connections))
+        duration = time.perf_counter() - start_time
+        return per_stream * len(connections) * 8 / 1_000_000 / duration
+
+    async def _measure(self):
+        connections = await asyncio.gather(
+            *(asyncio.open_connection(self.host, self.port) for _ in range(self.streams)))
+        try:
+            latencies = await self._ping(*connections[0])
+            download = await self._transfer(connections, self._download)
+            upload = await self._transfer(connections, self._upload)
+            return _result(self.name, download, upload, latencies)
+        finally:
+            for _, writer in connections:
+                writer.close()
+
+    def measure(self):
+        try:
+            return asyncio.run(asyncio.wait_for(self._measure(), self.timeout))
+        except Exception as e:
+            return _result(self.name, error=str(e) or type(e).__name__)
+
+
+class HttpProbeBackend:
+    """
+    Plain-HTTP download probe: concurrent GETs of one URL (e.g. a large file on a lab web server).
+    Latency percentiles come from TCP connect times. Upload is not measured.
+    """
+    name = "http"
+
+    def __init__(self, url, streams=4, pings=20, timeout=30):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.streams = streams
+        self.pings = pings
+        self.timeout = timeout
+
+    async def _connect_time(self):
+        start_time = time.perf_counter()
+        _, writer = await asyncio.open_connection(self.host, self.port)
+        duration = (time.perf_counter() - start_time) * 1000
+        writer.close()
+        return duration
+
+    async def _read_headers(self, reader):
+        """Checks the status line (2xx only; a redirect or error page is not the test file) and returns the headers."""
+        status_line = (await reader.readline()).decode("latin-1").split(" ", 2)
+        if len(status_line) < 2 or not status_line[0].startswith("HTTP/") or not status_line[1].isdigit():
+            raise ValueError(f"Not an HTTP response from {self.host}:{self.port}")
+        status = int(status_line[1])
+        if not 200 <= status < 300:
+            raise ValueError(f"HTTP {status} for {self.path}")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    async def _get(self):
+        """Downloads the URL once. Returns the body size in bytes (headers not counted)."""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(f"GET {self.path} HTTP/1.0\r\nHost: {self.host}\r\n\r\n".encode())
+            await writer.drain()
+            headers = await self._read_headers(reader)
+            received = 0
+            while True:
+                data = await reader.read(CHUNK * 4)
+                if not data:
+                    break
+                received += len(data)
+        finally:
+            writer.close()
+
+        length = headers.get("content-length")
+        if length is not None and received != int(length):
+            raise ValueError(f"Incomplete response: {received} of {length} bytes")
+        if not received:
+            raise ValueError(f"Empty response for {self.path}")
+        return received
+
+    async def _measure(self):
+        latencies = [await self._connect_time() for _ in range(self.pings)]
+        start_time = time.perf_counter()
+        sizes = await asyncio.gather(*(self._get() for _ in range(self.streams)))
+        duration = time.perf_counter() - start_time
+        return _result(self.name, sum(sizes) * 8 / 1_000_000 / duration, None, latencies)
+
+    def measure(self):
+        try:
+            return asyncio.run(asyncio.wait_for(self._measure(), self.timeout))
+        except Exception as e:
+            return _result(self.name, error=str(e) or type(e).__name__)
+
+
+def make_backend(endpoint=None):
+    """
+    Builds a probe backend from an endpoint string:
+    None / "speedtest"  -> public speedtest.net servers
+    "tcp://host:port"   -> TcpProbeBackend (a LocalProbeServer on a lab host)
+    "http://host/path"  -> HttpProbeBackend
+    """
+    endpoint = endpoint or os.environ.get("RIG_NETWORK_ENDPOINT") or "speedtest"
+    if endpoint == "speedtest":
+        return SpeedtestBackend()
+    parts = urlsplit(endpoint)
+    if parts.scheme not in ("tcp", "http"):
+        raise ValueError(f"Unsupported network endpoint: {endpoint}")
+    try:
+        port = parts.port
+    except ValueError:
+        raise ValueError(f"Invalid port in network endpoint: {endpoint}") from None
+    if not parts.hostname:
+        raise ValueError(f"Network endpoint has no host: {endpoint}")
+    if parts.scheme == "tcp":
+        if port is None:
+            raise ValueError(f"Network endpoint needs a port (tcp://host:port): {endpoint}")
+        return TcpProbeBackend(parts.hostname, port)
+    return HttpProbeBackend(endpoint)
+
+
+def endpoint_arg(value):
+    """argparse type for --network-endpoint: rejects malformed endpoints before anything runs."""
+    try:
+        make_backend(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
+async def _serve(host, port):
+    server = await asyncio.start_server(_handle_client, host, port)
+    print(f"Network probe server listening on {host}:{port} (endpoint: tcp://<this-host>:{port})")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rig-Engineer network probe server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(_serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import os
+import time
+import shutil
+import tempfile
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+import psutil
+
+from backend.kernels import REFERENCE_OPS_PER_SEC, branchy_compile, run_kernel
+from backend.cancel import pool_map
+from backend.instrument import span
+
+
+# Throughput of each replay stage on the reference machine (Ryzen 7 5800X, 16 threads,
+# CPython 3.11, NVMe, warm page cache). index = measured / reference, like the kernel scores.
+REFERENCE_RATES = {
+    "small_files": 100_000,     # source files stat'ed and read per second
+    "compile": 60_000_000,      # characters tokenized per second, all cores
+    "render": 6_500_000,        # pixels shaded per second, all cores
+}
+
+# Default wall time per stage (seconds) for a full run, set-up (worker processes, the file
+# tree) included; throughput is measured over what is left after set-up, and at least one
+# round always runs. The render stage runs longest: what matters there is the throughput
+# once clocks have settled, not the first seconds.
+STAGE_DURATIONS = {"small_files": 2.0, "compile": 4.0, "blas": 3.0, "render": 10.0}
+
+# Compile units of mixed sizes (characters), like a build's mix of small and large files
+_UNIT_SIZES = (8_000, 30_000, 15_000, 60_000, 5_000, 22_000)
+_SOURCE_LINE = 'let value_{n} = call(item_{n}, "label {n}") if value_{n} >= {n}\n'
+
+# A few spheres (center x, y, z, radius, albedo) and one light for the render stage
+_SCENE = ((0.0, 0.0, 3.0, 1.0, 0.8), (1.5, 0.5, 4.0, 0.7, 0.6), (-1.4, -0.3, 3.5, 0.6, 0.9),
+          (0.0, -101.0, 3.0, 100.0, 0.5))
+_LIGHT = (0.577, 0.577, -0.577)
+_TILE = 32
+_IMAGE = 256
+
+
+def make_source_tree(directory, files=1200):
+    """Writes `files` small source-like files (1-16 KB) in nested folders. Returns their paths."""
+    paths = []
+    for i in range(files):
+        folder = os.path.join(directory, f"module_{i % 24}", f"pkg_{i % 7}")
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"File{i}.src")
+        lines = 16 + (i * 37) % 240
+        with open(path, "w") as f:
+            f.write("".join(_SOURCE_LINE.format(n=n) for n in range(lines)))
+        paths.append(path)
+    return paths
+
+
+def _read_file(path):
+    # An incremental build stats each input before reading it
+    os.stat(path)
+    with open(path, "rb") as f:
+        return len(f.read())
+
+
+def replay_small_files(duration, directory=None, files=None, threads=None, cancel=None):
+    """
+    Gradle/IDE-indexer style I/O: many threads stat and read a tree of small files, over and
+    over. The files are in the page cache after the first pass, so this measures per-file
+    overhead (system calls, filesystem, antivirus filters) rather than raw disk speed.
+    The tree (up to 1200 files, fewer for short runs) is written within `duration`.
+    """
+    stage_start = time.perf_counter()
+    threads = threads or min(32, 2 * (psutil.cpu_count(logical=True) or 1))
+    files = files or min(1200, max(100, int(duration * 600)))
+    tree = tempfile.mkdtemp(prefix="rig_replay_", dir=directory)
+    try:
+        paths = make_source_tree(tree, files)
+        read_files = read_bytes = 0
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            start_time = time.perf_counter()
+            while True:
+                read_bytes += sum(pool.map(_read_file, paths))
+                read_files += len(paths)
+                now = time.perf_counter()
+                elapsed = now - start_time
+                if now - stage_start >= duration:
+                    break
+                if cancel:
+                    cancel.check()
+    finally:
+        shutil.rmtree(tree, ignore_errors=True)
+
+    files_per_sec = read_files / elapsed
+    return {
+        "files_per_sec": round(files_per_sec),
+        "mb_per_sec": round(read_bytes / elapsed / 1e6, 1),
+        "threads": threads,
+        "index": round(files_per_sec / REFERENCE_RATES["small_files"], 3),
+    }
+
+
+def replay_compile(duration, workers=None, pool_options=None, cancel=None):
+    """
+    Parallel build: compile-like units of mixed sizes handed to a process pool, one batch
+    after another, so scheduling and uneven unit sizes count as they do in a real build.
+    """
+    stage_start = time.perf_counter()
+    workers = workers or psutil.cpu_count(logical=True) or 1
+    batch = [_UNIT_SIZES[i % len(_UNIT_SIZES)] for i in range(workers * 3)]
+    chars = units = 0
+    with multiprocessing.Pool(processes=workers, **(pool_options or {})) as pool:
+        pool.map(abs, range(workers)) # Process start-up is not part of the build's rate
+        start_time = time.perf_counter()
+        while True:
+            chars += sum(pool_map(pool, branchy_compile, batch, cancel=cancel))
+            units += len(batch)
+            now = time.perf_counter()
+            elapsed = now - start_time
+            if now - stage_start >= duration:
+                break
+
+    chars_per_sec = chars / elapsed
+    return {
+        "units_per_sec": round(units / elapsed, 1),
+        "chars_per_sec": round(chars_per_sec),
+        "workers": workers,
+        "index": round(chars_per_sec / REFERENCE_RATES["compile"], 3),
+    }
+
+
+def replay_blas(duration, cancel=None):
+    """
+    MATLAB/NumPy style dense linear algebra: repeated matrix multiplies through the BLAS
+    library (which uses every core by itself). Pure-Python matmul without NumPy.
+    """
+    ops = 0
+    start_time = time.perf_counter()
+    while True:
+        result = run_kernel("float_matmul")
+        ops += result["ops_per_sec"] * result["duration"]
+        elapsed = time.perf_counter() - start_time
+        if elapsed >= duration:
+            break
+        if cancel:
+            cancel.check()
+
+    ops_per_sec = ops / elapsed
+    return {
+        "gflops": round(ops_per_sec / 1e9, 2),
+        "backend": result["backend"],
+        "index": round(ops_per_sec / REFERENCE_OPS_PER_SEC[("float_matmul", result["backend"])], 3),
+    }
+
+
+def render_tile(origin):
+    """Ray-traces one _TILE x _TILE tile of the test scene with diffuse shading. Returns pixels."""
+    x0, y0 = origin
+    lx, ly, lz = _LIGHT
+    shade = 0.0
+    for py in range(y0, y0 + _TILE):
+        for px in range(x0, x0 + _TILE):
+            dx, dy, dz = (px - _IMAGE / 2) / _IMAGE, (_IMAGE / 2 - py) / _IMAGE, 1.0
+            norm = (dx * dx + dy * dy + dz * dz) ** 0.5
+            dx, dy, dz = dx / norm, dy / norm, dz / norm
+            nearest, hit = float("inf"), None
+            for sphere in _SCENE:
+                cx, cy, cz, radius, _ = sphere
+                b = dx * cx + dy * cy + dz * cz
+                disc = b * b - (cx * cx + cy * cy + cz * cz) + radius * radius
+                if disc > 0:
+                    t = b - disc ** 0.5
+                    if 0 < t < nearest:
+                        nearest, hit = t, sphere
+            if hit is not None:
+                cx, cy, cz, radius, albedo = hit
+                nx, ny, nz = (dx * nearest - cx) / radius, (dy * nearest - cy) / radius, (dz * nearest - cz) / radius
+                shade += albedo * max(nx * lx + ny * ly + nz * lz, 0.0)
+    return _TILE * _TILE
+
+
+def replay_render(duration, workers=None, pool_options=None, cancel=None):
+    """
+    Blender/Cycles style rendering: every core shades image tiles (floating-point math)
+    for the whole window. Reports the overall rate and sustained_ratio, the rate over the
+    last third of the run relative to the first third (below 1.0 = slowing down, e.g. throttling).
+    """
+    stage_start = time.perf_counter()
+    workers = workers or psutil.cpu_count(logical=True) or 1
+    tiles = [(x, y) for y in range(0, _IMAGE, _TILE) for x in range(0, _IMAGE, _TILE)]
+    batch = [tiles[i % len(tiles)] for i in range(workers * 4)]
+    progress = [] # (seconds since start, pixels in batch)
+    with multiprocessing.Pool(processes=workers, **(pool_options or {})) as pool:
+        pool.map(abs, range(workers))
+        start_time = time.perf_counter()
+        while True:
+            pixels = sum(pool_map(pool, render_tile, batch, cancel=cancel))
+            now = time.perf_counter()
+            elapsed = now - start_time
+            progress.append((elapsed, pixels))
+            if now - stage_start >= duration:
+                break
+
+    def rate(first, last):
+        window = [(t, p) for t, p in progress if first < t <= last]
+        if not window:
+            return None
+        previous = max((t for t, _ in progress if t <= first), default=0.0)
+        return sum(p for _, p in window) / (window[-1][0] - previous)
+
+    pixels_per_sec = sum(p for _, p in progress) / elapsed
+    early, late = rate(0, elapsed / 3), rate(2 * elapsed / 3, elapsed)
+    return {
+        "pixels_per_sec": round(pixels_per_sec),
+        "sustained_ratio": round(late / early, 3) if early and late and len(progress) >= 3 else None,
+        "workers": workers,
+        "index": round(pixels_per_sec / REFERENCE_RATES["render"], 3),
+    }
+
+
+STAGES = {
+    "small_files": replay_small_files,
+    "compile": replay_compile,
+    "blas": replay_blas,
+    "render": replay_render,
+}
+
+
+def run_replay(stages, durations=None, workers=None, pool_options=None, directory=None, cancel=None,
+               budget_s=None):
+    """
+    Runs the named replay stages (see STAGES; unknown names are skipped) one after another.
+    durations overrides STAGE_DURATIONS per stage; workers/pool_options apply to the
+    process-pool stages and directory to the small-file stage.
+    budget_s limits the wall time of all stages together: each stage gets at most an even
+    share of what is left, and stages that no time is left for are skipped.
+    Returns {stage: result}, each result carrying an "index" (1.0 = reference machine).
+    """
+    durations = dict(STAGE_DURATIONS, **(durations or {}))
+    deadline = time.perf_counter() + budget_s if budget_s is not None else None
+    names = [stage for stage in STAGES if stage in stages]
+    results = {}
+    for i, name in enumerate(names):
+        duration = durations[name]
+        if deadline is not None:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            duration = min(duration, remaining / (len(names) - i))
+        with span(f"replay.{name}"):
+            if name == "small_files":
+                results[name] = replay_small_files(duration, directory=directory, cancel=cancel)
+            elif name == "blas":
+                results[name] = replay_blas(duration, cancel=cancel)
+            else:
+                results[name] = STAGES[name](duration, workers=workers, pool_options=pool_options, cancel=cancel)
+    return results
@@ -0,0 +1,111 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from backend.cancel import BenchmarkCancelled, CancelToken
+from backend.instrument import span
+
+
+COMPUTE = "compute"
+IO = "io"
+
+
+class Task:
+    """
+    One benchmark phase.
+    lane: COMPUTE tasks run one at a time on the calling thread so they never slow each
+          other down; IO tasks (network, battery, disk listing) run concurrently on threads.
+    depends_on: names of tasks whose results are passed to func as positional arguments.
+    """
+    def __init__(self, name, func, lane=COMPUTE, depends_on=()):
+        self.name = name
+        self.func = func
+        self.lane = lane
+        self.depends_on = tuple(depends_on)
+
+
+class PhaseScheduler:
+    def __init__(self, max_io_workers=4):
+        """Dependency-aware scheduler that overlaps I/O-bound probes with serialized compute tests."""
+        self.max_io_workers = max_io_workers
+
+    def run(self, tasks, on_done=None, cancel=None):
+        """
+        Runs the tasks and returns (results, report).
+        Compute tasks keep their listed order; each starts once its dependencies are done.
+        A task that raises stores None as its result and its error in the report.
+        on_done(name, result) is called on the calling thread as each task finishes.
+        When `cancel` (a CancelToken) is cancelled, no further task starts and
+        BenchmarkCancelled is raised without waiting for I/O tasks still in flight.
+        """
+        cancel = cancel or CancelToken()
+        results = {}
+        durations = {}
+        errors = {}
+        compute_queue = [t for t in tasks if t.lane == COMPUTE]
+        io_waiting = [t for t in tasks if t.lane == IO]
+        running = {}
+
+        def finish(name, result, duration, error=None):
+            results[name] = result
+            durations[name] = round(duration, 4)
+            if error is not None:
+                errors[name] = str(error)
+            if on_done:
+                on_done(name, result)
+
+        def timed(task, args):
+            start_time = time.perf_counter()
+            try:
+                with span(f"phase.{task.name}", lane=task.lane):
+                    result = task.func(*args)
+                return result, time.perf_counter() - start_time, None
+            except BenchmarkCancelled:
+                raise
+            except Exception as e:
+                return None, time.perf_counter() - start_time, e
+
+        def collect(futures):
+            for future in futures:
+                name = running.pop(future)
+                result, duration, error = future.result()
+                finish(name, result, duration, error)
+
+        wall_start = time.perf_counter()
+        pool = ThreadPoolExecutor(max_workers=self.max_io_workers)
+        try:
+            while compute_queue or io_waiting or running:
+                cancel.check()
+                # Launch every I/O task whose dependencies are satisfied
+                for task in [t for t in io_waiting if all(d in results for d in t.depends_on)]:
+                    io_waiting.remove(task)
+                    args = [results[d] for d in task.depends_on]
+                    running[pool.submit(timed, task, args)] = task.name
+
+                collect([f for f in running if f.done()])
+
+                ready = next((t for t in compute_queue if all(d in results for d in t.depends_on)), None)
+                if ready is not None:
+                    compute_queue.remove(ready)
+                    result, duration, error = timed(ready, [results[d] for d in ready.depends_on])
+                    finish(ready.name, result, duration, error)
+                elif running:
+                    # Nothing to compute until an I/O task finishes (re-checking for cancellation)
+                    done, _ = wait(list(running), timeout=0.1, return_when=FIRST_COMPLETED)
+                    collect(done)
+                elif compute_queue or io_waiting:
+                    missing = [t.name for t in compute_queue + io_waiting]
+                    raise ValueError(f"Unresolvable task dependencies: {missing}")
+        finally:
+            # On cancellation don't block on I/O probes (e.g. a speed test) that are still running
+            pool.shutdown(wait=not cancel.cancelled, cancel_futures=True)
+
+        wall_time = time.perf_counter() - wall_start
+        serial_time = sum(durations.values())
+        report = {
+            "wall_time_s": round(wall_time, 2),
+            "serial_time_s": round(serial_time, 2),
+            "time_saved_s": round(max(serial_time - wall_time, 0), 2),
+            "phases": durations,
+            "errors": errors
+        }
+        return results, report
@@ -1,20 +1,98 @@
 import os
+import time
+import heapq
 import psutil
 import platform
-import GPUtil
+import threading
 import subprocess
+from backend.cache import SpecCache
+from backend.fingerprint import boot_fingerprint
+from backend.instrument import span, traced
+
+UNKNOWN = "unknown"
+
+# Per-probe time limits in seconds. A probe that misses its limit is reported as "unknown"
+# instead of freezing the whole scan (e.g. a slow PowerShell or a hung network mount).
+DEFAULT_PROBE_TIMEOUTS = {
+    "static": 5,
+    "gpu": 8,
+    "available_ram": 2,
+    "disks": 5,
+    "processes": 4,
+}
+
+
+def run_probes(probes, timeouts, default_timeout=5, label="probe"):
+    """
+    Runs every probe concurrently on its own daemon thread and waits for each one up to
+    its own timeout (counted from the common start). Stalled threads are abandoned, not
+    joined, so they can never block the caller or interpreter exit.
+    Returns (results, timings, status) where status is "ok", "timeout" or "error".
+    Each probe is traced as a "<label>.<name>" span (see backend.instrument).
+    """
+    results, timings, status = {}, {}, {}
+    threads = {}
+
+    def target(name, fn):
+        start_time = time.perf_counter()
+        try:
+            with span(f"{label}.{name}"):
+                results[name] = fn()
+            status[name] = "ok"
+        except Exception as e:
+            status[name] = f"error: {e}"
+        timings[name] = round(time.perf_counter() - start_time, 4)
+
+    start_time = time.perf_counter()
+    for name, fn in probes.items():
+        threads[name] = threading.Thread(target=target, args=(name, fn), daemon=True)
+        threads[name].start()
+
+    for name, thread in threads.items():
+        remaining = start_time + timeouts.get(name, default_timeout) - time.perf_counter()
+        thread.join(max(remaining, 0))
+        if thread.is_alive():
+            status[name] = "timeout"
+            timings[name] = round(time.perf_counter() - start_time, 4)
+
+    return {k: v for k, v in results.items() if status.get(k) == "ok"}, timings, status
+
+
+def _linux_cpu_name():
+    with open("/proc/cpuinfo") as f:
+        for line in f:
+            if line.startswith("model name"):
+                return line.split(":", 1)[1].strip()
+    return None
+
 
 class HardwareScraper:
-    def __init__(self):
-        """Initialize the hardware scraper module."""
-        pass
+    def __init__(self, probe_timeouts=None, cache=None):
+        """
+        Initialize the hardware scraper module.
+        cache: SpecCache for static facts (defaults to the per-user cache); pass False to disable.
+        """
+        self.probe_timeouts = dict(DEFAULT_PROBE_TIMEOUTS, **(probe_timeouts or {}))
+        self.cache = SpecCache() if cache is None else cache
+        # pid -> psutil.Process, kept across samples so CPU time deltas belong to the same process
+        self._processes = {}
+        # Prime the utilization counter so get_dynamic_info() can sample without blocking
+        psutil.cpu_percent(interval=None)
 
     def get_static_info(self):
         """Retrieves static system information such as CPU model and total RAM."""
+        cpu_name = None
         try:
-            cpu_name = subprocess.check_output("wmic cpu get name", shell=True).decode().split('\n')[1].strip()
+            # wmic only exists on Windows; don't spawn it (and wait for it to fail) elsewhere
+            if platform.system() == "Windows":
+                with span("scan.wmic"):
+                    cpu_name = subprocess.check_output("wmic cpu get name", shell=True,
+                                                       timeout=self.probe_timeouts["static"]).decode().split('\n')[1].strip()
+            elif platform.system() == "Linux":
+                cpu_name = _linux_cpu_name()
         except Exception:
-            cpu_name = platform.processor()
+            pass
+        cpu_name = cpu_name or platform.processor() or UNKNOWN
 
         os_base = platform.system()
         if os_base == "Windows":
@@ -28,38 +106,50 @@ class HardwareScraper:
             "os": os_name
         }
     
-    def get_dynamic_info(self):
-        """Retrieves real-time system metrics like CPU and RAM usage percentage."""
+    def get_dynamic_info(self, interval=None):
+        """
+        Retrieves real-time system metrics like CPU and RAM usage percentage.
+        CPU usage is measured since the previous call (or since the scraper was created);
+        pass interval=N to block and measure over N seconds instead.
+        """
         return {
-            "cpu_usage_pct": psutil.cpu_percent(interval=1),
+            "cpu_usage_pct": psutil.cpu_percent(interval=interval),
             "ram_usage_pct": psutil.virtual_memory().percent,
             "gpu_status": self._get_gpu_info()
         }
 
-    def get_disk_info(self):
+    def get_disk_info(self, timeout=None):
         #Finds all disk partitions and their free space
-        disks = []
+        # disk_usage runs per partition in parallel; a mount that doesn't answer in time
+        # (e.g. a hung network share) is listed with "unknown" sizes instead of blocking.
+        # Leave headroom inside the "disks" probe limit so partial results still make it back
+        timeout = timeout or self.probe_timeouts["disks"] * 0.8
         partitions = psutil.disk_partitions()
+        probes = {p.mountpoint: (lambda mp=p.mountpoint: psutil.disk_usage(mp)) for p in partitions}
+        usages, _, status = run_probes(probes, {}, default_timeout=timeout, label="disk_usage")
+
+        disks = []
         for p in partitions:
-            try:
-                usage = psutil.disk_usage(p.mountpoint)
-                free_gb = round(usage.free / (1024**3), 2)
-                disks.append({
-                    "device" : p.device,
-                    "mountpoint": p.mountpoint,
-                    "fstype": p.fstype,
-                    "free_gb": free_gb,
-                    "total_gb": round(usage.total / (1024**3), 2)
-                })
-            except PermissionError:
-                continue
+            if status.get(p.mountpoint, "").startswith("error"):
+                continue # e.g. PermissionError or an empty card reader
+            usage = usages.get(p.mountpoint)
+            disks.append({
+                "device" : p.device,
+                "mountpoint": p.mountpoint,
+                "fstype": p.fstype,
+                "free_gb": round(usage.free / (1024**3), 2) if usage else UNKNOWN,
+                "total_gb": round(usage.total / (1024**3), 2) if usage else UNKNOWN
+            })
         return disks
 
 
     def _get_gpu_info(self):
         """Checks for available GPUs and returns details."""
+        gpus = []
         try:
-            gpus = GPUtil.getGPUs()
+            with span("scan.gputil"):
+                import GPUtil
+                gpus = GPUtil.getGPUs()
 
             if gpus:
                 return [
@@ -80,7 +170,9 @@ class HardwareScraper:
                 script_path = os.path.join(current_dir, "get_vram.ps1")
                 
                 cmd = f'powershell -ExecutionPolicy Bypass -File "{script_path}"'
-                output = subprocess.check_output(cmd,shell=True).decode("utf-8").strip()
+                with span("scan.powershell_vram"):
+                    output = subprocess.check_output(cmd, shell=True,
+                                                     timeout=self.probe_timeouts["gpu"]).decode("utf-8").strip()
 
 
                 lines = output.split("\n")
@@ -119,6 +211,80 @@ class HardwareScraper:
         return gpus
             
         
+    def _sample_processes(self):
+        """
+        One pass over all processes: {pid: (cpu seconds, rss bytes, io bytes)}.
+        Only three cheap reads per process, inside oneshot() so each is served from the
+        same /proc (or kernel) snapshot. Processes that vanish or deny access are skipped.
+        """
+        pids = set(psutil.pids())
+        for pid in list(self._processes):
+            if pid not in pids:
+                del self._processes[pid]
+
+        own_pid = os.getpid()
+        samples = {}
+        for pid in pids:
+            if pid in (0, own_pid):
+                continue
+            proc = self._processes.get(pid)
+            try:
+                if proc is None:
+                    proc = self._processes[pid] = psutil.Process(pid)
+                with proc.oneshot():
+                    cpu = proc.cpu_times()
+                    rss = proc.memory_info().rss
+                    try:
+                        io = proc.io_counters()
+                        io_bytes = io.read_bytes + io.write_bytes
+                    except (psutil.AccessDenied, AttributeError):
+                        io_bytes = 0 # other users' processes, or no per-process I/O on this OS
+                samples[pid] = (cpu.user + cpu.system, rss, io_bytes)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                self._processes.pop(pid, None)
+        return samples
+
+    def get_top_processes(self, n=5, window=0.5):
+        """
+        The n heaviest processes by CPU, resident memory and disk I/O over a short window.
+        cpu_pct is a share of the whole machine (100 = every core busy). Names are only
+        looked up for the processes that make a top list.
+        """
+        before = self._sample_processes()
+        start_time = time.perf_counter()
+        time.sleep(window)
+        after = self._sample_processes()
+        elapsed = time.perf_counter() - start_time
+        cores = psutil.cpu_count() or 1
+
+        usage = []
+        for pid, (cpu, rss, io_bytes) in after.items():
+            prev_cpu, _, prev_io = before.get(pid, (cpu, rss, io_bytes))
+            usage.append((pid, max(cpu - prev_cpu, 0) / elapsed / cores * 100, rss,
+                          max(io_bytes - prev_io, 0) / elapsed))
+
+        def describe(entry):
+            pid, cpu_pct, rss, io_rate = entry
+            try:
+                name = self._processes[pid].name()
+            except (KeyError, psutil.Error):
+                name = UNKNOWN
+            return {
+                "pid": pid,
+                "name": name,
+                "cpu_pct": round(cpu_pct, 1),
+                "rss_gb": round(rss / (1024**3), 2),
+                "io_mbps": round(io_rate / (1024**2), 2)
+            }
+
+        return {
+            "process_count": len(after),
+            "window_s": round(elapsed, 2),
+            "by_cpu": [describe(e) for e in heapq.nlargest(n, usage, key=lambda e: e[1])],
+            "by_memory": [describe(e) for e in heapq.nlargest(n, usage, key=lambda e: e[2])],
+            "by_io": [describe(e) for e in heapq.nlargest(n, usage, key=lambda e: e[3]) if e[3] > 0],
+        }
+
     def get_available_ram(self):
         """Retrieves currently available system memory."""
         mem = psutil.virtual_memory()
@@ -130,25 +296,65 @@ class HardwareScraper:
 
 
 
-    def get_all_specs(self):
-        static = self.get_static_info()
-        gpus = self._get_gpu_info() 
+    @traced("scan")
+    def get_all_specs(self, refresh=False):
+        """
+        Runs all hardware probes concurrently, each with its own timeout.
+        Probes that time out or fail leave "unknown" values (partial results);
+        per-probe timings and status are reported under "probe_timings" / "probe_status".
+        Static facts (CPU, total RAM, GPU) come from the spec cache when it is valid for this
+        machine, so warm runs spawn no subprocesses; refresh=True ignores the cache.
+        Available RAM, free disk space and the top processes are always read live.
+        """
+        probes = {
+            "available_ram": self.get_available_ram,
+            "disks": self.get_disk_info,
+            "processes": self.get_top_processes,
+        }
+
+        fingerprint = boot_fingerprint() if self.cache else None
+        cached = self.cache.get(fingerprint) if self.cache and not refresh else None
+        if not cached:
+            probes["static"] = self.get_static_info
+            probes["gpu"] = self._get_gpu_info
+
+        results, timings, status = run_probes(probes, self.probe_timeouts)
+
+        if cached:
+            results.update(cached)
+            for name in cached:
+                timings[name] = 0
+                status[name] = "cached"
+        elif self.cache and status.get("static") == "ok" and status.get("gpu") == "ok":
+            # Only the inventory part of the GPU info is static; load/temperature are not
+            gpus = [{"name": g["name"], "memoryTotal": g["memoryTotal"]} for g in results["gpu"] or []]
+            self.cache.put(fingerprint, {"static": results["static"], "gpu": gpus})
+
+        static = results.get("static", {})
+        gpus = results.get("gpu")
 
         if gpus:
             first_gpu = gpus[0] #gpus is a dict
             vram_gb = round(first_gpu["memoryTotal"] / 1024, 1) 
             is_dedicated = True
-        else:
+        elif "gpu" in results:
             vram_gb = 0 
             is_dedicated = False
+        else:
+            vram_gb = UNKNOWN
+            is_dedicated = UNKNOWN
 
+        os_base = platform.system()
         scraper_data = {
-            "os_name": static["os"],
-            "processor": static["processor"],
-            "total_ram_gb": static["total_ram_gb"],
-            "available_ram_gb": self.get_available_ram(),
+            "os_name": static.get("os", f"{os_base} {platform.release()}" if os_base == "Windows" else os_base),
+            "processor": static.get("processor", UNKNOWN),
+            "total_ram_gb": static.get("total_ram_gb", UNKNOWN),
+            "available_ram_gb": results.get("available_ram", UNKNOWN),
             "vram_gb": vram_gb,
             "is_dedicated": is_dedicated,
-            "disks": self.get_disk_info()
+            "disks": results.get("disks", []),
+            "top_processes": results.get("processes"),
+            "probe_timings": timings,
+            "probe_status": status
         }
         return scraper_data
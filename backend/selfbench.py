@@ -0,0 +1,417 @@
+import os
+import sys
+import json
+import time
+import types
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+from collections import namedtuple
+from unittest import mock
+
+from backend.adaptive import measure
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "data", "selfbench_baseline.json")
+DEFAULT_THRESHOLD_PCT = 25
+# Repetition settings used when neither the command line nor the baseline gives them
+DEFAULT_SETTINGS = {"budget_s": 1.0, "rounds": 3}
+# A case whose 95% confidence interval is wider than this (relative) is reported as noisy
+NOISY_CI = 0.10
+
+
+# --- Fake hardware backends ------------------------------------------------------
+
+_Memory = namedtuple("svmem", "total available percent used free")
+_Partition = namedtuple("sdiskpart", "device mountpoint fstype opts")
+_Usage = namedtuple("sdiskusage", "total used free percent")
+_CpuTimes = namedtuple("pcputimes", "user system")
+_MemInfo = namedtuple("pmem", "rss vms")
+_IoCounters = namedtuple("pio", "read_count write_count read_bytes write_bytes")
+
+
+def fake_psutil(processes=400, partitions=8, seed=1):
+    """A psutil stand-in with a fixed machine: 32 GB RAM, 16 threads, N processes and partitions."""
+    rng = random.Random(seed)
+    module = types.ModuleType("psutil")
+
+    class Error(Exception):
+        pass
+
+    class NoSuchProcess(Error):
+        pass
+
+    class AccessDenied(Error):
+        pass
+
+    class ZombieProcess(NoSuchProcess):
+        pass
+
+    table = {pid: (rng.random() * 100, rng.randrange(10, 2000) * 1024 ** 2, rng.randrange(0, 10 ** 9))
+             for pid in range(100, 100 + processes)}
+
+    class Process:
+        def __init__(self, pid):
+            if pid not in table:
+                raise NoSuchProcess(pid)
+            self.pid = pid
+            self._cpu = table[pid][0]
+
+        def oneshot(self):
+            return contextlib.nullcontext()
+
+        def cpu_times(self):
+            self._cpu += 0.001 # Keeps CPU deltas non-zero between samples
+            return _CpuTimes(self._cpu, 0.0)
+
+        def memory_info(self):
+            return _MemInfo(table[self.pid][1], 0)
+
+        def io_counters(self):
+            return _IoCounters(0, 0, table[self.pid][2], 0)
+
+        def name(self):
+            return f"proc{self.pid}"
+
+    gb = 1024 ** 3
+    mounts = [_Partition(f"/dev/sd{chr(97 + i)}1", "/" if i == 0 else f"/mnt/disk{i}", "ext4", "rw")
+              for i in range(partitions)]
+    module.Error, module.NoSuchProcess, module.AccessDenied, module.ZombieProcess = (
+        Error, NoSuchProcess, AccessDenied, ZombieProcess)
+    module.Process = Process
+    module.pids = lambda: list(table)
+    module.virtual_memory = lambda: _Memory(32 * gb, 20 * gb, 37.5, 12 * gb, 20 * gb)
+    module.cpu_percent = lambda interval=None, percpu=False: 12.5
+    module.cpu_count = lambda logical=True: 16 if logical else 8
+    module.boot_time = lambda: 1_700_000_000.0
+    module.disk_partitions = lambda all=False: mounts
+    module.disk_usage = lambda path: _Usage(1000 * gb, 400 * gb, 600 * gb, 40.0)
+    return module
+
+
+def fake_gputil(gpus=1, query_s=0.005):
+    """
+    A GPUtil stand-in. The real getGPUs() runs nvidia-smi, which is what the spec cache saves
+    a warm scan; query_s stands in for that process's run time.
+    """
+    module = types.ModuleType("GPUtil")
+    gpu = types.SimpleNamespace(name="Fake RTX", load=0.1, temperature=45.0, memoryTotal=12288.0,
+                                memoryUsed=1024.0)
+
+    def get_gpus():
+        time.sleep(query_s)
+        return [gpu] * gpus
+
+    module.getGPUs = get_gpus
+    return module
+
+
+# --- Synthetic data --------------------------------------------------------------
+
+def synthetic_catalog(apps, seed=1):
+    """{name: requirements} in requirements.json's format."""
+    rng = random.Random(seed)
+    kernels = ("integer_sieve", "float_matmul", "float_fft", "branchy_compile", "memory_reduction")
+    replay_stages = ("small_files", "compile", "blas", "render")
+    catalog = {}
+    for i in range(apps):
+        min_ram = rng.choice((4, 8, 16, 32))
+        min_vram = rng.choice((0, 1, 2, 4, 8))
+        catalog[f"App {i:05d} {2020 + i % 7}"] = {
+            "min_ram": min_ram, "rec_ram": min_ram * 2,
+            "min_vram": min_vram, "rec_vram": min_vram * 2,
+            "min_storage": rng.choice((5, 20, 50, 100)),
+            "os_version": rng.choice(("Any", "Windows 10", "Windows 11")),
+            "cpu_weights": {"single_core": 0.5, "multi_core": 0.5},
+            "kernel_weights": {k: rng.randint(0, 3) for k in kernels},
+            "gpu_weight": rng.choice((0.05, 0.1, 0.25, 0.4)),
+            "workload_profile": {"replay_weight": (0, 0.25, 0.5)[i % 3],
+                                 "stages": {stage: (i + n) % 3 for n, stage in enumerate(replay_stages)}},
+        }
+    return catalog
+
+
+def synthetic_specs(machines, seed=1):
+    rng = random.Random(seed)
+    return [{
+        "machine_id": f"m{i:06d}",
+        "os_name": rng.choice(("Windows 10", "Windows 11", "Linux")),
+        "total_ram_gb": rng.choice((8, 16, 32, 64)),
+        "available_ram_gb": rng.choice((2, 6, 12, 24)),
+        "vram_gb": rng.choice((0, 2, 4, 8, 12)),
+        "disks": [{"device": "C:", "mountpoint": "C:\\", "free_gb": rng.choice((20, 100, 500)), "total_gb": 1000}],
+    } for i in range(machines)]
+
+
+SAMPLE_BENCHMARK = {
+    "cpu_kernels": {"integer_sieve": 0.9, "float_matmul": 1.1, "float_fft": 0.8, "branchy_compile": 1.0,
+                    "memory_reduction": 0.7},
+    "cpu_multi_core_index": 6.5, "cpu_scaling_efficiency": 0.8, "ram_copy_gbps": 14.0, "ram_latency_ns": 85.0,
+    "disk_seq_read_mbps": 1800.0, "disk_rand_read_iops": 40000, "thermal_deviation": 4.0,
+    "thermal_time_to_throttle_s": None, "gpu_available": True, "gpu_gflops": 9000.0, "gpu_sustained_ratio": 0.97,
+    "network_available": True, "network_ping_ms": 20.0, "is_plugged": True, "battery_percent": 100,
+    "workload_replay": {"small_files": {"index": 0.7}, "compile": {"index": 0.9}, "blas": {"index": 1.2},
+                        "render": {"index": 0.5, "sustained_ratio": 0.95}},
+    "uncertainty": {"cpu_multi_core_index": 0.02, "ram_copy_gbps": 0.03},
+}
+
+
+# --- Cases -----------------------------------------------------------------------
+
+class _Workspace:
+    """Temporary RIG_ENGINEER_HOME and requirements files, so runs never touch real caches."""
+    def __enter__(self):
+        self.path = tempfile.mkdtemp(prefix="rig-selfbench-")
+        self._env = mock.patch.dict(os.environ, {"RIG_ENGINEER_HOME": self.path})
+        self._env.start()
+        return self
+
+    def write_catalog(self, apps):
+        path = os.path.join(self.path, f"requirements-{apps}.json")
+        with open(path, "w") as f:
+            json.dump(synthetic_catalog(apps), f)
+        return path
+
+    def __exit__(self, *exc):
+        self._env.stop()
+        shutil.rmtree(self.path, ignore_errors=True)
+        return False
+
+
+def _timed(fn):
+    """fn() -> seconds taken, for measure()."""
+    from time import perf_counter_ns
+
+    def run():
+        start_time = perf_counter_ns()
+        fn()
+        return (perf_counter_ns() - start_time) / 1e9
+    return run
+
+
+def _scan_cases(ws, stack):
+    psutil_fake, gputil_fake = fake_psutil(), fake_gputil()
+    stack.enter_context(mock.patch.dict(sys.modules, {"psutil": psutil_fake, "GPUtil": gputil_fake}))
+    from backend import scraper
+    from backend.cache import SpecCache
+    stack.enter_context(mock.patch.object(scraper, "psutil", psutil_fake))
+
+    class Scraper(scraper.HardwareScraper):
+        # The real sampling window is a sleep; only the bookkeeping around it is timed here
+        def get_top_processes(self, n=5, window=0):
+            return super().get_top_processes(n, window)
+
+    cold = Scraper(cache=False)
+    warm = Scraper(cache=SpecCache(os.path.join(ws.path, "spec_cache.json")))
+    warm.get_all_specs() # Fill the cache
+    return {
+        "scan.get_all_specs_cold": _timed(cold.get_all_specs),
+        "scan.get_all_specs_cached": _timed(warm.get_all_specs),
+        "scan.top_processes": _timed(lambda: cold.get_top_processes(window=0)),
+    }
+
+
+def _logic_cases(ws, stack):
+    from backend.logic import DecisionEngine
+    from backend.catalog import RequirementsCatalog
+    small = DecisionEngine(ws.write_catalog(500))
+    specs = synthetic_specs(1)[0]
+    big_path = ws.write_catalog(5000)
+    fleet = synthetic_specs(20_000)
+    small.software_info.items() # Compile once outside the timings
+
+    def compile_catalog():
+        catalog = RequirementsCatalog(big_path, compiled_path=os.path.join(ws.path, "compile-test.sqlite"))
+        catalog._compile("selfbench").close()
+
+    return {
+        "logic.evaluate_all_500_apps": _timed(lambda: small.evaluate_all(specs, SAMPLE_BENCHMARK)),
+        "logic.score_range_500_apps": _timed(lambda: [small.score_range(app, specs, SAMPLE_BENCHMARK)
+                                                      for app in small.software_info]),
+        "logic.fleet_20k_x_500": _timed(lambda: small.evaluate_fleet(fleet)),
+        "logic.catalog_compile_5000": _timed(compile_catalog),
+        "logic.catalog_lookup_fuzzy": _timed(lambda: [small.find_app(q) for q in ("app 00042", "Ap 00420 2022",
+                                                                                   "nonexistent tool")]),
+    }
+
+
+def _harness_cases(ws, stack):
+    from backend.kernels import KERNELS, run_kernel
+    from backend.scheduler import PhaseScheduler, Task, IO
+    from backend.instrument import traced
+
+    tiny = {"integer_sieve": 1000, "float_matmul": 8, "float_fft": 64, "branchy_compile": 200,
+            "memory_reduction": 1000}
+    tasks = [Task(f"compute{i}", lambda: None) for i in range(20)] + \
+            [Task(f"io{i}", lambda: None, lane=IO) for i in range(10)]
+    noop = traced("selfbench.noop")(lambda: None)
+    return {
+        # Fixed overhead of timing and normalizing one kernel run (the work itself is tiny)
+        "harness.run_kernel_tiny": _timed(lambda: [run_kernel(name, tiny[name]) for name in KERNELS]),
+        "harness.scheduler_30_tasks": _timed(lambda: PhaseScheduler().run(tasks)),
+        "harness.traced_call_disabled_x10k": _timed(lambda: [noop() for _ in range(10_000)]),
+    }
+
+
+CASE_GROUPS = {"scan": _scan_cases, "logic": _logic_cases, "harness": _harness_cases}
+
+
+def run_cases(only=None, budget_s=1.0, rounds=3):
+    """
+    Returns {case: summarize() stats of its wall time in seconds}. The whole suite runs
+    `rounds` times and each case keeps its fastest round: a round slowed down by other
+    activity on the machine (or CPU clocks still ramping up) should not count as a regression.
+    """
+    results = {}
+    for _ in range(rounds):
+        for name, stats in _run_round(only, budget_s).items():
+            if name not in results or stats["median"] < results[name]["median"]:
+                results[name] = stats
+    return results
+
+
+def typical_results(runs):
+    """
+    Per case, the run_cases() result with the median median out of several runs. Used for
+    baselines: a single run's fastest round can be a lucky low that later checks rarely reach.
+    """
+    typical = {}
+    for name in runs[0]:
+        ordered = sorted((run[name] for run in runs if name in run), key=lambda stats: stats["median"])
+        typical[name] = ordered[len(ordered) // 2]
+    return typical
+
+
+def _run_round(only, budget_s):
+    results = {}
+    with _Workspace() as ws:
+        for group, build in CASE_GROUPS.items():
+            if only and not any(o == group or o.startswith(f"{group}.") for o in only):
+                continue
+            # A group's fakes and patches are undone when it is finished, or if building it fails
+            with contextlib.ExitStack() as stack:
+                for name, fn in build(ws, stack).items():
+                    if only and group not in only and name not in only:
+                        continue
+                    results[name] = measure(fn, budget_s, target_ci=0.02, warmup=1, min_runs=5, max_runs=200)["value"]
+    return results
+
+
+# --- Baselines -------------------------------------------------------------------
+
+def environment():
+    return {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system()}
+
+
+def load_baseline(path=BASELINE_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"environment": None, "settings": None, "cases": {}}
+
+
+def save_baseline(results, path=BASELINE_PATH, merge=True, settings=None):
+    """Stores the results; settings (budget_s, rounds) are kept so checks repeat cases the same way."""
+    baseline = load_baseline(path) if merge else {"cases": {}}
+    baseline["environment"] = environment()
+    baseline["settings"] = dict(DEFAULT_SETTINGS, **(settings or {}))
+    for name, stats in results.items():
+        baseline["cases"][name] = {"median_s": stats["median"], "ci_rel": stats["ci_rel"]}
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=4, sort_keys=True)
+
+
+def compare(results, baseline, threshold_pct=DEFAULT_THRESHOLD_PCT):
+    """
+    One row per case: median vs baseline, change in percent and status ok/SLOWER/NOISY/new.
+    A case is SLOWER only if even the low end of its confidence interval, median x (1 - ci_rel),
+    is more than threshold_pct over the baseline; a noisy run alone does not fail the check.
+    """
+    rows = []
+    for name, stats in results.items():
+        base = baseline["cases"].get(name)
+        change = (stats["median"] - base["median_s"]) / base["median_s"] * 100 if base else None
+        low = stats["median"] * (1 - (stats["ci_rel"] or 0))
+        if base is None:
+            status = "new"
+        elif (low - base["median_s"]) / base["median_s"] * 100 > threshold_pct:
+            status = "SLOWER"
+        elif stats["ci_rel"] is not None and stats["ci_rel"] > NOISY_CI:
+            status = "NOISY"
+        else:
+            status = "ok"
+        rows.append({"case": name, "median_ms": stats["median"] * 1000, "ci_rel": stats["ci_rel"], "runs": stats["n"],
+                     "baseline_ms": base["median_s"] * 1000 if base else None, "change_pct": change, "status": status})
+    return rows
+
+
+def main():
+    """
+    Times Rig-Engineer's own code paths (not the hardware) against a stored baseline, so a
+    change that makes the scanner, the scoring or the benchmark harness slower shows up:
+
+        python -m backend.selfbench                    # compare with data/selfbench_baseline.json
+        python -m backend.selfbench --update-baseline  # record new baselines (typical of 3 runs)
+        python -m backend.selfbench --threshold 15 --only scan
+
+    Runs offline and without a GPU: the scanner cases use in-process psutil/GPUtil fakes
+    and the catalogs and fleets are synthetic. Returns 1 when a case's median, less its
+    confidence interval, is more than --threshold percent slower than its baseline. Cases
+    are repeated with the rounds/budget the baseline was recorded with.
+    """
+    parser = argparse.ArgumentParser(description="Rig-Engineer self-benchmark (regression check for its own code)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run's results as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD_PCT,
+                        help="Fail when a case's median is more than this many percent slower than its baseline")
+    parser.add_argument("--record-runs", type=int, default=3,
+                        help="With --update-baseline: runs of the whole suite; each case stores its typical result")
+    parser.add_argument("--only", nargs="+", default=None, help="Groups (scan, logic, harness) or case names to run")
+    parser.add_argument("--budget", type=float, default=None,
+                        help="Seconds to spend repeating each case per round (default: as the baseline was recorded)")
+    parser.add_argument("--rounds", type=int, default=None,
+                        help="Suite repetitions; each case keeps its fastest round (default: as the baseline was recorded)")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+    if baseline["environment"] and baseline["environment"] != environment():
+        print(f"[WARNING] Baseline was recorded on {baseline['environment']}, this is {environment()}.")
+    # Fastest-of-N rounds is biased by N, so checks repeat cases exactly as the baseline did
+    settings = dict(DEFAULT_SETTINGS, **(baseline.get("settings") or {}))
+    if args.budget is not None:
+        settings["budget_s"] = args.budget
+    if args.rounds is not None:
+        settings["rounds"] = args.rounds
+    if baseline.get("settings") and settings != baseline["settings"] and not args.update_baseline:
+        print(f"[WARNING] Baseline was recorded with {baseline['settings']}, this run uses {settings}.")
+
+    runs = args.record_runs if args.update_baseline else 1
+    results = typical_results([run_cases(args.only, budget_s=settings["budget_s"], rounds=settings["rounds"])
+                               for _ in range(max(runs, 1))])
+
+    rows = compare(results, baseline, args.threshold)
+    print(f"{'CASE':<36} {'MEDIAN ms':>10} {'+-CI':>6} {'RUNS':>5} {'BASE ms':>9} {'CHANGE':>8}  STATUS")
+    for r in rows:
+        ci = f"{r['ci_rel'] * 100:.0f}%" if r["ci_rel"] is not None else "-"
+        base = f"{r['baseline_ms']:.3f}" if r["baseline_ms"] is not None else "-"
+        change = f"{r['change_pct']:+.1f}%" if r["change_pct"] is not None else "-"
+        print(f"{r['case']:<36} {r['median_ms']:>10.3f} {ci:>6} {r['runs']:>5} {base:>9} {change:>8}  {r['status']}")
+
+    if args.update_baseline:
+        save_baseline(results, args.baseline, settings=settings)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+    slower = [r["case"] for r in rows if r["status"] == "SLOWER"]
+    if slower:
+        print(f"Regression over {args.threshold:g}%: {', '.join(slower)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
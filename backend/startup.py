@@ -0,0 +1,74 @@
+import os
+import sys
+import threading
+import subprocess
+import importlib
+
+
+# Imported in the background once the window is up, so the first scan or benchmark
+# does not pause to load psutil, GPUtil and NumPy
+WARM_MODULES = ("backend.scraper", "backend.benchmark", "backend.telemetry")
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def warm_up(modules=WARM_MODULES):
+    """Imports the heavy backend modules on a daemon thread and returns the thread."""
+    def target():
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass # Reported when the feature that needs it is used
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+def import_times(statement):
+    """
+    Runs `statement` in a fresh interpreter with -X importtime and returns
+    [(module, self_us, cumulative_us, depth)] in the order the modules finished importing.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            capture_output=True, text=True, cwd=_ROOT)
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue # Header line
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times.append((name.strip(), int(fields[0]), int(fields[1]), depth))
+    if result.returncode != 0 and not times:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+    return times
+
+
+def startup_report(statement, top=12):
+    """
+    -X importtime breakdown of `statement` (e.g. "import gui.main_window"): total import
+    time, time per top-level package (third-party libraries are where startup regressions
+    usually come from) and the slowest project modules including what they import.
+    Returns the report as a list of lines.
+    """
+    times = import_times(statement)
+    total_ms = sum(t[1] for t in times) / 1000
+    by_package = {}
+    for name, self_us, _, _ in times:
+        package = name.split(".")[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+
+    lines = [f"Startup imports: {total_ms:.0f} ms for `{statement}` ({len(times)} modules)", "", "By package:"]
+    for package, us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"  {package:<28} {us / 1000:8.1f} ms")
+
+    own = [t for t in times if t[0].split(".")[0] in ("backend", "gui")]
+    if own:
+        lines += ["", "Project modules (including their imports):"]
+        for name, _, cumulative, _ in sorted(own, key=lambda t: -t[2])[:top]:
+            lines.append(f"  {name:<28} {cumulative / 1000:8.1f} ms")
+    return lines
@@ -0,0 +1,164 @@
+import os
+import time
+import mmap
+import random
+import tempfile
+
+from backend.cancel import CancelToken
+from backend.instrument import traced
+
+
+KB = 1024
+MB = 1024 * 1024
+DEFAULT_BLOCK_SIZES = (4 * KB, 16 * KB, 64 * KB, 256 * KB, 1 * MB)
+TEST_FILE_NAME = "rig_engineer_disk_test.tmp"
+
+
+def pick_test_dir(mountpoint=None):
+    """
+    Chooses a writable directory on the requested mountpoint.
+    Prefers the temp/home directory when it lives on that same device (drive roots are
+    often not writable without admin rights), otherwise uses the mountpoint itself.
+    """
+    if not mountpoint:
+        return tempfile.gettempdir()
+
+    try:
+        target_dev = os.stat(mountpoint).st_dev
+    except OSError:
+        return tempfile.gettempdir()
+
+    for candidate in (tempfile.gettempdir(), os.path.expanduser("~")):
+        try:
+            if os.stat(candidate).st_dev == target_dev:
+                return candidate
+        except OSError:
+            continue
+    return mountpoint
+
+
+def _open_test_file(path, direct):
+    """Opens the test file, with O_DIRECT when asked and supported. Returns (fd, direct_used)."""
+    flags = os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0)
+    if direct and hasattr(os, "O_DIRECT"):
+        try:
+            return os.open(path, flags | os.O_DIRECT, 0o600), True
+        except OSError:
+            # tmpfs and some network filesystems reject O_DIRECT
+            pass
+    return os.open(path, flags, 0o600), False
+
+
+def _drop_cache(fd, direct):
+    """Best effort: ask the OS to forget cached pages so reads hit the device."""
+    if not direct and hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+
+
+def _read_at(fd, view, offset):
+    if hasattr(os, "preadv"):
+        return os.preadv(fd, [view], offset)
+    # Windows has no positional I/O in the os module
+    os.lseek(fd, offset, os.SEEK_SET)
+    return len(os.read(fd, len(view)))
+
+
+def _write_at(fd, view, offset):
+    if hasattr(os, "pwritev"):
+        return os.pwritev(fd, [view], offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.write(fd, view)
+
+
+def _mbps(nbytes, duration):
+    return round(nbytes / MB / duration, 1) if duration > 0 else 0
+
+
+@traced("storage.run")
+def run_storage_benchmark(target_dir, file_size_mb=256, block_sizes=DEFAULT_BLOCK_SIZES,
+                          random_ops=2000, direct=True, cancel=None):
+    """
+    Sequential write/read, 4K random read/write and a block-size sweep on one file.
+    The data buffer is generated once (page aligned, so it also works with O_DIRECT)
+    and reused for every write. Writes are fsync'ed inside the timed region, and reads
+    either bypass the page cache (O_DIRECT) or follow a cache drop where the OS allows it.
+    The test file is always removed, even on failure or cancellation.
+    """
+    cancel = cancel or CancelToken()
+    file_size = file_size_mb * MB
+    max_block = max(block_sizes)
+    file_size -= file_size % max_block
+
+    # mmap gives a page-aligned buffer; fill it once instead of generating data per write
+    buffer = mmap.mmap(-1, max_block)
+    buffer.write(os.urandom(max_block))
+    view = memoryview(buffer)
+
+    path = os.path.join(target_dir, TEST_FILE_NAME)
+    fd, direct_used = _open_test_file(path, direct)
+    try:
+        results = {"target": target_dir, "direct_io": direct_used, "file_size_mb": file_size // MB}
+
+        # Sequential write, largest block size
+        start_time = time.perf_counter()
+        for offset in range(0, file_size, max_block):
+            cancel.check()
+            _write_at(fd, view, offset)
+        os.fsync(fd)
+        results["seq_write_mbps"] = _mbps(file_size, time.perf_counter() - start_time)
+
+        # Sequential read, largest block size
+        _drop_cache(fd, direct_used)
+        start_time = time.perf_counter()
+        for offset in range(0, file_size, max_block):
+            cancel.check()
+            _read_at(fd, view, offset)
+        results["seq_read_mbps"] = _mbps(file_size, time.perf_counter() - start_time)
+
+        # 4K random read / write at aligned offsets
+        small = 4 * KB
+        rng = random.Random(7)
+        offsets = [rng.randrange(file_size // small) * small for _ in range(random_ops)]
+        small_view = view[:small]
+
+        _drop_cache(fd, direct_used)
+        start_time = time.perf_counter()
+        for offset in offsets:
+            cancel.check()
+            _read_at(fd, small_view, offset)
+        duration = time.perf_counter() - start_time
+        results["rand_read_iops"] = round(random_ops / duration) if duration > 0 else 0
+        results["rand_read_mbps"] = _mbps(random_ops * small, duration)
+
+        start_time = time.perf_counter()
+        for offset in offsets:
+            cancel.check()
+            _write_at(fd, small_view, offset)
+        os.fsync(fd)
+        duration = time.perf_counter() - start_time
+        results["rand_write_iops"] = round(random_ops / duration) if duration > 0 else 0
+        results["rand_write_mbps"] = _mbps(random_ops * small, duration)
+
+        # Block-size sweep: sequential reads over (at most) the first 64MB
+        sweep_bytes = min(file_size, 64 * MB)
+        sweep = {}
+        for block_size in block_sizes:
+            cancel.check()
+            block_view = view[:block_size]
+            _drop_cache(fd, direct_used)
+            start_time = time.perf_counter()
+            for offset in range(0, sweep_bytes, block_size):
+                _read_at(fd, block_view, offset)
+            sweep[block_size // KB] = _mbps(sweep_bytes, time.perf_counter() - start_time)
+        results["block_sweep_mbps"] = sweep
+
+        return results
+    finally:
+        os.close(fd)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
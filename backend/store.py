@@ -0,0 +1,244 @@
+import os
+import json
+import time
+import sqlite3
+import statistics
+
+from backend.fingerprint import app_data_dir
+
+
+DAY = 24 * 3600
+
+HIGHER, LOWER = 1, -1
+
+# Direction of every performance metric: HIGHER or LOWER is better. Anything else that gets
+# flattened (battery level, core count, worker counts) describes the run, not the machine's
+# speed, and is never compared, ranked or reported as a regression.
+METRIC_DIRECTIONS = {
+    "cpu_single_core_time": LOWER,
+    "cpu_multi_core_time": LOWER,
+    "cpu_multi_core_index": HIGHER,
+    "cpu_scaling_efficiency": HIGHER,
+    "ram_read_gbps": HIGHER,
+    "ram_write_gbps": HIGHER,
+    "ram_copy_gbps": HIGHER,
+    "ram_latency_ns": LOWER,
+    "disk_seq_write_mbps": HIGHER,
+    "disk_seq_read_mbps": HIGHER,
+    "disk_rand_read_iops": HIGHER,
+    "disk_rand_write_iops": HIGHER,
+    "thermal_deviation": LOWER,
+    "thermal_time_to_throttle_s": HIGHER,
+    "thermal_max_temp_c": LOWER,
+    "gpu_gflops": HIGHER,
+    "gpu_bandwidth_gbps": HIGHER,
+    "gpu_sustained_ratio": HIGHER,
+    "gpu_max_temp_c": LOWER,
+    "network_download_mbps": HIGHER,
+    "network_upload_mbps": HIGHER,
+    "network_ping_ms": LOWER,
+    "network_latency_p90_ms": LOWER,
+}
+# Groups keyed by kernel name / working-set size / block size: "<group>.<key>"
+_GROUP_DIRECTIONS = {
+    "cpu_kernels": HIGHER,
+    "ram_latency_sweep": LOWER,
+    "disk_block_sweep_mbps": HIGHER,
+}
+# Workload replay results: "workload_replay.<stage>.<field>"
+_REPLAY_DIRECTIONS = {
+    "index": HIGHER,
+    "files_per_sec": HIGHER,
+    "mb_per_sec": HIGHER,
+    "units_per_sec": HIGHER,
+    "chars_per_sec": HIGHER,
+    "gflops": HIGHER,
+    "pixels_per_sec": HIGHER,
+    "sustained_ratio": HIGHER,
+}
+# Run bookkeeping rather than properties of the machine
+_SKIPPED_KEYS = ("schedule", "stats", "uncertainty", "isolation")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    machine_id TEXT NOT NULL,
+    created REAL NOT NULL,
+    app TEXT,
+    score REAL,
+    specs TEXT,
+    metrics TEXT
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    machine_id TEXT NOT NULL,
+    created REAL NOT NULL,
+    name TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_machine_created ON runs(machine_id, created);
+CREATE INDEX IF NOT EXISTS idx_runs_created ON runs(created);
+CREATE INDEX IF NOT EXISTS idx_metrics_name_machine_created ON metrics(name, machine_id, created);
+"""
+
+
+def metric_direction(metric):
+    """HIGHER or LOWER for a flattened performance metric name; None if it isn't one."""
+    if metric in METRIC_DIRECTIONS:
+        return METRIC_DIRECTIONS[metric]
+    group, _, rest = metric.partition(".")
+    if group == "workload_replay":
+        return _REPLAY_DIRECTIONS.get(rest.rpartition(".")[2]) if "." in rest else None
+    return _GROUP_DIRECTIONS.get(group) if rest else None
+
+
+def flatten_metrics(benchmark_data, prefix=""):
+    """
+    Flattens the numeric parts of a run_all_benchmarks() dict into {name: value}.
+    Nested dicts become dotted names (cpu_kernels.integer_sieve); lists (traces) and
+    booleans are left out of the metric table but stay in the raw JSON.
+    """
+    flat = {}
+    for key, value in benchmark_data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, bool) or value is None or name in _SKIPPED_KEYS:
+            continue
+        if isinstance(value, (int, float)):
+            flat[name] = float(value)
+        elif isinstance(value, dict):
+            flat.update(flatten_metrics(value, prefix=f"{name}."))
+    return flat
+
+
+class ResultStore:
+    """
+    SQLite history of benchmark runs across machines.
+    Every run keeps its raw specs/metrics JSON; numeric metrics are also stored one row
+    per metric so trends, regressions and fleet percentiles are indexed SQL queries.
+    """
+    def __init__(self, path=None):
+        self.path = path or os.path.join(app_data_dir(), "results.sqlite")
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def save_run(self, machine_id, benchmark_data, scraper_data=None, app=None, score=None, created=None):
+        """Stores one run and returns its id."""
+        return self.save_runs([{
+            "machine_id": machine_id, "benchmark_data": benchmark_data, "scraper_data": scraper_data,
+            "app": app, "score": score, "created": created
+        }])[0]
+
+    def save_runs(self, runs):
+        """
+        Stores many runs in a single transaction (one executemany for all metric rows).
+        Each run is a dict with machine_id, benchmark_data and optional scraper_data, app,
+        score and created (epoch seconds, defaults to now). Returns the new run ids.
+        """
+        with self.conn:
+            return self.insert_runs(runs)
+
+    def insert_runs(self, runs):
+        """save_runs() without its own transaction, for callers that commit other writes with it."""
+        run_ids = []
+        metric_rows = []
+        for run in runs:
+            created = run.get("created") or time.time()
+            cursor = self.conn.execute(
+                "INSERT INTO runs (machine_id, created, app, score, specs, metrics) VALUES (?, ?, ?, ?, ?, ?)",
+                (run["machine_id"], created, run.get("app"), run.get("score"),
+                 json.dumps(run.get("scraper_data")), json.dumps(run["benchmark_data"])))
+            run_id = cursor.lastrowid
+            run_ids.append(run_id)
+
+            metrics = flatten_metrics(run["benchmark_data"])
+            if run.get("app") and run.get("score") is not None:
+                metrics[f"score.{run['app']}"] = float(run["score"])
+            metric_rows.extend((run_id, run["machine_id"], created, name, value)
+                               for name, value in metrics.items())
+
+        self.conn.executemany(
+            "INSERT INTO metrics (run_id, machine_id, created, name, value) VALUES (?, ?, ?, ?, ?)",
+            metric_rows)
+        return run_ids
+
+    def trend(self, machine_id, metric, since=None, until=None):
+        """[(created, value), ...] for one machine and metric, oldest first."""
+        rows = self.conn.execute(
+            "SELECT created, value FROM metrics WHERE name = ? AND machine_id = ? AND created >= ? AND created <= ? "
+            "ORDER BY created",
+            (metric, machine_id, since or 0, until or time.time() + DAY)).fetchall()
+        return rows
+
+    def metric_names(self, machine_id):
+        rows = self.conn.execute("SELECT DISTINCT name FROM metrics WHERE machine_id = ?", (machine_id,))
+        return [name for (name,) in rows]
+
+    def compare_to_past(self, machine_id, metric, days=30, now=None):
+        """
+        "Is this machine slower than last month?" for one metric.
+        Compares the latest value with the median of the values from the period one
+        `days` window earlier (e.g. 30-60 days ago). Returns None if either side is missing.
+        Returns None for names that are not performance metrics (see METRIC_DIRECTIONS).
+        """
+        direction = metric_direction(metric)
+        if direction is None:
+            return None
+        now = now or time.time()
+        latest = self.conn.execute(
+            "SELECT value FROM metrics WHERE name = ? AND machine_id = ? ORDER BY created DESC LIMIT 1",
+            (metric, machine_id)).fetchone()
+        past = [v for _, v in self.trend(machine_id, metric, since=now - 2 * days * DAY, until=now - days * DAY)]
+        if not latest or not past:
+            return None
+
+        current = latest[0]
+        baseline = statistics.median(past)
+        change_pct = (current - baseline) / baseline * 100 if baseline else 0
+        better = change_pct * direction > 0
+        return {
+            "metric": metric,
+            "current": current,
+            "baseline": baseline,
+            "change_pct": round(change_pct, 1),
+            "slower": not better and change_pct != 0
+        }
+
+    def regressions(self, machine_id, threshold_pct=10, days=30, now=None):
+        """Every metric that got worse than `threshold_pct` compared with `days` ago, worst first."""
+        found = []
+        for metric in self.metric_names(machine_id):
+            if metric_direction(metric) is None:
+                continue
+            comparison = self.compare_to_past(machine_id, metric, days=days, now=now)
+            if comparison and comparison["slower"] and abs(comparison["change_pct"]) >= threshold_pct:
+                found.append(comparison)
+        return sorted(found, key=lambda c: -abs(c["change_pct"]))
+
+    def fleet_percentile(self, metric, value, since=None):
+        """
+        Percentage of machines (latest run each) that this value beats for the metric.
+        100 means better than every other machine in the store. None for names that are
+        not performance metrics or have no stored values.
+        """
+        direction = metric_direction(metric)
+        if direction is None:
+            return None
+        rows = self.conn.execute(
+            "SELECT m.value FROM metrics m "
+            "JOIN (SELECT machine_id, MAX(created) AS created FROM metrics "
+            "      WHERE name = ? AND created >= ? GROUP BY machine_id) latest "
+            "ON m.machine_id = latest.machine_id AND m.created = latest.created "
+            "WHERE m.name = ?",
+            (metric, since or 0, metric)).fetchall()
+        if not rows:
+            return None
+        if direction == HIGHER:
+            beaten = sum(1 for (v,) in rows if v < value)
+        else:
+            beaten = sum(1 for (v,) in rows if v > value)
+        return round(beaten / len(rows) * 100, 1)
@@ -0,0 +1,102 @@
+import math
+import time
+import threading
+
+import psutil
+
+from backend.monitor import RingBuffer
+
+
+# Column layout of one telemetry sample
+T, CPU_PCT, RAM_PCT, GPU_LOAD_PCT, GPU_MEM_PCT, DISK_READ_MBPS, DISK_WRITE_MBPS, NET_RECV_MBPS, NET_SENT_MBPS = range(9)
+COLUMNS = ("t", "cpu_pct", "ram_pct", "gpu_load_pct", "gpu_mem_pct",
+           "disk_read_mbps", "disk_write_mbps", "net_recv_mbps", "net_sent_mbps")
+
+MB = 1024 ** 2
+
+
+def _gpu_usage():
+    """(load %, memory %) of the first GPU, or NaN when there is no NVIDIA GPU / driver."""
+    try:
+        import GPUtil
+        gpus = GPUtil.getGPUs()
+    except Exception:
+        gpus = None
+    if not gpus:
+        return math.nan, math.nan
+    gpu = gpus[0]
+    memory_pct = gpu.memoryUsed / gpu.memoryTotal * 100 if gpu.memoryTotal else math.nan
+    return gpu.load * 100, memory_pct
+
+
+class TelemetrySampler:
+    """
+    Samples CPU/RAM/GPU/disk/network counters into a RingBuffer.
+    Each sample is a handful of cheap counter reads; disk and network rates are deltas
+    between consecutive counter snapshots. GPUtil starts nvidia-smi, so the GPU is only
+    read every gpu_every samples and the last reading is repeated in between.
+    overhead_pct is the sampler's own CPU time as a share of one core.
+    """
+    def __init__(self, interval=0.5, capacity=1200, gpu_every=10):
+        self.interval = interval
+        self.gpu_every = gpu_every
+        self.buffer = RingBuffer(capacity, len(COLUMNS))
+        self.overhead_pct = 0.0
+        self._stop_event = threading.Event()
+
+    def _counters(self):
+        disk = psutil.disk_io_counters()
+        net = psutil.net_io_counters()
+        return (time.perf_counter(),
+                (disk.read_bytes, disk.write_bytes) if disk else (0, 0),
+                (net.bytes_recv, net.bytes_sent) if net else (0, 0))
+
+    def run(self, on_batch=None, batch_size=4):
+        """
+        Samples until stop() is called. Every batch_size samples the new rows are passed
+        to on_batch (one call per batch instead of per sample). Blocks the calling thread.
+        """
+        self._stop_event.clear()
+        start_time = time.perf_counter()
+        psutil.cpu_percent(interval=None) # Prime the utilization counter
+        previous = self._counters()
+        gpu = _gpu_usage() # First reading (and the GPUtil import) before overhead is counted
+        batch = []
+        sample = 0
+        busy = 0.0
+
+        while not self._stop_event.wait(self.interval):
+            cpu_start = time.thread_time()
+            if sample and sample % self.gpu_every == 0:
+                gpu = _gpu_usage()
+            current = self._counters()
+            elapsed = (current[0] - previous[0]) or self.interval
+            row = [
+                current[0] - start_time,
+                psutil.cpu_percent(interval=None),
+                psutil.virtual_memory().percent,
+                gpu[0],
+                gpu[1],
+                (current[1][0] - previous[1][0]) / elapsed / MB,
+                (current[1][1] - previous[1][1]) / elapsed / MB,
+                (current[2][0] - previous[2][0]) / elapsed / MB,
+                (current[2][1] - previous[2][1]) / elapsed / MB,
+            ]
+            previous = current
+            self.buffer.append(row)
+            sample += 1
+
+            batch.append(row)
+            if len(batch) >= batch_size:
+                if on_batch:
+                    on_batch(batch)
+                batch = []
+
+            busy += time.thread_time() - cpu_start
+            self.overhead_pct = round(busy / (time.perf_counter() - start_time) * 100, 3)
+
+        if batch and on_batch:
+            on_batch(batch)
+
+    def stop(self):
+        self._stop_event.set()
@@ -1,19 +1,61 @@
 from PyQt6.QtCore import QThread, pyqtSignal
-from backend.scraper import HardwareScraper
-from backend.benchmark import BenchmarkEngine
+from backend.cancel import CancelToken, BenchmarkCancelled
+
+# The scanner/benchmark/telemetry modules (psutil, GPUtil, NumPy) are imported inside the
+# workers, so opening the window does not wait for them; see backend.startup.warm_up().
 
 class ScraperWorker(QThread):
     finished = pyqtSignal(dict)
     
     def run(self):
+        from backend.scraper import HardwareScraper
         scraper = HardwareScraper()
         data = scraper.get_all_specs()
         self.finished.emit(data)
 
 class BenchmarkWorker(QThread):
+    """
+    Runs all benchmarks. `progress` carries (phase, completed, total, partial results) as
+    each phase finishes; cancel() stops the run at the next check and emits `cancelled`.
+    """
     finished = pyqtSignal(dict)
+    progress = pyqtSignal(str, int, int, dict)
+    cancelled = pyqtSignal()
+
+    def __init__(self, target_mountpoint=None, replay_stages=None):
+        super().__init__()
+        self.target_mountpoint = target_mountpoint
+        self.replay_stages = replay_stages
+        self.cancel_token = CancelToken()
     
     def run(self):
+        from backend.benchmark import BenchmarkEngine
         benchmark = BenchmarkEngine()
-        results = benchmark.run_all_benchmarks()
+        try:
+            results = benchmark.run_all_benchmarks(target_mountpoint=self.target_mountpoint,
+                                                   on_progress=self.progress.emit, cancel=self.cancel_token,
+                                                   replay_stages=self.replay_stages)
+        except BenchmarkCancelled:
+            self.cancelled.emit()
+            return
         self.finished.emit(results)
+
+    def cancel(self):
+        self.cancel_token.cancel()
+
+class TelemetryWorker(QThread):
+    """Streams telemetry samples; emits one `batch` signal per batch_size samples, not per sample."""
+    batch = pyqtSignal(list)
+
+    def __init__(self, interval=0.5, batch_size=2):
+        super().__init__()
+        from backend.telemetry import TelemetrySampler
+        self.sampler = TelemetrySampler(interval=interval)
+        self.batch_size = batch_size
+
+    def run(self):
+        self.sampler.run(on_batch=self.batch.emit, batch_size=self.batch_size)
+
+    def stop(self):
+        self.sampler.stop()
+        self.wait()
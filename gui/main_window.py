@@ -3,13 +3,32 @@ import sys
 import json
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QLabel, QComboBox, QPushButton, QStackedWidget, 
-                             QProgressBar, QFrame, QScrollArea, QMessageBox)
+                             QProgressBar, QFrame, QScrollArea, QMessageBox,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QGridLayout)
 from PyQt6.QtCore import Qt, QTimer
-from PyQt6.QtGui import QFont, QIcon
+from PyQt6.QtGui import QFont, QIcon, QColor
 
 from backend.logic import DecisionEngine
-from backend.workers import ScraperWorker, BenchmarkWorker
+from backend.store import ResultStore
+from backend.fingerprint import machine_id
+from backend.workers import ScraperWorker, BenchmarkWorker, TelemetryWorker
 from gui.styles import DARK_THEME
+from gui.widgets import Sparkline
+
+# The live charts repaint at most this often, however fast samples arrive
+LIVE_MAX_FPS = 10
+
+# Loading-page line for each finished benchmark phase
+PHASE_SUMMARIES = {
+    "cpu_kernels": lambda d: f"CPU kernel suite: {len(d['cpu_kernels'])} kernels done",
+    "multicore": lambda d: f"Multi-core: index {d['cpu_multi_core_index']} on {d['cpu_core_count']} threads",
+    "memory": lambda d: f"Memory: {d['ram_copy_gbps']} GB/s copy, {d['ram_latency_ns']} ns latency",
+    "thermal": lambda d: f"Thermal: {d['thermal_deviation']}% clock deviation",
+    "storage": lambda d: f"Storage: {d['disk_seq_read_mbps']} MB/s read, {d['disk_rand_read_iops']} IOPS",
+    "gpu": lambda d: f"GPU: {d['gpu_gflops']} GFLOPS" if d["gpu_available"] else "GPU: no GPU acceleration",
+    "network": lambda d: f"Network: {d['network_download_mbps'] if d['network_available'] else 'unavailable'} Mbps",
+    "battery": lambda d: f"Power: {'plugged in' if d['is_plugged'] else 'on battery'}",
+}
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -38,11 +57,17 @@ class MainWindow(QMainWindow):
         self.init_home_page()
         self.init_loading_page()
         self.init_results_page()
+        self.init_batch_page()
+        # The live page is built on first use (it loads the telemetry backend)
+        self.live_page = None
         
         # State
+        self.batch_mode = False
         self.selected_app = None
         self.scraper_data = None
         self.benchmark_data = None
+        self.telemetry_thread = None
+        self.benchmark_thread = None
 
     def init_home_page(self):
         self.home_page = QWidget()
@@ -74,6 +99,20 @@ class MainWindow(QMainWindow):
         btn_start.clicked.connect(self.start_analysis)
         layout.addWidget(btn_start, alignment=Qt.AlignmentFlag.AlignCenter)
 
+        # Batch Button: one scan + one benchmark run, every app scored
+        btn_all = QPushButton("SCORE ALL APPS")
+        btn_all.setFixedWidth(200)
+        btn_all.setCursor(Qt.CursorShape.PointingHandCursor)
+        btn_all.clicked.connect(self.start_batch_analysis)
+        layout.addWidget(btn_all, alignment=Qt.AlignmentFlag.AlignCenter)
+
+        # Live Monitor Button: streaming CPU/RAM/GPU/disk/network charts
+        btn_live = QPushButton("LIVE MONITOR")
+        btn_live.setFixedWidth(200)
+        btn_live.setCursor(Qt.CursorShape.PointingHandCursor)
+        btn_live.clicked.connect(self.start_live_monitor)
+        layout.addWidget(btn_live, alignment=Qt.AlignmentFlag.AlignCenter)
+
         self.stacked_widget.addWidget(self.home_page)
 
     def init_loading_page(self):
@@ -88,8 +127,19 @@ class MainWindow(QMainWindow):
 
         self.progress_bar = QProgressBar()
         self.progress_bar.setFixedWidth(500)
-        self.progress_bar.setRange(0, 0) # Indeterminate
+        self.progress_bar.setRange(0, 0) # Indeterminate until the benchmarks report progress
         layout.addWidget(self.progress_bar, alignment=Qt.AlignmentFlag.AlignCenter)
+
+        # Results of finished phases, filled in while the rest still run
+        self.partial_label = QLabel("")
+        self.partial_label.setStyleSheet("color: #B0B0B0;")
+        layout.addWidget(self.partial_label, alignment=Qt.AlignmentFlag.AlignCenter)
+
+        self.btn_cancel = QPushButton("CANCEL")
+        self.btn_cancel.setFixedWidth(200)
+        self.btn_cancel.clicked.connect(self.cancel_benchmark)
+        self.btn_cancel.hide()
+        layout.addWidget(self.btn_cancel, alignment=Qt.AlignmentFlag.AlignCenter)
         
         self.stacked_widget.addWidget(self.loading_page)
 
@@ -165,7 +215,127 @@ class MainWindow(QMainWindow):
 
         self.stacked_widget.addWidget(self.results_page)
 
+    def init_batch_page(self):
+        self.batch_page = QWidget()
+        layout = QVBoxLayout(self.batch_page)
+        layout.setContentsMargins(40, 40, 40, 40)
+        layout.setSpacing(20)
+
+        title = QLabel("COMPATIBILITY MATRIX: ALL APPS")
+        title.setFont(QFont("Segoe UI", 24, QFont.Weight.Bold))
+        title.setStyleSheet("color: #03DAC6;")
+        layout.addWidget(title)
+
+        self.batch_table = QTableWidget(0, 4)
+        self.batch_table.setHorizontalHeaderLabels(["Application", "Compatible", "Score", "Main Issue"])
+        self.batch_table.verticalHeader().setVisible(False)
+        self.batch_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        header = self.batch_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.batch_table)
+
+        btn_back = QPushButton("BACK")
+        btn_back.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(0))
+        layout.addWidget(btn_back, alignment=Qt.AlignmentFlag.AlignRight)
+
+        self.stacked_widget.addWidget(self.batch_page)
+
+    def init_live_page(self):
+        from backend import telemetry
+        self.live_page = QWidget()
+        layout = QVBoxLayout(self.live_page)
+        layout.setContentsMargins(40, 40, 40, 40)
+        layout.setSpacing(20)
+
+        title = QLabel("LIVE RESOURCE MONITOR")
+        title.setFont(QFont("Segoe UI", 24, QFont.Weight.Bold))
+        title.setStyleSheet("color: #03DAC6;")
+        layout.addWidget(title)
+
+        # (chart, telemetry column(s) summed into it)
+        self.live_charts = [
+            (Sparkline("CPU", "%", "#03DAC6", max_value=100), (telemetry.CPU_PCT,)),
+            (Sparkline("RAM", "%", "#BB86FC", max_value=100), (telemetry.RAM_PCT,)),
+            (Sparkline("GPU", "%", "#FFB74D", max_value=100), (telemetry.GPU_LOAD_PCT,)),
+            (Sparkline("GPU Memory", "%", "#FFB74D", max_value=100), (telemetry.GPU_MEM_PCT,)),
+            (Sparkline("Disk I/O", " MB/s", "#CF6679"), (telemetry.DISK_READ_MBPS, telemetry.DISK_WRITE_MBPS)),
+            (Sparkline("Network", " MB/s", "#64B5F6"), (telemetry.NET_RECV_MBPS, telemetry.NET_SENT_MBPS)),
+        ]
+        grid = QGridLayout()
+        for index, (chart, _) in enumerate(self.live_charts):
+            grid.addWidget(chart, index // 2, index % 2)
+        layout.addLayout(grid)
+
+        self.live_overhead_label = QLabel("Monitor overhead: -")
+        self.live_overhead_label.setStyleSheet("color: #B0B0B0;")
+        layout.addWidget(self.live_overhead_label)
+
+        btn_back = QPushButton("BACK")
+        btn_back.clicked.connect(self.stop_live_monitor)
+        layout.addWidget(btn_back, alignment=Qt.AlignmentFlag.AlignRight)
+
+        # Samples arrive in batches; the timer repaints only if something new arrived
+        self.live_dirty = False
+        self.live_timer = QTimer(self)
+        self.live_timer.setInterval(1000 // LIVE_MAX_FPS)
+        self.live_timer.timeout.connect(self.redraw_live_charts)
+
+        self.stacked_widget.addWidget(self.live_page)
+
+    def start_live_monitor(self):
+        if self.live_page is None:
+            self.init_live_page()
+        self.stacked_widget.setCurrentWidget(self.live_page)
+        self.telemetry_thread = TelemetryWorker()
+        self.telemetry_thread.batch.connect(self.on_telemetry_batch)
+        self.telemetry_thread.start()
+        self.live_timer.start()
+
+    def stop_live_monitor(self):
+        self.live_timer.stop()
+        if self.telemetry_thread:
+            self.telemetry_thread.stop()
+            self.telemetry_thread = None
+        self.stacked_widget.setCurrentIndex(0)
+
+    def on_telemetry_batch(self, rows):
+        for row in rows:
+            for chart, columns in self.live_charts:
+                chart.append(sum(row[c] for c in columns))
+        self.live_dirty = True
+
+    def redraw_live_charts(self):
+        if not self.live_dirty:
+            return
+        self.live_dirty = False
+        for chart, _ in self.live_charts:
+            chart.update()
+        if self.telemetry_thread:
+            self.live_overhead_label.setText(
+                f"Monitor overhead: {self.telemetry_thread.sampler.overhead_pct:.2f}% of one core")
+
+    def closeEvent(self, event):
+        if self.telemetry_thread:
+            self.telemetry_thread.stop()
+        if self.benchmark_thread and self.benchmark_thread.isRunning():
+            # Let the running phase clean up its temp file and worker processes before exiting
+            self.benchmark_thread.cancel()
+            self.benchmark_thread.wait()
+        super().closeEvent(event)
+
+    def start_batch_analysis(self):
+        self.batch_mode = True
+        self.selected_app = None
+        self.stacked_widget.setCurrentIndex(1)
+        self.loading_label.setText("Scanning Hardware for all applications...")
+
+        self.scraper_thread = ScraperWorker()
+        self.scraper_thread.finished.connect(self.on_scraper_finished)
+        self.scraper_thread.start()
+
     def start_analysis(self):
+        self.batch_mode = False
         self.selected_app = self.app_selector.currentText()
         self.stacked_widget.setCurrentIndex(1)
         self.loading_label.setText(f"Scanning Hardware for {self.selected_app}...")
@@ -178,6 +348,12 @@ class MainWindow(QMainWindow):
     def on_scraper_finished(self, data):
         self.scraper_data = data
         
+        if self.batch_mode:
+            # No single app to gate on: benchmark once and score everything afterwards
+            self.loading_label.setText("Running Performance Benchmarks (once for all apps)...")
+            self.start_benchmark(None)
+            return
+
         # Check compatibility first
         hasPassed, problems = self.logic.theoretical_compatibility_test(self.selected_app, data)
         
@@ -187,20 +363,88 @@ class MainWindow(QMainWindow):
 
         # Start Benchmarks
         self.loading_label.setText("Running Performance Benchmarks...")
-        self.benchmark_thread = BenchmarkWorker()
+        install_disk = self.logic.pick_install_disk(self.selected_app, data)
+        self.start_benchmark(install_disk["mountpoint"] if install_disk else None)
+
+    def start_benchmark(self, target_mountpoint):
+        self.partial_label.setText("")
+        self.btn_cancel.setEnabled(True)
+        self.btn_cancel.show()
+        # Batch mode has no selected app: replay the stages every catalog app needs
+        apps = self.logic.software_info if self.batch_mode else [self.selected_app]
+        self.benchmark_thread = BenchmarkWorker(target_mountpoint, self.logic.replay_stages(apps))
+        self.benchmark_thread.progress.connect(self.on_benchmark_progress)
         self.benchmark_thread.finished.connect(self.on_benchmark_finished)
+        self.benchmark_thread.cancelled.connect(self.on_benchmark_cancelled)
         self.benchmark_thread.start()
 
+    def on_benchmark_progress(self, phase, completed, total, partial):
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(completed)
+        summary = PHASE_SUMMARIES.get(phase)
+        if summary:
+            lines = [line for line in self.partial_label.text().split("\n") if line]
+            self.partial_label.setText("\n".join(lines + [summary(partial)]))
+
+    def cancel_benchmark(self):
+        self.btn_cancel.setEnabled(False)
+        self.loading_label.setText("Cancelling... cleaning up test files")
+        self.benchmark_thread.cancel()
+
+    def on_benchmark_cancelled(self):
+        self.reset_loading_page()
+        self.stacked_widget.setCurrentIndex(0)
+
+    def reset_loading_page(self):
+        self.btn_cancel.hide()
+        self.partial_label.setText("")
+        self.progress_bar.setRange(0, 0)
+
     def on_benchmark_finished(self, bench_results):
         self.benchmark_data = bench_results
+        self.reset_loading_page()
         
+        if self.batch_mode:
+            # One run for every app, saved without an app/score like `main.py --all`
+            self.save_run()
+            self.show_batch_results(self.logic.evaluate_all(self.scraper_data, self.benchmark_data))
+            return
+
         # Calculate Final Score
         score, warnings = self.logic.calculate_performance_score(
             self.selected_app, self.scraper_data, self.benchmark_data
         )
-        
+        self.save_run(app=self.selected_app, score=score)
         self.show_results(score, warnings)
 
+    def save_run(self, app=None, score=None):
+        # Keep a history of every run for trend/regression checks
+        try:
+            store = ResultStore()
+            store.save_run(machine_id(), self.benchmark_data, self.scraper_data, app=app, score=score)
+            store.close()
+        except Exception as e:
+            print(f"[WARNING] Could not save results: {e}")
+
+    def show_batch_results(self, matrix):
+        self.stacked_widget.setCurrentIndex(3)
+        self.batch_table.setRowCount(len(matrix))
+        for row_index, row in enumerate(matrix):
+            score = row["score"]
+            color = "#03DAC6" if score >= 80 else "#FFB74D" if score >= 50 else "#CF6679"
+            issues = row["problems"] or row["warnings"]
+            cells = [
+                row["app"],
+                "Yes" if row["compatible"] else "No",
+                f"{score}%",
+                issues[0] if issues else "-"
+            ]
+            for column, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if column in (1, 2):
+                    item.setForeground(QColor(color if row["compatible"] else "#CF6679"))
+                self.batch_table.setItem(row_index, column, item)
+
     def show_results(self, score, warnings):
         self.stacked_widget.setCurrentIndex(2)
         self.result_title.setText(f"RESULTS: {self.selected_app.upper()}")
@@ -228,7 +472,7 @@ class MainWindow(QMainWindow):
         
         self.specs_label.setText(
             f"CPU: {cpu}\n"
-            f"RAM: {ram:.1f}GB Available (Total: {total_ram}GB)\n"
+            f"RAM: {ram if isinstance(ram, str) else f'{ram:.1f}'}GB Available (Total: {total_ram}GB)\n"
             f"VRAM: {gpu_vram}GB"
         )
         
@@ -0,0 +1,57 @@
+import math
+from collections import deque
+
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import QPointF
+from PyQt6.QtGui import QPainter, QPen, QColor, QFont, QPolygonF
+
+
+class Sparkline(QWidget):
+    """
+    Minimal line chart of the last `points` values, painted directly with QPainter.
+    append() only stores values; the owner decides when to repaint (update()).
+    A fixed max_value keeps the scale steady (e.g. 100 for percentages); None auto-scales.
+    NaN values (e.g. no GPU) are not drawn.
+    """
+    def __init__(self, title, unit="", color="#03DAC6", max_value=None, points=120, parent=None):
+        super().__init__(parent)
+        self.title = title
+        self.unit = unit
+        self.color = QColor(color)
+        self.max_value = max_value
+        self.values = deque(maxlen=points)
+        self.setMinimumHeight(90)
+
+    def append(self, value):
+        self.values.append(value)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = self.rect().adjusted(8, 24, -8, -8)
+        painter.fillRect(self.rect(), QColor("#1E1E1E"))
+
+        known = [v for v in self.values if not math.isnan(v)]
+        latest = f"{known[-1]:.1f}{self.unit}" if self.values and not math.isnan(self.values[-1]) else "n/a"
+        painter.setPen(QColor("#B0B0B0"))
+        painter.setFont(QFont("Segoe UI", 9))
+        painter.drawText(8, 16, f"{self.title}: {latest}")
+
+        top = self.max_value or max(known, default=0) or 1
+        step = rect.width() / max(self.values.maxlen - 1, 1)
+        x0 = rect.right() - step * (len(self.values) - 1)
+
+        painter.setPen(QPen(self.color, 1.5))
+        line = QPolygonF()
+        for i, value in enumerate(self.values):
+            if math.isnan(value):
+                # Break the line at missing readings
+                if line.size() > 1:
+                    painter.drawPolyline(line)
+                line = QPolygonF()
+                continue
+            y = rect.bottom() - min(value / top, 1) * rect.height()
+            line.append(QPointF(x0 + i * step, y))
+        if line.size() > 1:
+            painter.drawPolyline(line)
+        painter.end()
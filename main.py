@@ -1,17 +1,182 @@
 try:
     import sys
     import time
-    from backend.scraper import HardwareScraper
-    from backend.benchmark import BenchmarkEngine
+    import argparse
     from backend.logic import DecisionEngine
+    from backend.store import ResultStore
+    from backend.fingerprint import machine_id
+    from backend import instrument
 except ImportError as e:
     print(f"Import Error: {e}")
     print("Make sure your files are in the 'backend' folder with an '__init__.py' file.")
     sys.exit()
 
+def network_endpoint(value):
+    # netprobe pulls in asyncio; only pay for it when the flag is given
+    from backend.netprobe import endpoint_arg
+    return endpoint_arg(value)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Rig-Engineer: System Performance Analyzer")
+    parser.add_argument("--network-endpoint", default=None, type=network_endpoint,
+                        help='Network probe: "speedtest" (default), "tcp://host:port" or an "http://" URL')
+    parser.add_argument("--refresh-specs", action="store_true",
+                        help="Ignore the cached hardware specs and rescan everything")
+    parser.add_argument("--history", action="store_true",
+                        help="Compare this machine with its own past runs and the fleet, without benchmarking")
+    parser.add_argument("--no-store", action="store_true",
+                        help="Don't save this run to the local results database")
+    parser.add_argument("--all", action="store_true",
+                        help="Score every app in the catalog with a single scan and benchmark run")
+    parser.add_argument("--preset", choices=["quick", "thorough"], default=None,
+                        help='Repeat each benchmark until stable: "quick" (under 5s) or "thorough"')
+    parser.add_argument("--no-replay", action="store_true",
+                        help="Skip the app-specific workload replay (score from the generic benchmarks only)")
+    parser.add_argument("--isolate", action="store_true",
+                        help="Pin benchmark workers to cores, raise priority, wait for a quiet system "
+                             "and report the background CPU load (more repeatable results)")
+    parser.add_argument("--cores", default=None, metavar="0,2,3",
+                        help="With --isolate: run only on these logical CPUs")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="Print an import-time breakdown of startup and of the scan/benchmark backend, then exit")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time every scan probe, benchmark phase and scoring step and print a summary table")
+    parser.add_argument("--profile-out", default=None, metavar="TRACE.json",
+                        help="With --profile: also write a Chrome trace (open in chrome://tracing or ui.perfetto.dev)")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="With --profile: also record peak Python memory per step (tracemalloc, slower)")
+    parser.add_argument("--cprofile", action="store_true",
+                        help="With --profile: also run under cProfile and print the slowest functions")
+    return parser.parse_args()
+
+def show_history(days=30):
+    store = ResultStore()
+    machine = machine_id()
+    print(f"HISTORY FOR MACHINE {machine}")
+
+    regressions = store.regressions(machine, days=days)
+    if regressions:
+        print(f"Slower than {days} days ago:")
+        for r in regressions:
+            print(f"   -{r['metric']}: {r['current']:g} now vs {r['baseline']:g} then ({r['change_pct']:+}%)")
+    else:
+        print(f"No regressions compared with {days} days ago (or not enough history).")
+
+    for metric in ("cpu_multi_core_index", "ram_copy_gbps", "disk_seq_read_mbps"):
+        latest = store.trend(machine, metric)
+        if latest:
+            percentile = store.fleet_percentile(metric, latest[-1][1])
+            print(f"{metric}: {latest[-1][1]:g} (better than {percentile}% of stored machines)")
+    store.close()
+
+def scan_hardware(args):
+    # psutil/GPUtil load here rather than at startup, so the menu comes up immediately
+    from backend.scraper import HardwareScraper
+    scraper = HardwareScraper()
+    scraper_data = scraper.get_all_specs(refresh=args.refresh_specs) #tüm scraper datayı al
+    print("Hardware scan: " + ", ".join(f"{name} {t}s" for name, t in scraper_data["probe_timings"].items()))
+    for name, status in scraper_data["probe_status"].items():
+        if status not in ("ok", "cached"):
+            print(f"[WARNING] '{name}' probe {status}; its values are reported as unknown.")
+    return scraper_data
+
+def run_benchmarks(args, target_mountpoint=None, replay_stages=None):
+    from backend.benchmark import BenchmarkEngine
+    replay_stages = None if args.no_replay else replay_stages
+    isolation = None
+    if args.isolate:
+        from backend.isolation import Isolation
+        cores = [int(core) for core in args.cores.split(",")] if args.cores else None
+        isolation = Isolation(cores=cores)
+    benchmark = BenchmarkEngine(network_endpoint=args.network_endpoint, isolation=isolation)
+    if args.preset:
+        start_time = time.perf_counter()
+        bench_results = benchmark.run_adaptive(args.preset, target_mountpoint=target_mountpoint,
+                                               replay_stages=replay_stages)
+        print(f"Benchmarks finished in {time.perf_counter() - start_time:.1f}s ({args.preset} preset).")
+    else:
+        bench_results = benchmark.run_all_benchmarks(target_mountpoint=target_mountpoint, #data paketini al
+                                                     replay_stages=replay_stages)
+        schedule = bench_results["schedule"]
+        print(f"Benchmarks finished in {schedule['wall_time_s']}s "
+              f"({schedule['time_saved_s']}s saved by overlapping I/O probes).")
+    if isolation:
+        report = bench_results["isolation"]
+        print(f"Isolation: cores {report['cores']} (pinned: {report['pinned']}), "
+              f"priority raised: {report['priority_raised']}, waited {report['waited_s']}s for a quiet system. "
+              f"Background CPU load {report['background_cpu_pct']}% (peak {report['background_cpu_peak_pct']}%): "
+              f"{report['noise']}.")
+    replay = bench_results.get("workload_replay")
+    if replay:
+        print("Workload replay: " + ", ".join(f"{stage} {r['index']}x" for stage, r in replay.items()))
+    return bench_results
+
+def run_batch(logic, args):
+    """Scores every app with one hardware scan and one benchmark run."""
+    print("\n STEP 1- Scanning hardware...")
+    scraper_data = scan_hardware(args)
+
+    print("STEP 2- Running Benchmarks (once for all apps)...")
+    bench_results = run_benchmarks(args, replay_stages=logic.replay_stages(logic.software_info))
+
+    print("\n STEP 3-Scoring every application...")
+    matrix = logic.evaluate_all(scraper_data, bench_results)
+
+    print(f"{'#':>3}  {'APPLICATION':<20} {'COMPATIBLE':<11} {'SCORE':>5}  MAIN ISSUE")
+    for rank, row in enumerate(matrix, 1):
+        issues = row["problems"] or row["warnings"]
+        print(f"{rank:>3}  {row['app']:<20} {'yes' if row['compatible'] else 'NO':<11} "
+              f"{row['score']:>5}  {issues[0] if issues else '-'}")
+
+    if not args.no_store:
+        store = ResultStore()
+        store.save_run(machine_id(), bench_results, scraper_data)
+        store.close()
+
+def run_profiled(args):
+    """Runs the analysis with the instrumentation layer (and optionally cProfile) enabled."""
+    profiler = None
+    if args.cprofile:
+        import cProfile
+        profiler = cProfile.Profile()
+    instrument.enable(memory=args.profile_memory)
+    try:
+        if profiler:
+            profiler.runcall(analyze, args)
+        else:
+            analyze(args)
+    finally:
+        instrument.disable()
+        print("\nPROFILE")
+        print("\n".join(instrument.format_summary()))
+        if args.profile_out:
+            instrument.chrome_trace(args.profile_out)
+            print(f"Chrome trace written to {args.profile_out}")
+        if profiler:
+            import pstats
+            print()
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+
 def main():
+    args = parse_args()
+    if args.startup_report:
+        from backend.startup import startup_report
+        print("\n".join(startup_report("import main")))
+        print()
+        print("\n".join(startup_report("import backend.scraper, backend.benchmark")))
+        return
+    if args.profile or args.profile_out or args.cprofile or args.profile_memory:
+        run_profiled(args)
+    else:
+        analyze(args)
+
+def analyze(args):
     print(" WELCOME TO RIG-ENGINEER: SYSTEM PERFORMANCE ANALYZER ")
 
+    if args.history:
+        show_history()
+        return
+
 
     # 1-) start
     # read the requirements.json file
@@ -21,6 +186,10 @@ def main():
         print(" Error: 'data/requirements.json' not found!")
         return
     
+    if args.all:
+        run_batch(logic, args)
+        return
+
     apps = list(logic.software_info.keys())
     print("Available Engineering Programs: ")
     for i,app in enumerate(apps,1):
@@ -33,12 +202,10 @@ def main():
         print("Invalid selection. Exiting...")
         return
     
-    scraper = HardwareScraper()
-    scraper_data = scraper.get_all_specs() #tüm scraper datayı al
+    scraper_data = scan_hardware(args)
 
     # 2-) donanım taraması ilk test
     print(f"\n STEP 1- Scanning hardware for {target_app}...")
-    print("This will take about 20-30 seconds. Please wait...")
 
     hasPassed , messages = logic.theoretical_compatibility_test(target_app,scraper_data)
 
@@ -50,17 +217,26 @@ def main():
     
 
     print("STEP 2- Running Benchmarks...")
-    benchmark = BenchmarkEngine()
-    bench_results = benchmark.run_all_benchmarks() #data paketini al
+    # Benchmark the drive the app would actually be installed on
+    install_disk = logic.pick_install_disk(target_app, scraper_data)
+    target_mountpoint = install_disk["mountpoint"] if install_disk else None
+
+    bench_results = run_benchmarks(args, target_mountpoint, replay_stages=logic.replay_stages([target_app]))
 
 
     print("\n STEP 3-Calculating Performance Score...")
     score, warnings = logic.calculate_performance_score(target_app, scraper_data, bench_results)
+    low, _, high = logic.score_range(target_app, scraper_data, bench_results)
     print(f"FINAL REPORT: {target_app.upper()}")
     status = "EXCELLENT" if score >= 80 else "GOOD" if score >= 50 else "WEAK"
-    print(f"OVERALL SCORE  : {score}/100")
+    print(f"OVERALL SCORE  : {score}/100" + (f" (likely range {low}-{high})" if low != high else ""))
     print(f"PERFORMANCE    : {status}")
 
+    if not args.no_store:
+        store = ResultStore()
+        store.save_run(machine_id(), bench_results, scraper_data, app=target_app, score=score)
+        store.close()
+
     if warnings:
         print("CRITICAL WARNINGS:")
         for warn in warnings:
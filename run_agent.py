@@ -0,0 +1,37 @@
+import asyncio
+import argparse
+from backend.agent import Agent
+from backend.netprobe import endpoint_arg
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Rig-Engineer headless agent: serves scan and benchmark results as JSON")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: localhost only)")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--interval", type=float, default=None,
+                        help="Run a scan and benchmark every N minutes (default: only on POST /run)")
+    parser.add_argument("--preset", choices=["quick", "thorough"], default=None,
+                        help='Repeat each benchmark until stable: "quick" (under 5s) or "thorough"')
+    parser.add_argument("--network-endpoint", default=None, type=endpoint_arg,
+                        help='Network probe: "speedtest" (default), "tcp://host:port" or an "http://" URL')
+    parser.add_argument("--refresh-specs", action="store_true",
+                        help="Ignore the cached hardware specs and rescan on every run")
+    parser.add_argument("--no-store", action="store_true",
+                        help="Don't save runs to the local results database")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    agent = Agent(
+        interval_s=args.interval * 60 if args.interval else None,
+        preset=args.preset,
+        network_endpoint=args.network_endpoint,
+        refresh_specs=args.refresh_specs,
+        store=not args.no_store,
+    )
+    asyncio.run(agent.serve(args.host, args.port))
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\nAgent stopped.")
@@ -0,0 +1,24 @@
+import asyncio
+import argparse
+from backend.collector import CollectorServer
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Rig-Engineer fleet collector: gathers results from many machines")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: localhost only)")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--db", default=None, help="SQLite database path (default: fleet.sqlite in the app data folder)")
+    parser.add_argument("--spool", default=None,
+                        help="Also ingest *.jsonl result files dropped into this directory")
+    parser.add_argument("--spool-every", type=float, default=10, help="Seconds between spool directory scans")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    server = CollectorServer(path=args.db, spool_dir=args.spool, spool_every=args.spool_every)
+    asyncio.run(server.serve(args.host, args.port))
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\nCollector stopped.")
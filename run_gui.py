@@ -1,12 +1,37 @@
 
 import sys
+import time
+import argparse
+START_TIME = time.perf_counter()
+
 from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer
 from gui.main_window import MainWindow
+from backend.startup import warm_up, startup_report
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Rig-Engineer: System Performance Analyzer (GUI)")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="Print the time to the home screen and an import-time breakdown, then exit")
+    # Anything else (e.g. -platform offscreen) is left for Qt
+    return parser.parse_known_args()
+
+def report_startup(app):
+    print(f"Home screen shown after {(time.perf_counter() - START_TIME) * 1000:.0f} ms")
+    print("\n".join(startup_report("import gui.main_window")))
+    app.quit()
 
 def main():
-    app = QApplication(sys.argv)
+    args, qt_args = parse_args()
+    app = QApplication(sys.argv[:1] + qt_args)
     window = MainWindow()
     window.show()
+    if args.startup_report:
+        # Runs once the event loop has painted the window
+        QTimer.singleShot(0, lambda: report_startup(app))
+    else:
+        # Load the scanner/benchmark backend while the user picks an app
+        QTimer.singleShot(0, warm_up)
     sys.exit(app.exec())
 
 if __name__ == "__main__":
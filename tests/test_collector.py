@@ -0,0 +1,73 @@
+import json
+import asyncio
+
+import pytest
+
+from backend.collector import Collector, CollectorServer
+
+
+CATALOG = {
+    "Blender": {"min_ram": 8, "rec_ram": 16, "min_vram": 2, "rec_vram": 8, "min_storage": 5, "os_version": "Windows 10"},
+}
+
+
+def _payload(machine_id, **specs):
+    base = {"os_name": "Windows 11", "total_ram_gb": 64, "available_ram_gb": 40, "vram_gb": 16,
+            "disks": [{"device": "C:", "mountpoint": "C:\\", "free_gb": 500, "total_gb": 1000}]}
+    return {"machine_id": machine_id, "finished": 1_700_000_000.0, "specs": dict(base, **specs)}
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    monkeypatch.setenv("RIG_ENGINEER_HOME", str(tmp_path))
+    requirements = tmp_path / "requirements.json"
+    requirements.write_text(json.dumps(CATALOG))
+    return str(tmp_path / "fleet.sqlite"), str(requirements)
+
+
+@pytest.fixture
+def collector(paths):
+    collector = Collector(*paths)
+    yield collector
+    collector.close()
+
+
+def test_malformed_specs_are_invalid(collector):
+    statuses = collector.ingest([_payload("good"), _payload("bad", os_name=11, total_ram_gb="lots"),
+                                 _payload("bad-disks", disks="C:")])
+    assert statuses == ["stored", "invalid", "invalid"]
+    assert collector.machines_for("Blender") == ["good"]
+
+
+def test_unknown_probe_values_are_accepted(collector):
+    assert collector.ingest([_payload("partial", vram_gb="unknown")]) == ["stored"]
+
+
+def test_failing_submission_does_not_reject_its_batch(paths):
+    server = CollectorServer(*paths)
+    # Created on the database thread, which owns the SQLite connection, as in serve()
+    collector = server.collector = server._db.submit(Collector, *paths).result()
+    original = collector.ingest
+
+    def ingest(payloads, received=None):
+        if any(p["machine_id"] == "broken" for p in payloads):
+            raise RuntimeError("cannot store this one")
+        return original(payloads, received)
+
+    collector.ingest = ingest
+
+    async def submit_together():
+        # Queued while the first submission is being written, so they share one batch
+        first = asyncio.ensure_future(server.submit([_payload("first")]))
+        await asyncio.sleep(0)
+        rest = [server.submit([_payload("ok")]), server.submit([_payload("broken")])]
+        return await asyncio.gather(first, *rest, return_exceptions=True)
+
+    first, ok, broken = asyncio.run(submit_together())
+    machines = server._db.submit(collector.machines_for, "Blender").result()
+    server._db.submit(collector.close).result()
+    server._db.shutdown()
+
+    assert first == ["stored"] and ok == ["stored"]
+    assert isinstance(broken, RuntimeError)
+    assert machines == ["first", "ok"]
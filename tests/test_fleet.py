@@ -0,0 +1,46 @@
+import math
+
+import pytest
+
+from backend import fleet
+from backend.fleet import evaluate_fleet, parse_os
+
+
+def _machine(machine_id, os_name):
+    return {"machine_id": machine_id, "os_name": os_name, "total_ram_gb": 64, "vram_gb": 16,
+            "disks": [{"device": "C:", "mountpoint": "C:\\", "free_gb": 500, "total_gb": 1000}]}
+
+
+CATALOG = [
+    ("Legacy Tool", {"min_ram": 4, "min_vram": 0, "min_storage": 5, "os_version": "Windows 8.1"}),
+    ("Blender", {"min_ram": 8, "min_vram": 2, "min_storage": 5, "os_version": "Windows 10"}),
+    ("Revit 2026", {"min_ram": 16, "min_vram": 4, "min_storage": 30, "os_version": "Windows 11"}),
+]
+
+
+def test_parse_os_reads_dotted_versions():
+    assert parse_os("Windows 8.1") == (1, 8.1)
+    assert parse_os("Windows 10") == (1, 10.0)
+    assert parse_os("Windows 11 Pro") == (1, 11.0)
+    assert parse_os("Windows 8.1")[1] < parse_os("Windows 10")[1] < parse_os("Windows 11")[1]
+
+
+@pytest.mark.parametrize("os_name", [None, 11, ["Windows 11"], ""])
+def test_parse_os_unknown(os_name):
+    family, version = parse_os(os_name)
+    assert family == 0 and math.isnan(version)
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_windows_versions_compare_numerically(monkeypatch, use_numpy):
+    if use_numpy and fleet.np is None:
+        pytest.skip("NumPy is not installed")
+    if not use_numpy:
+        monkeypatch.setattr(fleet, "np", None)
+    machines = [_machine("win81", "Windows 8.1"), _machine("win10", "Windows 10"), _machine("win11", "Windows 11")]
+    result = evaluate_fleet(machines, CATALOG)
+
+    assert result.machines_for("Legacy Tool") == ["win81", "win10", "win11"]
+    assert result.machines_for("Blender") == ["win10", "win11"]
+    assert result.machines_for("Revit 2026") == ["win11"]
+    assert result.count_by_app() == {"Legacy Tool": 3, "Blender": 2, "Revit 2026": 1}
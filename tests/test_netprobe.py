@@ -0,0 +1,61 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from backend.netprobe import HttpProbeBackend
+
+
+BODY = b"x" * 256 * 1024
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/file.bin":
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(BODY)))
+            self.end_headers()
+            self.wfile.write(BODY)
+        elif self.path == "/moved":
+            self.send_response(302)
+            self.send_header("Location", "/file.bin")
+            self.end_headers()
+        elif self.path == "/truncated":
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(BODY)))
+            self.end_headers()
+            self.wfile.write(BODY[:1000])
+        else:
+            self.send_error(404)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _probe(url):
+    return HttpProbeBackend(url, streams=2, pings=2, timeout=10).measure()
+
+
+def test_download_counts_body_bytes(server):
+    result = _probe(f"{server}/file.bin")
+    assert result["available"] and result["error"] is None
+    assert result["download_mbps"] > 0
+
+
+@pytest.mark.parametrize("path, error", [("/missing", "HTTP 404"), ("/moved", "HTTP 302"),
+                                         ("/truncated", "Incomplete response")])
+def test_unusable_responses_are_errors(server, path, error):
+    result = _probe(f"{server}{path}")
+    assert not result["available"]
+    assert result["download_mbps"] is None
+    assert error in result["error"]